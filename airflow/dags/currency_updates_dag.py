@@ -0,0 +1,47 @@
+"""
+Currency Updates DAG
+Keeps the exchange_rates table filled for the last AIRFLOW_CONFIG['fx_backfill_days']
+days, so dashboard sessions read stored rates instead of calling the rates API
+"""
+from datetime import datetime, timedelta
+import sys
+import os
+
+from airflow import DAG
+from airflow.operators.python import PythonOperator
+
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, project_root)
+
+from config.config import AIRFLOW_CONFIG
+from src.currency.rate_pipeline import run_currency_pipeline
+
+
+default_args = {
+    'owner': 'smart-finance',
+    'retries': 3,
+    'retry_delay': timedelta(minutes=10),
+}
+
+
+def update_exchange_rates(ds, **context):
+    """Backfill any missing days up to the run's logical date"""
+    return run_currency_pipeline(end_date=datetime.strptime(ds, '%Y-%m-%d').date())
+
+
+with DAG(
+    dag_id='currency_updates',
+    description='Incremental FX rate ingestion into exchange_rates',
+    default_args=default_args,
+    schedule=AIRFLOW_CONFIG['fx_update_schedule'],
+    start_date=datetime(2024, 1, 1),
+    # The pipeline backfills its own window, so missed runs need no catch-up
+    catchup=False,
+    max_active_runs=1,
+    tags=['currency'],
+) as dag:
+
+    PythonOperator(
+        task_id='update_exchange_rates',
+        python_callable=update_exchange_rates,
+    )
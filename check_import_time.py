@@ -0,0 +1,126 @@
+"""
+Import Time Check
+Measure the cold-start import cost of the dashboard and src modules (python -X importtime)
+and verify heavy ML libraries are only loaded by the features that use them
+"""
+from datetime import datetime
+from pathlib import Path
+import subprocess
+import json
+import ast
+import sys
+import os
+
+from config.config import LOGS_DIR
+
+PROJECT_ROOT = Path(__file__).parent
+DASHBOARD = PROJECT_ROOT / 'dashboards' / 'streamlit_dashboard_multiuser.py'
+HISTORY_FILE = LOGS_DIR / 'import_times.jsonl'
+
+# Libraries that must not be imported until a feature needs them
+HEAVY_MODULES = ['prophet', 'plotly', 'torch', 'tensorflow', 'keras', 'pyod', 'sklearn']
+
+# What is measured: the dashboard's module-level imports, then the src modules
+# that scheduled jobs and the dashboard import. None of them may pull in HEAVY_MODULES.
+TARGETS = [
+    'dashboard',
+    'src.currency.currency_converter',
+    'src.budgeting.budget_recommender',
+    'src.reporting.batch_reports',
+    'src.forecasting.forecaster',
+    'src.fraud_detection.fraud_detector',
+    'src.fraud_detection.alert_monitor',
+    'src.retraining.retraining_pipeline',
+]
+
+
+def dashboard_imports():
+    """The dashboard's module-level import statements, as one code string"""
+    source = DASHBOARD.read_text(encoding='utf-8')
+    tree = ast.parse(source)
+    return '\n'.join(
+        ast.get_source_segment(source, node)
+        for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))
+    )
+
+
+def measure(code):
+    """
+    Run code in a fresh interpreter with -X importtime
+
+    Returns:
+        tuple: (total seconds, {top-level import: cumulative seconds}, set of every module loaded)
+    """
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(
+        [str(PROJECT_ROOT), str(PROJECT_ROOT / 'dashboards'), os.environ.get('PYTHONPATH', '')]
+    ))
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        cwd=PROJECT_ROOT, env=env, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+
+    top_level = {}
+    loaded = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        loaded.add(name.strip())
+        # Nesting is shown by indentation; unindented names were imported directly by the code
+        if not name[1:].startswith(' '):
+            top_level[name.strip()] = int(cumulative) / 1e6
+
+    return sum(top_level.values()), top_level, loaded
+
+
+def check_target(target, top=5):
+    """Measure one target, print its cost and heaviest imports, and flag heavy libraries"""
+    code = dashboard_imports() if target == 'dashboard' else f'import {target}'
+    try:
+        total, top_level, loaded = measure(code)
+    except RuntimeError as e:
+        # A target that cannot be imported was not checked, so it cannot pass
+        print(f"[FAIL] {target}: import failed: {e}")
+        return {'target': target, 'ms': None, 'heavy': [], 'error': str(e)}
+
+    heavy = sorted({name.split('.')[0] for name in loaded} & set(HEAVY_MODULES))
+    status = '[OK]  ' if not heavy else '[FAIL]'
+    print(f"{status} {target}: {total * 1000:,.0f} ms")
+    for name, seconds in sorted(top_level.items(), key=lambda item: -item[1])[:top]:
+        print(f"         {seconds * 1000:8,.0f} ms  {name}")
+    if heavy:
+        print(f"         loads heavy modules at import: {', '.join(heavy)}")
+
+    return {'target': target, 'ms': round(total * 1000, 1), 'heavy': heavy}
+
+
+def main():
+    print("\n" + "="*60)
+    print("CHECKING IMPORT TIMES")
+    print("="*60 + "\n")
+
+    results = [check_target(target) for target in TARGETS]
+
+    # Append to the history so cold-start cost can be tracked across changes
+    with open(HISTORY_FILE, 'a') as f:
+        f.write(json.dumps({'measured_at': datetime.now().isoformat(timespec='seconds'),
+                            'python': sys.version.split()[0], 'results': results}) + '\n')
+
+    failed_imports = [r['target'] for r in results if 'error' in r]
+    heavy = [r['target'] for r in results if r['heavy']]
+    print()
+    if failed_imports:
+        print(f"[FAIL] Could not import: {', '.join(failed_imports)}")
+    if heavy:
+        print("[FAIL] Heavy libraries loaded at import time (see above)")
+    ok = not failed_imports and not heavy
+    if ok:
+        print("[OK] No heavy libraries loaded at import time")
+    print(f"Results appended to {HISTORY_FILE}")
+    return ok
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
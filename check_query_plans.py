@@ -0,0 +1,122 @@
+"""
+Query Plan Check
+Verify the SQLite login and analytics queries are answered through indexes (EXPLAIN QUERY PLAN)
+"""
+import random
+import sys
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from src.database.sqlite_manager import SQLiteManager
+
+
+def seed_database(db, n_users=20, n_transactions=2000):
+    """Fill a scratch database with random users and transactions"""
+    cursor = db.conn.cursor()
+    categories = ['Groceries', 'Dining', 'Rent', 'Travel', 'Savings']
+    start = datetime(2024, 1, 1)
+
+    cursor.executemany(
+        "INSERT INTO users (user_id, name, email, password_hash) VALUES (?, ?, ?, ?)",
+        ((f'U{i:05d}', f'User {i}', f'user{i}@example.com', 'x') for i in range(1, n_users + 1))
+    )
+    cursor.executemany(
+        """
+        INSERT INTO transactions (transaction_id, user_id, amount, currency, category, merchant, transaction_date)
+        VALUES (?, ?, ?, 'USD', ?, 'Store', ?)
+        """,
+        (
+            (
+                f'T{i:05d}',
+                f'U{random.randint(1, n_users):05d}',
+                round(random.uniform(1, 500), 2),
+                random.choice(categories),
+                start + timedelta(minutes=random.randint(0, 60 * 24 * 365))
+            )
+            for i in range(1, n_transactions + 1)
+        )
+    )
+    db.conn.commit()
+    cursor.execute("ANALYZE")
+
+
+def capture_queries(db, method, *args):
+    """Run a manager method and return the SQL statements it executed"""
+    statements = []
+    db.conn.set_trace_callback(statements.append)
+    try:
+        method(*args)
+    finally:
+        db.conn.set_trace_callback(None)
+    return [sql for sql in statements if sql.lstrip().upper().startswith('SELECT')]
+
+
+def check_plan(db, name, method, args, expected):
+    """Check that every SELECT issued by a method uses the expected access path"""
+    ok = True
+    for sql in capture_queries(db, method, *args):
+        plan = db.explain_query_plan(sql)
+        uses_index = any(expected in step for step in plan)
+        full_scan = any(step.startswith('SCAN') for step in plan)
+
+        status = "✅" if uses_index and not full_scan else "❌"
+        ok = ok and uses_index and not full_scan
+        print(f"{status} {name}")
+        for step in plan:
+            print(f"     {step}")
+    return ok
+
+
+def main():
+    print("\n" + "="*60)
+    print("CHECKING SQLITE QUERY PLANS")
+    print("="*60 + "\n")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db = SQLiteManager(db_path=Path(tmp_dir) / 'plans.db')
+        seed_database(db)
+
+        user_id = 'U00001'
+        start_date = datetime(2024, 3, 1)
+        end_date = datetime(2024, 6, 1)
+
+        checks = [
+            ("get_user_by_email", db.get_user_by_email,
+             ('User1@Example.com',), "USING INDEX idx_users_email_lower"),
+            ("verify_login", db.verify_login,
+             ('user1@example.com', 'secret'), "USING INDEX idx_users_email_lower"),
+            ("get_user_transactions (date range)", db.get_user_transactions,
+             (user_id, start_date, end_date), "USING INDEX idx_transactions_user_date"),
+            ("get_user_transactions (all time)", db.get_user_transactions,
+             (user_id,), "USING INDEX idx_transactions_user_date"),
+            ("get_user_transactions_page (first page)", db.get_user_transactions_page,
+             (user_id,), "USING INDEX idx_transactions_user_date_id"),
+            ("get_user_transactions_page (next page)", db.get_user_transactions_page,
+             (user_id, ('2024-06-01 00:00:00', 'T00100')), "USING INDEX idx_transactions_user_date_id"),
+            ("get_user_spending_summary (date range)", db.get_user_spending_summary,
+             (user_id, start_date, end_date), "daily_spending_rollup USING PRIMARY KEY"),
+            ("get_user_spending_summary (all time)", db.get_user_spending_summary,
+             (user_id,), "daily_spending_rollup USING PRIMARY KEY"),
+            ("get_category_breakdown (date range)", db.get_category_breakdown,
+             (user_id, start_date, end_date), "daily_spending_rollup USING PRIMARY KEY"),
+            ("get_category_breakdown (all time)", db.get_category_breakdown,
+             (user_id,), "daily_spending_rollup USING PRIMARY KEY"),
+            ("get_daily_spending (date range)", db.get_daily_spending,
+             (user_id, start_date, end_date), "daily_spending_rollup USING PRIMARY KEY"),
+        ]
+
+        results = [check_plan(db, *check) for check in checks]
+        db.close()
+
+    print("\n" + "="*60)
+    if all(results):
+        print("✅ All login and analytics queries use index-backed plans")
+    else:
+        print("❌ Some queries fall back to a full scan")
+    print("="*60)
+    return all(results)
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -48,7 +48,11 @@ TRANSACTION_CATEGORIES = {
 FRAUD_CONFIG = {
     'contamination': 0.05,
     'models': ['IsolationForest', 'AutoEncoder'],
-    'feature_columns': ['amount', 'hour', 'day_of_week', 'category_encoded']
+    'feature_columns': ['amount', 'hour', 'day_of_week', 'category_encoded'],
+    'alert_batch_size': 10000,  # New transactions scored per batch by the alert monitor
+    # Each run also rescans this many minutes before the watermark: created_at is set
+    # when a transaction starts, so a row can commit after later rows were already scanned
+    'alert_overlap_minutes': 15
 }
 
 # Forecasting Configuration
@@ -76,11 +80,33 @@ BUDGET_CONFIG = {
     'savings': 0.20
 }
 
+# Report Configuration
+REPORT_CONFIG = {
+    'workers': 2,  # Background threads rendering PDF/XLSX reports
+    'cache_entries': 64,  # Generated reports kept for instant re-download
+    'export_chunk_rows': 50000,  # Rows written per chunk in CSV exports
+    'poll_seconds': 0.5,  # How long a dashboard rerun waits for a report before showing "still generating"
+    'batch_periods_days': [30, 90, 180],  # Pre-built "Last N days" summaries (match the dashboard presets)
+    'batch_formats': ['pdf', 'xlsx'],
+    'batch_workers': None,  # Render processes for the batch job (None = one per CPU)
+    'batch_users_per_task': 50,  # Users rendered per process-pool task
+    'batch_keep_runs': 7  # Dated batch runs kept in REPORTS_DIR
+}
+
+# Retraining Configuration
+RETRAIN_CONFIG = {
+    'fraud_drift_threshold': 0.1,  # PSI of log(amount_usd); below this the fraud models are kept
+    'drift_bins': 10,  # Quantile bins for the PSI baseline
+    'history_runs': 20  # Run records (with timings) kept in the retraining state
+}
+
 # Airflow Configuration
 AIRFLOW_CONFIG = {
     'fx_update_schedule': '0 0 * * *',  # Daily at midnight
     'model_retrain_schedule': '0 0 * * 0',  # Weekly on Sunday
-    'alert_check_schedule': '0 */6 * * *'  # Every 6 hours
+    'alert_check_schedule': '0 */6 * * *',  # Every 6 hours
+    'fx_backfill_days': 30,  # Days of exchange rates kept complete by the FX pipeline
+    'report_batch_schedule': '0 1 * * *'  # Daily at 1 AM, after the FX update
 }
 
 # Dashboard Configuration
@@ -95,5 +121,6 @@ DASHBOARD_CONFIG = {
 MODEL_PATHS = {
     'fraud_detector': MODELS_DIR / 'fraud_detector.pkl',
     'forecaster': MODELS_DIR / 'forecaster.pkl',
-    'scaler': MODELS_DIR / 'scaler.pkl'
+    'scaler': MODELS_DIR / 'scaler.pkl',
+    'retraining_state': MODELS_DIR / 'retraining_state.json'
 }
@@ -5,7 +5,6 @@ Supports both CSV and PostgreSQL storage
 """
 import streamlit as st
 import pandas as pd
-import hashlib
 from pathlib import Path
 import sys
 import os
@@ -15,6 +14,8 @@ project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, project_root)
 
 from config.config import RAW_DATA_DIR
+from src.security.password_hasher import get_password_hasher
+from user_index import USER_COLUMNS, get_user_index, append_user, update_user
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -56,8 +57,8 @@ class AuthManager:
             print("✅ Using CSV storage")
 
     def hash_password(self, password):
-        """Hash password using SHA256"""
-        return hashlib.sha256(password.encode()).hexdigest()
+        """Hash password with the shared PBKDF2 hasher"""
+        return get_password_hasher().hash(password)
 
     # ========================================
     # CSV STORAGE METHODS
@@ -67,7 +68,7 @@ class AuthManager:
         """Load users from CSV"""
         if self.users_file.exists():
             return pd.read_csv(self.users_file)
-        return pd.DataFrame(columns=['user_id', 'name', 'email', 'password_hash', 'monthly_income', 'preferred_currency'])
+        return pd.DataFrame(columns=USER_COLUMNS)
 
     def save_users_csv(self, users_df):
         """Save users to CSV"""
@@ -75,18 +76,11 @@ class AuthManager:
 
     def get_next_user_id_csv(self):
         """Generate next user ID from CSV"""
-        users_df = self.load_users_csv()
-        if len(users_df) == 0:
-            return 'U00001'
-
-        last_id = users_df['user_id'].iloc[-1]
-        number = int(last_id[1:]) + 1
-        return f'U{number:05d}'
+        return get_user_index(self.users_file).next_user_id()
 
     def email_exists_csv(self, email):
         """Check if email already registered in CSV"""
-        users_df = self.load_users_csv()
-        return email.lower() in users_df['email'].str.lower().values
+        return get_user_index(self.users_file).email_exists(email)
 
     def register_user_csv(self, name, email, password, monthly_income, currency='USD'):
         """Register a new user in CSV"""
@@ -100,9 +94,6 @@ class AuthManager:
         if self.email_exists_csv(email):
             return False, "Email already registered"
 
-        # Load existing users
-        users_df = self.load_users_csv()
-
         # Create new user
         new_user = {
             'user_id': self.get_next_user_id_csv(),
@@ -113,41 +104,33 @@ class AuthManager:
             'preferred_currency': currency
         }
 
-        # Append new user
-        users_df = pd.concat([users_df, pd.DataFrame([new_user])], ignore_index=True)
-
-        # Save
-        self.save_users_csv(users_df)
+        # Append one row instead of rewriting the file
+        append_user(self.users_file, new_user)
 
         return True, "Registration successful!"
 
     def login_csv(self, email, password):
         """Login user from CSV"""
-        users_df = self.load_users_csv()
-
         # Find user by email
-        user_row = users_df[users_df['email'].str.lower() == email.lower()]
+        user = get_user_index(self.users_file).get_by_email(email)
 
-        if len(user_row) == 0:
+        if user is None:
             return False, None, "Email not found"
 
-        user = user_row.iloc[0]
-
         # Check password
-        if user['password_hash'] != self.hash_password(password):
+        valid, new_hash = get_password_hasher().verify_and_update(password, user.get('password_hash'))
+        if not valid:
             return False, None, "Incorrect password"
 
+        # Upgrade legacy SHA-256 / lower-cost hashes now that we know the password
+        if new_hash:
+            update_user(self.users_file, user['user_id'], password_hash=new_hash)
+
         return True, user['user_id'], "Login successful!"
 
     def get_user_info_csv(self, user_id):
         """Get user information from CSV"""
-        users_df = self.load_users_csv()
-        user_row = users_df[users_df['user_id'] == user_id]
-
-        if len(user_row) == 0:
-            return None
-
-        return user_row.iloc[0].to_dict()
+        return get_user_index(self.users_file).get_by_id(user_id)
 
     # ========================================
     # POSTGRESQL STORAGE METHODS
@@ -233,6 +216,43 @@ class AuthManager:
             return self.get_user_info_csv(user_id)
 
 
+# ========================================
+# SESSION CACHE
+# ========================================
+
+def get_auth_manager():
+    """Get this session's AuthManager, creating it on the first call"""
+    if 'auth_manager' not in st.session_state:
+        st.session_state['auth_manager'] = AuthManager()
+    return st.session_state['auth_manager']
+
+
+def get_current_user_info():
+    """
+    Get the logged-in user's record, loading it at most once per session
+
+    Widget reruns are served from session state; call invalidate_user_info()
+    after anything that changes the profile to force a reload.
+
+    Returns:
+        dict: User information or None
+    """
+    user_id = get_current_user_id()
+    if user_id is None:
+        return None
+
+    user_info = st.session_state.get('user_info')
+    if user_info is None or user_info.get('user_id') != user_id:
+        user_info = get_auth_manager().get_user_info(user_id)
+        st.session_state['user_info'] = user_info
+    return user_info
+
+
+def invalidate_user_info():
+    """Drop the cached user record so the next get_current_user_info() reloads it"""
+    st.session_state.pop('user_info', None)
+
+
 # ========================================
 # STREAMLIT UI FUNCTIONS
 # ========================================
@@ -250,7 +270,7 @@ def show_login_page():
 
     tab1, tab2 = st.tabs(["Login", "Register"])
 
-    auth = AuthManager()
+    auth = get_auth_manager()
 
     with tab1:
         st.subheader("Welcome Back!")
@@ -268,6 +288,7 @@ def show_login_page():
                     st.session_state['authenticated'] = True
                     st.session_state['user_id'] = user_id
                     st.session_state['user_email'] = email
+                    invalidate_user_info()
                     st.rerun()
                 else:
                     st.error(message)
@@ -318,6 +339,7 @@ def logout():
     st.session_state['authenticated'] = False
     st.session_state['user_id'] = None
     st.session_state['user_email'] = None
+    invalidate_user_info()
     st.rerun()
 
 
@@ -0,0 +1,536 @@
+"""
+Data Layer for Smart Finance Dashboard
+Storage-aware reads and writes (CSV, SQLite, PostgreSQL) used by the dashboard tabs
+"""
+import streamlit as st
+import pandas as pd
+import functools
+import threading
+import sys
+import os
+from datetime import datetime
+
+# Add project root to path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from config.config import RAW_DATA_DIR
+from transaction_index import get_transaction_index, append_transactions
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Get storage mode from environment
+STORAGE_MODE = os.getenv('DATA_STORAGE_MODE', 'csv')  # 'csv', 'sqlite', or 'postgresql'
+
+# Rows per page in the Manage Transactions tab
+DEFAULT_PAGE_SIZE = 50
+
+TRANSACTIONS_CSV = RAW_DATA_DIR / 'transactions.csv'
+
+
+def get_db_manager():
+    """Get the database manager for the current storage mode (None in CSV mode)"""
+    try:
+        if STORAGE_MODE == 'sqlite':
+            from src.database.sqlite_manager import get_db_manager as get_manager
+        elif STORAGE_MODE == 'postgresql':
+            from src.database.postgres_manager import get_db_manager as get_manager
+        else:
+            return None
+        return get_manager()
+    except Exception as e:
+        print(f"⚠️  Error connecting to {STORAGE_MODE}: {e}")
+        print("⚠️  Falling back to CSV storage")
+        return None
+
+
+# ========================================
+# PER-USER CACHE
+# ========================================
+# Cached reads are keyed by (user_id, data version). A write by one user
+# bumps only that user's version, so every other user's cached slices and
+# forecast stay valid instead of being wiped by st.cache_data.clear().
+
+_data_versions = {}
+_cache_stats = {}
+_cache_lock = threading.Lock()
+
+
+def get_data_version(user_id):
+    """Current data version of a user (changes whenever the user's data is written)"""
+    with _cache_lock:
+        return _data_versions.get(user_id, 0)
+
+
+def bump_data_version(user_id):
+    """Invalidate every cached read of one user"""
+    with _cache_lock:
+        _data_versions[user_id] = _data_versions.get(user_id, 0) + 1
+
+
+def _record_cache_event(name, event):
+    with _cache_lock:
+        stats = _cache_stats.setdefault(name, {'calls': 0, 'misses': 0})
+        stats[event] += 1
+
+
+def tracked_cache_data(name, **cache_kwargs):
+    """
+    st.cache_data that also counts hits and misses under a name
+
+    A miss is a call that actually ran the function body.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def compute(*args, **kwargs):
+            _record_cache_event(name, 'misses')
+            return func(*args, **kwargs)
+
+        cached = st.cache_data(**cache_kwargs)(compute)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            _record_cache_event(name, 'calls')
+            return cached(*args, **kwargs)
+
+        wrapper.clear = cached.clear
+        return wrapper
+    return decorator
+
+
+def get_cache_stats():
+    """
+    Hit/miss counters of the tracked caches
+
+    Returns:
+        dict: {name: {'hits', 'misses', 'hit_ratio'}}
+    """
+    with _cache_lock:
+        snapshot = {name: dict(stats) for name, stats in _cache_stats.items()}
+
+    return {
+        name: {
+            'hits': stats['calls'] - stats['misses'],
+            'misses': stats['misses'],
+            'hit_ratio': (stats['calls'] - stats['misses']) / stats['calls'] if stats['calls'] else 0.0
+        }
+        for name, stats in snapshot.items()
+    }
+
+
+# ========================================
+# PER-USER READS
+# ========================================
+# In SQLite/PostgreSQL mode these push the user and date filters (and the
+# aggregations) down to the database, so only the current user's slice is
+# ever loaded. CSV mode slices the shared user-partitioned TransactionIndex.
+# Results are cached per (user, data version, date range).
+
+def get_user_transactions(user_id, start_date=None, end_date=None):
+    """
+    Get a user's transactions, optionally limited to a date range
+
+    Returns:
+        DataFrame: One row per transaction, transaction_date as datetime64
+    """
+    return _cached_user_transactions(user_id, get_data_version(user_id), start_date, end_date)
+
+
+@tracked_cache_data('user_transactions', max_entries=1000)
+def _cached_user_transactions(user_id, data_version, start_date, end_date):
+    db = get_db_manager()
+
+    if db is None:
+        index = get_transaction_index(TRANSACTIONS_CSV)
+        if start_date is not None and end_date is not None:
+            return index.user_range(user_id, start_date, end_date)
+        return index.user_range(user_id)
+
+    rows = db.get_user_transactions(
+        user_id, _to_python_datetime(start_date), _to_python_datetime(end_date)
+    )
+    user_df = pd.DataFrame(rows)
+    if len(user_df) > 0:
+        user_df['transaction_date'] = pd.to_datetime(user_df['transaction_date'])
+        user_df['amount'] = user_df['amount'].astype(float)
+    return user_df
+
+
+def get_converted_transactions(user_id, currency, converter, start_date=None, end_date=None):
+    """
+    Get a user's transactions with an amount_<currency> column added
+
+    Converted with one factor per currency and cached per (user, data
+    version, currency, exchange rates, date range).
+
+    Returns:
+        DataFrame: Same rows as get_user_transactions
+    """
+    return _cached_converted_transactions(
+        user_id, get_data_version(user_id), currency, converter.last_update,
+        start_date, end_date, converter
+    )
+
+
+@tracked_cache_data('converted_transactions', max_entries=1000)
+def _cached_converted_transactions(user_id, data_version, currency, rates_version, start_date, end_date, _converter):
+    user_df = get_user_transactions(user_id, start_date, end_date)
+    if len(user_df) == 0:
+        user_df[f'amount_{currency}'] = pd.Series(dtype=float)
+        return user_df
+
+    user_df[f'amount_{currency}'] = convert_totals(user_df, _converter, currency, amount_column='amount')
+    return user_df
+
+
+def get_category_spending(user_id, start_date=None, end_date=None):
+    """
+    Get a user's spending per category and currency
+
+    Returns:
+        DataFrame: category, currency, transaction_count, total_amount
+    """
+    return _cached_category_spending(user_id, get_data_version(user_id), start_date, end_date)
+
+
+@tracked_cache_data('category_spending', max_entries=1000)
+def _cached_category_spending(user_id, data_version, start_date, end_date):
+    db = get_db_manager()
+
+    if db is None:
+        user_df = get_user_transactions(user_id, start_date, end_date)
+        return user_df.groupby(['category', 'currency'], as_index=False).agg(
+            transaction_count=('amount', 'size'),
+            total_amount=('amount', 'sum')
+        )
+
+    rows = db.get_category_breakdown(
+        user_id, _to_python_datetime(start_date), _to_python_datetime(end_date), by_currency=True
+    )
+    return _aggregate_frame(rows, ['category', 'currency'])
+
+
+def get_transaction_count(user_id, start_date=None, end_date=None):
+    """
+    Count a user's transactions in a date range
+
+    Summed from the cached per-category totals (the daily rollup in database
+    modes), so no transaction rows are loaded.
+    """
+    return int(get_category_spending(user_id, start_date, end_date)['transaction_count'].sum())
+
+
+def get_daily_spending(user_id, start_date=None, end_date=None):
+    """
+    Get a user's spending per day and currency
+
+    Returns:
+        DataFrame: day (datetime64), currency, transaction_count, total_amount
+    """
+    return _cached_daily_spending(user_id, get_data_version(user_id), start_date, end_date)
+
+
+@tracked_cache_data('daily_spending', max_entries=1000)
+def _cached_daily_spending(user_id, data_version, start_date, end_date):
+    db = get_db_manager()
+
+    if db is None:
+        user_df = get_user_transactions(user_id, start_date, end_date)
+        user_df['day'] = user_df['transaction_date'].dt.normalize()
+        return user_df.groupby(['day', 'currency'], as_index=False).agg(
+            transaction_count=('amount', 'size'),
+            total_amount=('amount', 'sum')
+        )
+
+    rows = db.get_daily_spending(
+        user_id, _to_python_datetime(start_date), _to_python_datetime(end_date)
+    )
+    daily_df = _aggregate_frame(rows, ['day', 'currency'])
+    daily_df['day'] = pd.to_datetime(daily_df['day'])
+    return daily_df
+
+
+def get_monthly_spending(user_id, start_date=None, end_date=None):
+    """
+    Get a user's spending per month, category and currency
+
+    Returns:
+        DataFrame: month ('YYYY-MM'), category, currency, transaction_count, total_amount
+    """
+    return _cached_monthly_spending(user_id, get_data_version(user_id), start_date, end_date)
+
+
+@tracked_cache_data('monthly_spending', max_entries=1000)
+def _cached_monthly_spending(user_id, data_version, start_date, end_date):
+    db = get_db_manager()
+
+    if db is None:
+        user_df = get_user_transactions(user_id, start_date, end_date)
+        user_df['month'] = user_df['transaction_date'].dt.strftime('%Y-%m')
+        return user_df.groupby(['month', 'category', 'currency'], as_index=False).agg(
+            transaction_count=('amount', 'size'),
+            total_amount=('amount', 'sum')
+        )
+
+    rows = db.get_monthly_spending(
+        user_id, _to_python_datetime(start_date), _to_python_datetime(end_date)
+    )
+    return _aggregate_frame(rows, ['month', 'category', 'currency'])
+
+
+def get_daily_series(user_id, currency, converter, start_date=None, end_date=None):
+    """
+    Get a user's total spending per calendar day in one currency
+
+    Shared by the Spending Trend chart, the forecast and the reports. Built
+    from the daily aggregates and resampled on a datetime64 index, so days
+    without spending are present with 0. Cached per (user, data version,
+    currency, exchange rates, date range).
+
+    Returns:
+        Series: Amount per day (DatetimeIndex named 'day')
+    """
+    return _cached_daily_series(
+        user_id, get_data_version(user_id), currency, converter.last_update,
+        start_date, end_date, converter
+    )
+
+
+@tracked_cache_data('daily_series', max_entries=1000)
+def _cached_daily_series(user_id, data_version, currency, rates_version, start_date, end_date, _converter):
+    daily_df = get_daily_spending(user_id, start_date, end_date)
+    if len(daily_df) == 0:
+        return pd.Series(dtype=float, index=pd.DatetimeIndex([], name='day'), name='amount')
+
+    amounts = convert_totals(daily_df, _converter, currency)
+    daily_series = amounts.groupby(daily_df['day']).sum()
+    return daily_series.resample('D').sum().rename('amount')
+
+
+def _aggregate_frame(rows, key_columns):
+    """Build an aggregate DataFrame from database rows (NUMERIC/DECIMAL totals become float)"""
+    columns = key_columns + ['transaction_count', 'total_amount']
+    aggregate_df = pd.DataFrame(rows, columns=None if rows else columns)
+    aggregate_df = aggregate_df.reindex(columns=columns)
+    aggregate_df['transaction_count'] = aggregate_df['transaction_count'].astype(int)
+    aggregate_df['total_amount'] = aggregate_df['total_amount'].astype(float)
+    return aggregate_df
+
+
+def convert_totals(aggregate_df, converter, target_currency, amount_column='total_amount'):
+    """
+    Convert per-currency totals to one currency
+
+    Uses one conversion factor per currency instead of converting row by row.
+
+    Returns:
+        Series: Converted amounts aligned with aggregate_df
+    """
+    factors = converter.get_conversion_factors(aggregate_df['currency'].unique(), target_currency)
+    return aggregate_df[amount_column] * aggregate_df['currency'].map(factors)
+
+
+def get_export_batches(user_id, currency, converter, start_date=None, end_date=None):
+    """
+    Stream a user's transactions for CSV export (PostgreSQL only)
+
+    Reads through PostgreSQLManager.stream_transactions(), a server-side
+    cursor, and yields one DataFrame per batch with the amount_<currency>
+    column added, so an export never holds the whole range in memory.
+    Nothing is read until the batches are iterated.
+
+    Returns:
+        generator: DataFrame batches, or None in CSV/SQLite mode (export the cached frame instead)
+    """
+    db = get_db_manager()
+    if STORAGE_MODE != 'postgresql' or db is None:
+        return None
+
+    def batches():
+        for batch in db.stream_transactions(
+            user_id, _to_python_datetime(start_date), _to_python_datetime(end_date)
+        ):
+            batch_df = pd.DataFrame(batch)
+            batch_df[f'amount_{currency}'] = convert_totals(batch_df, converter, currency, amount_column='amount')
+            yield batch_df
+
+    return batches()
+
+
+# ========================================
+# PAGINATED TRANSACTION LISTING
+# ========================================
+
+def paginate_transactions_df(transactions_df, user_id, cursor=None, page_size=DEFAULT_PAGE_SIZE,
+                             ascending=False, search=None, start_date=None, end_date=None):
+    """
+    Keyset-paginate a user's transactions held in a DataFrame (CSV mode)
+
+    Mirrors the database managers' get_user_transactions_page so both storage
+    modes hand the dashboard the same (page, next_cursor) shape.
+    """
+    user_df = transactions_df[transactions_df['user_id'] == user_id]
+
+    if start_date is not None and end_date is not None:
+        user_df = user_df[
+            (user_df['transaction_date'] >= start_date) &
+            (user_df['transaction_date'] <= end_date)
+        ]
+
+    if search:
+        pattern = search.lower()
+        user_df = user_df[
+            user_df['category'].str.lower().str.contains(pattern, regex=False, na=False) |
+            user_df['merchant'].str.lower().str.contains(pattern, regex=False, na=False) |
+            user_df['description'].str.lower().str.contains(pattern, regex=False, na=False)
+        ]
+
+    if cursor:
+        cursor_date, cursor_id = pd.Timestamp(cursor[0]), cursor[1]
+        if ascending:
+            after_cursor = (user_df['transaction_date'] > cursor_date) | (
+                (user_df['transaction_date'] == cursor_date) & (user_df['transaction_id'] > cursor_id)
+            )
+        else:
+            after_cursor = (user_df['transaction_date'] < cursor_date) | (
+                (user_df['transaction_date'] == cursor_date) & (user_df['transaction_id'] < cursor_id)
+            )
+        user_df = user_df[after_cursor]
+
+    # Fetch one extra row to know whether another page exists
+    page = user_df.sort_values(
+        ['transaction_date', 'transaction_id'], ascending=ascending
+    ).head(page_size + 1)
+
+    next_cursor = None
+    if len(page) > page_size:
+        page = page.head(page_size)
+        last = page.iloc[-1]
+        next_cursor = (last['transaction_date'], last['transaction_id'])
+
+    return page, next_cursor
+
+
+def get_transactions_page(user_id, cursor=None, page_size=DEFAULT_PAGE_SIZE, ascending=False,
+                          search=None, start_date=None, end_date=None):
+    """
+    Get one page of a user's transactions from the configured storage
+
+    Returns:
+        tuple: (page: DataFrame, next_cursor: tuple or None)
+    """
+    db = get_db_manager()
+
+    if db is None:
+        user_df = get_transaction_index(TRANSACTIONS_CSV).user_range(user_id, start_date, end_date)
+        return paginate_transactions_df(
+            user_df, user_id, cursor, page_size, ascending, search, start_date, end_date
+        )
+
+    rows, next_cursor = db.get_user_transactions_page(
+        user_id, cursor, page_size, ascending, search,
+        _to_python_datetime(start_date), _to_python_datetime(end_date)
+    )
+    page = pd.DataFrame(rows)
+    if len(page) > 0:
+        page['transaction_date'] = pd.to_datetime(page['transaction_date'])
+    return page, next_cursor
+
+
+def _to_python_datetime(value):
+    """Convert pandas timestamps to datetime (sqlite3 only adapts the exact datetime type)"""
+    if value is None:
+        return None
+    return pd.Timestamp(value).to_pydatetime()
+
+
+# ========================================
+# WRITES
+# ========================================
+# Every write bumps the user's data version, invalidating only their caches.
+
+def add_transaction(user_id, category, merchant, amount, currency, description="", amount_usd=None):
+    """
+    Add a new transaction for a user
+
+    Returns:
+        tuple: (success: bool, message: str)
+    """
+    db = get_db_manager()
+
+    if db is not None:
+        success, _, message = db.add_transaction(user_id, amount, currency, category, merchant, description)
+        if success:
+            bump_data_version(user_id)
+        return success, message
+
+    # Generate new transaction ID (from the last row of the file)
+    last_id = get_transaction_index(TRANSACTIONS_CSV).last_transaction_id
+    number = int(last_id[1:]) + 1
+    new_id = f'T{number:05d}'
+
+    # Get current timestamp
+    now = datetime.now()
+
+    # Create new transaction with all required columns
+    new_transaction = {
+        'transaction_id': new_id,
+        'user_id': user_id,
+        'amount': amount,
+        'amount_usd': amount_usd if amount_usd is not None else amount,
+        'currency': currency,
+        'category': category,
+        'merchant': merchant,
+        'merchant_location': 'Unknown',  # Default value
+        'payment_method': 'card',  # Default value
+        'transaction_date': now.strftime('%Y-%m-%d %H:%M:%S'),
+        'is_fraud': 0,  # Not fraud
+        'fraud_type': 'none',  # No fraud
+        'description': description,
+        'day_of_week': now.strftime('%A'),
+        'hour': now.hour,
+        'month': now.month
+    }
+
+    # Append to the file and the index (no full rewrite or re-sort)
+    append_transactions(TRANSACTIONS_CSV, pd.DataFrame([new_transaction]))
+
+    bump_data_version(user_id)
+    return True, "Transaction added successfully!"
+
+
+def delete_transactions(transaction_ids, user_id):
+    """
+    Delete several transactions (only those that belong to the user)
+
+    Returns:
+        tuple: (deleted_count: int, message: str)
+    """
+    transaction_ids = set(transaction_ids)
+    if not transaction_ids:
+        return 0, "No transactions selected"
+
+    db = get_db_manager()
+
+    if db is not None:
+        # One DELETE ... WHERE user_id = ? AND transaction_id IN (...) for the whole selection
+        deleted_count = db.delete_transactions(transaction_ids, user_id)
+        if deleted_count > 0:
+            bump_data_version(user_id)
+        return deleted_count, f"Deleted {deleted_count} transaction(s)"
+
+    # Only the user's own transactions may be deleted (checked against the user's index slice)
+    user_df = get_transaction_index(TRANSACTIONS_CSV).user_range(user_id)
+    owned_ids = set(user_df.loc[user_df['transaction_id'].isin(transaction_ids), 'transaction_id'])
+    deleted_count = len(owned_ids)
+
+    if deleted_count > 0:
+        # Save once for the whole batch; the index is rebuilt from the rewritten file
+        transactions_df = pd.read_csv(TRANSACTIONS_CSV)
+        transactions_df[~transactions_df['transaction_id'].isin(owned_ids)].to_csv(TRANSACTIONS_CSV, index=False)
+
+        bump_data_version(user_id)
+
+    return deleted_count, f"Deleted {deleted_count} transaction(s)"
@@ -4,12 +4,6 @@ Users can register, login, and track their own finances
 """
 import streamlit as st
 import pandas as pd
-import numpy as np
-
-
-
-import plotly.express as px
-import plotly.graph_objects as go
 from datetime import datetime, timedelta
 import sys
 import os
@@ -17,16 +11,25 @@ import os
 # Add parent directory to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from config.config import RAW_DATA_DIR, PROCESSED_DATA_DIR, MODEL_PATHS
+# Heavy libraries (prophet, plotly) are imported inside the functions that use
+# them, so the login page and each new session start without paying for them
+from config.config import REPORT_CONFIG
 from src.currency.currency_converter import CurrencyConverter
-from src.budgeting.budget_recommender import BudgetRecommender
-from src.fraud_detection.fraud_detector import FraudDetector
-from prophet import Prophet
+from src.currency.rate_pipeline import get_rate_store
+from src.reporting.report_engine import get_report_engine, REPORT_FORMATS
+from src.reporting.batch_reports import find_prebuilt_report
+from concurrent.futures import TimeoutError as FutureTimeoutError
 import warnings
 warnings.filterwarnings('ignore')
 
 # Import authentication (support CSV + SQLite + PostgreSQL)
-from auth_sqlite import check_authentication, logout, get_current_user_id, get_current_user_email, AuthManager
+from auth_sqlite import check_authentication, logout, get_current_user_id, get_current_user_email, get_current_user_info
+from data_layer import (
+    get_user_transactions, get_converted_transactions, get_category_spending, get_daily_series, convert_totals,
+    get_transactions_page, add_transaction, delete_transactions, DEFAULT_PAGE_SIZE,
+    get_data_version, get_cache_stats, tracked_cache_data, get_monthly_spending,
+    get_export_batches, get_transaction_count
+)
 
 # Page configuration
 st.set_page_config(
@@ -623,107 +626,33 @@ if not check_authentication():
 
 # Initialize session state
 if 'currency_converter' not in st.session_state:
-    st.session_state.currency_converter = CurrencyConverter()
+    # Reads the rates stored by the FX pipeline (SQLite in CSV mode); the API is only a fallback
+    st.session_state.currency_converter = CurrencyConverter(rate_store=get_rate_store())
     st.session_state.currency_converter.fetch_rates()
 
 if 'budget_recommender' not in st.session_state:
-    st.session_state.budget_recommender = BudgetRecommender()
-
-@st.cache_data
-def load_data():
-    """Load all required data"""
-    users_df = pd.read_csv(RAW_DATA_DIR / 'users.csv')
-    transactions_df = pd.read_csv(RAW_DATA_DIR / 'transactions.csv')
-    transactions_df['transaction_date'] = pd.to_datetime(transactions_df['transaction_date'])
-
-    # Always use raw transactions for multi-user dashboard
-    # This ensures new transactions added via the interface appear immediately
-    return users_df, transactions_df
-
-def add_transaction(user_id, category, merchant, amount, currency, description=""):
-    """Add a new transaction for the current user"""
-    transactions_df = pd.read_csv(RAW_DATA_DIR / 'transactions.csv')
-
-    # Generate new transaction ID
-    last_id = transactions_df['transaction_id'].iloc[-1]
-    number = int(last_id[1:]) + 1
-    new_id = f'T{number:05d}'
-
-    # Get current timestamp
-    now = datetime.now()
-
-    # Convert to USD for amount_usd column
-    converter = st.session_state.currency_converter
-    amount_usd = converter.convert(amount, currency, 'USD')
-
-    # Create new transaction with all required columns
-    new_transaction = {
-        'transaction_id': new_id,
-        'user_id': user_id,
-        'amount': amount,
-        'amount_usd': amount_usd,
-        'currency': currency,
-        'category': category,
-        'merchant': merchant,
-        'merchant_location': 'Unknown',  # Default value
-        'payment_method': 'card',  # Default value
-        'transaction_date': now.strftime('%Y-%m-%d %H:%M:%S'),
-        'is_fraud': 0,  # Not fraud
-        'fraud_type': 'none',  # No fraud
-        'description': description,
-        'day_of_week': now.strftime('%A'),
-        'hour': now.hour,
-        'month': now.month
-    }
-
-    # Append
-    transactions_df = pd.concat([transactions_df, pd.DataFrame([new_transaction])], ignore_index=True)
-
-    # Save
-    transactions_df.to_csv(RAW_DATA_DIR / 'transactions.csv', index=False)
-
-    # Clear cache to reload data
-    st.cache_data.clear()
-
-    return True
-
-def delete_transaction(transaction_id, user_id):
-    """Delete a transaction (only if it belongs to the user)"""
-    transactions_df = pd.read_csv(RAW_DATA_DIR / 'transactions.csv')
-
-    # Check if transaction belongs to user
-    transaction = transactions_df[transactions_df['transaction_id'] == transaction_id]
-    if len(transaction) == 0:
-        return False, "Transaction not found"
-
-    if transaction.iloc[0]['user_id'] != user_id:
-        return False, "You can only delete your own transactions"
+    from src.budgeting.budget_recommender import BudgetRecommender
+    st.session_state.budget_recommender = BudgetRecommender(converter=st.session_state.currency_converter)
 
-    # Delete the transaction
-    transactions_df = transactions_df[transactions_df['transaction_id'] != transaction_id]
+@tracked_cache_data('forecast', ttl=3600, max_entries=1000)
+def forecast_user_spending(user_id, data_version, days_ahead=30):
+    """
+    Forecast user's spending for the next N days using Prophet
 
-    # Save
-    transactions_df.to_csv(RAW_DATA_DIR / 'transactions.csv', index=False)
+    Cached per (user, data version): only the user's own writes trigger a re-fit.
+    """
+    from prophet import Prophet
 
-    # Clear cache
-    st.cache_data.clear()
-
-    return True, "Transaction deleted successfully"
-
-@st.cache_data(ttl=3600)
-def forecast_user_spending(user_id, transactions_df, days_ahead=30):
-    """Forecast user's spending for the next N days using Prophet"""
     try:
-        # Filter user transactions
-        user_data = transactions_df[transactions_df['user_id'] == user_id].copy()
+        # Daily USD spending (same series as the Spending Trend chart)
+        daily_series = get_daily_series(user_id, 'USD', st.session_state.currency_converter)
 
-        if len(user_data) < 7:  # Need at least 7 days of data
-            return None, "Need at least 7 transactions for forecasting"
+        if (daily_series > 0).sum() < 7:  # Need at least 7 days of data
+            return None, "Need at least 7 days with transactions for forecasting"
 
         # Prepare data for Prophet (needs 'ds' and 'y' columns)
-        daily_spending = user_data.groupby(user_data['transaction_date'].dt.date)['amount_usd'].sum().reset_index()
+        daily_spending = daily_series.reset_index()
         daily_spending.columns = ['ds', 'y']
-        daily_spending['ds'] = pd.to_datetime(daily_spending['ds'])
 
         # Create and fit Prophet model
         model = Prophet(
@@ -746,14 +675,623 @@ def forecast_user_spending(user_id, transactions_df, days_ahead=30):
     except Exception as e:
         return None, str(e)
 
+@tracked_cache_data('budget_analysis', ttl=3600, max_entries=1000)
+def analyze_user_budget(user_id, data_version, currency, rates_version):
+    """
+    Run the budget analysis on a user's transaction history
+
+    Cached per (user, data version, currency, exchange rates). Returns None
+    when the user has no transactions yet.
+    """
+    user_history = get_user_transactions(user_id)
+    if len(user_history) == 0:
+        return None
+
+    # Already one user's rows: index by date so the analysis can slice recent months directly
+    recommender = st.session_state.budget_recommender
+    return recommender.analyze_user_spending(
+        recommender.prepare_user_transactions(user_history), user_id, months=3, target_currency=currency
+    )
+
+def render_overview_tab(user_id, user_info, currency, converter, start_date, end_date):
+    """Overview tab: key metrics, category charts, spending trend and recent transactions"""
+    import plotly.express as px
+    import plotly.graph_objects as go
+
+    user_transactions = get_converted_transactions(user_id, currency, converter, start_date, end_date)
+
+    st.subheader(f"📊 Financial Overview - {user_info['name']}")
+
+    if len(user_transactions) == 0:
+        st.info("No transactions found for this period. Add your first transaction in the 'Add Transaction' tab!")
+    else:
+        # Key metrics
+        col1, col2, col3, col4 = st.columns(4)
+
+        total_spent = user_transactions[f'amount_{currency}'].sum()
+        num_transactions = len(user_transactions)
+        avg_transaction = user_transactions[f'amount_{currency}'].mean()
+
+        with col1:
+            st.metric("Total Spending", f"{currency} {total_spent:,.2f}")
+        with col2:
+            st.metric("Transactions", f"{num_transactions:,}")
+        with col3:
+            st.metric("Avg. Transaction", f"{currency} {avg_transaction:,.2f}")
+        with col4:
+            monthly_income_converted = converter.convert(
+                user_info['monthly_income'], user_info['preferred_currency'], currency
+            )
+            st.metric("Monthly Income", f"{currency} {monthly_income_converted:,.2f}")
+
+        # Spending by category
+        col1, col2 = st.columns([2, 1])
+
+        with col1:
+            st.subheader("💸 Spending by Category")
+            category_df = get_category_spending(user_id, start_date, end_date)
+            category_spending = convert_totals(category_df, converter, currency).groupby(
+                category_df['category']
+            ).sum().sort_values(ascending=False)
+
+            # Muted & sophisticated color palette
+            category_colors = {
+                'Groceries': '#9ca3af',      # Slate gray - neutral, essential
+                'Utilities': '#7dd3fc',      # Light sky blue - reliable
+                'Rent': '#a78bfa',           # Soft purple - stability
+                'Healthcare': '#5eead4',     # Teal - medical, wellness
+                'Insurance': '#93c5fd',      # Soft blue - protection
+                'Transportation': '#fbbf24', # Warm yellow - movement
+                'Dining': '#fb923c',         # Warm orange - dining
+                'Entertainment': '#f472b6',  # Rose pink - fun, leisure
+                'Shopping': '#fda4af',       # Light coral - retail
+                'Travel': '#60a5fa',         # Medium blue - adventure
+                'Hobbies': '#c084fc',        # Lavender - creativity
+                'Savings': '#94a3b8',        # Slate blue - conservative growth
+                'Investment': '#818cf8',     # Indigo - wealth, prosperity
+                'Emergency Fund': '#f87171'  # Soft red - urgent
+            }
+
+            # Map colors to categories
+            bar_colors = [category_colors.get(cat, '#6b7280') for cat in category_spending.index]
+
+            fig = go.Figure(data=[
+                go.Bar(x=category_spending.index, y=category_spending.values,
+                       marker=dict(color=bar_colors))
+            ])
+            fig.update_layout(
+                title=f'Spending by Category ({currency})',
+                xaxis_title='Category',
+                yaxis_title=f'Amount ({currency})',
+                height=500,
+                dragmode=False,
+                plot_bgcolor='rgba(0,0,0,0)',
+                paper_bgcolor='rgba(0,0,0,0)',
+                margin=dict(l=50, r=50, t=80, b=50)
+            )
+            st.plotly_chart(fig, use_container_width=True, config={'displayModeBar': False})
+
+        with col2:
+            st.subheader("📊 Category Distribution")
+            # Use same category colors for consistency
+            pie_colors = [category_colors.get(cat, '#6b7280') for cat in category_spending.index]
+
+            fig = px.pie(
+                values=category_spending.values,
+                names=category_spending.index,
+                title='Spending Distribution',
+                color_discrete_sequence=pie_colors
+            )
+            fig.update_layout(
+                height=500,
+                dragmode=False,
+                plot_bgcolor='rgba(0,0,0,0)',
+                paper_bgcolor='rgba(0,0,0,0)',
+                margin=dict(l=20, r=20, t=80, b=20)
+            )
+            st.plotly_chart(fig, use_container_width=True, config={'displayModeBar': False})
+
+        # Spending over time
+        st.subheader("📅 Spending Trend")
+        daily_spending = get_daily_series(user_id, currency, converter, start_date, end_date).reset_index()
+        daily_spending.columns = ['Date', 'Amount']
+
+        # Soft coral line for spending trend
+        fig = px.line(
+            daily_spending,
+            x='Date',
+            y='Amount',
+            title=f'Daily Spending Trend ({currency})'
+        )
+        fig.update_traces(line=dict(color='#fb7185', width=3), fill='tozeroy', fillcolor='rgba(251, 113, 133, 0.15)')
+        fig.update_layout(
+            height=500,
+            dragmode=False,
+            plot_bgcolor='rgba(0,0,0,0)',
+            paper_bgcolor='rgba(0,0,0,0)',
+            margin=dict(l=50, r=50, t=80, b=50)
+        )
+        st.plotly_chart(fig, use_container_width=True, config={'displayModeBar': False})
+
+        # Recent transactions
+        st.subheader("📝 Recent Transactions")
+        recent_transactions = user_transactions.nlargest(10, 'transaction_date')[
+            ['transaction_date', 'category', 'merchant', f'amount_{currency}', 'description']
+        ].copy()
+        recent_transactions['transaction_date'] = recent_transactions['transaction_date'].dt.strftime('%Y-%m-%d %H:%M')
+
+        # Style the dataframe with purple theme
+        st.dataframe(
+            recent_transactions,
+            use_container_width=True,
+            column_config={
+                "transaction_date": st.column_config.TextColumn("Date", width="medium"),
+                "category": st.column_config.TextColumn("Category", width="medium"),
+                "merchant": st.column_config.TextColumn("Merchant", width="medium"),
+                f"amount_{currency}": st.column_config.NumberColumn(f"Amount ({currency})", format="%.2f"),
+                "description": st.column_config.TextColumn("Description", width="large")
+            }
+        )
+
+def render_add_transaction_tab(user_id, user_info, converter):
+    """Add Transaction tab"""
+    st.subheader("➕ Add New Transaction")
+
+    with st.form("add_transaction_form"):
+        col1, col2 = st.columns(2)
+
+        with col1:
+            category = st.selectbox("Category", [
+                'Groceries', 'Utilities', 'Rent', 'Healthcare', 'Insurance', 'Transportation',
+                'Dining', 'Entertainment', 'Shopping', 'Travel', 'Hobbies',
+                'Savings', 'Investment', 'Emergency Fund'
+            ])
+            merchant = st.text_input("Merchant/Store")
+
+        with col2:
+            amount = st.number_input("Amount", min_value=0.0, step=0.01)
+            trans_currency = st.selectbox("Currency", ['USD', 'IDR', 'CNY'], index=['USD', 'IDR', 'CNY'].index(user_info['preferred_currency']))
+
+        description = st.text_area("Description (optional)")
+
+        submitted = st.form_submit_button("Add Transaction")
+
+        if submitted:
+            if not merchant or amount <= 0:
+                st.error("Please fill in merchant and amount")
+            else:
+                amount_usd = converter.convert(amount, trans_currency, 'USD')
+                success, message = add_transaction(
+                    user_id, category, merchant, amount, trans_currency, description, amount_usd
+                )
+                if not success:
+                    st.error(message)
+                else:
+                    st.success("✅ Transaction added successfully!")
+                    st.balloons()
+                    # Rerun to refresh data
+                    st.rerun()
+
+def render_manage_tab(user_id, currency, converter, start_date, end_date):
+    """Manage Transactions tab: paginated grid with batch delete"""
+    # Only the count here; rows are read one page at a time below
+    transaction_count = get_transaction_count(user_id, start_date, end_date)
+
+    st.subheader("🗑️ Manage Your Transactions")
+    st.markdown("**Delete wrong or duplicate transactions - Select multiple to delete at once!**")
+
+    if transaction_count == 0:
+        st.info("No transactions to manage. Add your first transaction!")
+    else:
+        # Bulk delete feature
+        st.write(f"**Total Transactions:** {transaction_count}")
+
+        # Server-side search and sort
+        col1, col2 = st.columns([3, 1])
+        with col1:
+            search = st.text_input("🔍 Search category, merchant or description", key="manage_search")
+        with col2:
+            sort_order = st.selectbox("Sort", ['Newest first', 'Oldest first'], key="manage_sort")
+
+        # Keyset pagination: keep the cursor of every page visited so far.
+        # Changing the search, sort or period starts again from page 1.
+        page_query = (search, sort_order, str(start_date), str(end_date))
+        if st.session_state.get('manage_page_query') != page_query:
+            st.session_state['manage_page_query'] = page_query
+            st.session_state['manage_cursors'] = [None]
+
+        cursors = st.session_state['manage_cursors']
+        page_df, next_cursor = get_transactions_page(
+            user_id,
+            cursor=cursors[-1],
+            page_size=DEFAULT_PAGE_SIZE,
+            ascending=(sort_order == 'Oldest first'),
+            search=search or None,
+            start_date=start_date,
+            end_date=end_date
+        )
+
+        if len(page_df) == 0:
+            st.info("No transactions match your search.")
+        else:
+            # Convert only the rows on this page
+            try:
+                page_amounts = convert_totals(page_df, converter, currency, amount_column='amount')
+            except Exception:
+                page_amounts = page_df['amount']
+
+            # One editable grid per page: only the Delete column can be edited
+            grid_df = pd.DataFrame({
+                'Delete': False,
+                'Date': page_df['transaction_date'].dt.strftime('%Y-%m-%d %H:%M'),
+                'Category': page_df['category'],
+                'Merchant': page_df['merchant'],
+                'Amount': page_amounts.round(2),
+                'Description': page_df['description'].fillna('')
+            })
+            grid_df.index = page_df['transaction_id']
+
+            st.markdown(f"### 📋 Select Transactions to Delete (page {len(cursors)})")
+
+            edited_df = st.data_editor(
+                grid_df,
+                # A new key per page so ticks never carry over to other rows
+                key=f"manage_grid_{hash(tuple(grid_df.index))}",
+                hide_index=True,
+                use_container_width=True,
+                disabled=['Date', 'Category', 'Merchant', 'Amount', 'Description'],
+                column_config={
+                    "Delete": st.column_config.CheckboxColumn("Select", width="small"),
+                    "Date": st.column_config.TextColumn("📅 Date", width="medium"),
+                    "Category": st.column_config.TextColumn("📁 Category", width="medium"),
+                    "Merchant": st.column_config.TextColumn("🏪 Merchant", width="medium"),
+                    "Amount": st.column_config.NumberColumn(f"💰 Amount ({currency})", format="%.2f"),
+                    "Description": st.column_config.TextColumn("📝 Description", width="large")
+                }
+            )
+            selected_ids = set(edited_df.index[edited_df['Delete']])
+
+            # Page navigation
+            col1, col2, col3 = st.columns([1, 2, 1])
+            with col1:
+                if st.button("⬅️ Previous", disabled=len(cursors) == 1):
+                    cursors.pop()
+                    st.rerun()
+            with col3:
+                if st.button("Next ➡️", disabled=next_cursor is None):
+                    cursors.append(next_cursor)
+                    st.rerun()
+
+            # Bulk delete button
+            if len(selected_ids) > 0:
+                st.markdown(f"### ⚠️ **{len(selected_ids)} transaction(s) selected**")
+
+                col1, col2, col3 = st.columns([1, 2, 1])
+                with col2:
+                    if st.button(f"🗑️ DELETE {len(selected_ids)} SELECTED TRANSACTION(S)",
+                                type="primary",
+                                use_container_width=True):
+                        # Delete all selected transactions in one batch
+                        success_count, _ = delete_transactions(selected_ids, user_id)
+
+                        if success_count == len(selected_ids):
+                            st.success(f"✅ Successfully deleted {success_count} transaction(s)!")
+                            st.balloons()
+                            st.rerun()
+                        else:
+                            st.warning(f"Deleted {success_count} out of {len(selected_ids)} transactions")
+                            st.rerun()
+            else:
+                st.info("💡 **Tip:** Tick the Select column for the transactions you want to delete, then click the delete button.")
+
+def render_budget_tab(user_id, user_info, currency, converter):
+    """Budget Recommendations tab: 50/30/20 analysis and spending forecast"""
+    import plotly.graph_objects as go
+
+    st.subheader("💡 Budget Recommendations (50/30/20 Rule)")
+
+    # From the user's full history, not the sidebar period
+    analysis = analyze_user_budget(user_id, get_data_version(user_id), currency, converter.last_update)
+
+    if analysis is None:
+        st.info("Add some transactions first to see budget recommendations!")
+    else:
+        # Get recommendations
+        recommender = st.session_state.budget_recommender
+
+        if analysis:
+            recommendations = recommender.generate_recommendations(
+                {'amount': user_info['monthly_income'], 'currency': user_info['preferred_currency']},
+                analysis,
+                target_currency=currency
+            )
+
+            # Budget health score
+            col1, col2, col3, col4 = st.columns(4)
+            with col1:
+                score = recommendations['budget_health_score']['overall']
+                color = 'green' if score >= 70 else 'orange' if score >= 50 else 'red'
+                st.markdown(f"<div style='text-align: center;'><h1 style='color: {color};'>{score:.0f}</h1><p>Health Score</p></div>", unsafe_allow_html=True)
+            with col2:
+                st.metric("Essentials Score", f"{recommendations['budget_health_score']['essentials']:.0f}")
+            with col3:
+                st.metric("Discretionary Score", f"{recommendations['budget_health_score']['discretionary']:.0f}")
+            with col4:
+                st.metric("Savings Score", f"{recommendations['budget_health_score']['savings']:.0f}")
+
+            # Budget comparison
+            st.subheader("📊 Ideal vs Actual Spending")
+
+            categories = ['Essentials', 'Discretionary', 'Savings']
+            ideal_values = [
+                recommendations['ideal_budget']['essentials'],
+                recommendations['ideal_budget']['discretionary'],
+                recommendations['ideal_budget']['savings']
+            ]
+            actual_values = [
+                recommendations['current_spending']['essentials'],
+                recommendations['current_spending']['discretionary'],
+                recommendations['current_spending']['savings']
+            ]
+
+            # Soft mint for ideal, soft coral for actual (subtle contrast)
+            fig = go.Figure(data=[
+                go.Bar(name='Ideal (50/30/20)', x=categories, y=ideal_values, marker_color='#6ee7b7'),
+                go.Bar(name='Actual', x=categories, y=actual_values, marker_color='#fda4af')
+            ])
+            fig.update_layout(
+                barmode='group',
+                yaxis_title=f'Amount ({currency})',
+                height=500,
+                dragmode=False,
+                plot_bgcolor='rgba(0,0,0,0)',
+                paper_bgcolor='rgba(0,0,0,0)',
+                margin=dict(l=50, r=50, t=80, b=50)
+            )
+            st.plotly_chart(fig, use_container_width=True, config={'displayModeBar': False})
+
+            # Recommendations
+            st.subheader("💡 Personalized Recommendations")
+            for rec in recommendations['recommendations']:
+                if rec['type'] == 'critical':
+                    st.markdown(f"<div class='alert-box'>🚨 <strong>{rec['category'].title()}:</strong> {rec['message']}</div>", unsafe_allow_html=True)
+                elif rec['type'] == 'warning':
+                    st.markdown(f"<div class='warning-box'>⚠️ <strong>{rec['category'].title()}:</strong> {rec['message']}</div>", unsafe_allow_html=True)
+                else:
+                    st.markdown(f"<div class='success-box'>✅ <strong>{rec['category'].title()}:</strong> {rec['message']}</div>", unsafe_allow_html=True)
+
+            # SPENDING FORECAST
+            st.markdown("---")
+            st.subheader("📈 Spending Forecast - Next 30 Days")
+            st.markdown("**AI-powered prediction of your future expenses**")
+
+            with st.spinner("Generating forecast..."):
+                forecast_data, error = forecast_user_spending(user_id, get_data_version(user_id), days_ahead=30)
+
+            if error:
+                st.warning(f"⚠️ Cannot generate forecast: {error}")
+                st.info("💡 Tip: Add more transactions (at least 7 days of data) to see spending predictions!")
+            elif forecast_data is not None:
+                # Convert to user's currency
+                forecast_data['predicted'] = forecast_data['yhat'].apply(
+                    lambda x: converter.convert(x, 'USD', currency)
+                )
+                forecast_data['predicted_low'] = forecast_data['yhat_lower'].apply(
+                    lambda x: converter.convert(max(0, x), 'USD', currency)
+                )
+                forecast_data['predicted_high'] = forecast_data['yhat_upper'].apply(
+                    lambda x: converter.convert(x, 'USD', currency)
+                )
+
+                # Show total predicted spending
+                total_predicted = forecast_data['predicted'].sum()
+                avg_daily = total_predicted / 30
+
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    st.metric("📊 Predicted Total (30 days)", f"{currency} {total_predicted:,.2f}")
+                with col2:
+                    st.metric("📅 Average Daily Spending", f"{currency} {avg_daily:,.2f}")
+                with col3:
+                    monthly_income = converter.convert(user_info['monthly_income'], user_info['preferred_currency'], currency)
+                    remaining = monthly_income - total_predicted
+                    st.metric("💰 Expected Remaining", f"{currency} {remaining:,.2f}",
+                             delta=f"{(remaining/monthly_income)*100:.1f}% of income")
+
+                # Plot forecast
+                fig = go.Figure()
+
+                # Add prediction line
+                fig.add_trace(go.Scatter(
+                    x=forecast_data['ds'],
+                    y=forecast_data['predicted'],
+                    mode='lines',
+                    name='Predicted Spending',
+                    line=dict(color='#7c3aed', width=3)
+                ))
+
+                # Add confidence interval
+                fig.add_trace(go.Scatter(
+                    x=forecast_data['ds'],
+                    y=forecast_data['predicted_high'],
+                    mode='lines',
+                    name='Upper Bound',
+                    line=dict(width=0),
+                    showlegend=False
+                ))
+                fig.add_trace(go.Scatter(
+                    x=forecast_data['ds'],
+                    y=forecast_data['predicted_low'],
+                    fill='tonexty',
+                    mode='lines',
+                    name='Confidence Range',
+                    line=dict(width=0),
+                    fillcolor='rgba(124, 58, 237, 0.2)'
+                ))
+
+                fig.update_layout(
+                    title=f'Daily Spending Forecast - Next 30 Days ({currency})',
+                    xaxis_title='Date',
+                    yaxis_title=f'Predicted Spending ({currency})',
+                    hovermode='x unified',
+                    plot_bgcolor='rgba(0,0,0,0)',
+                    paper_bgcolor='rgba(0,0,0,0)',
+                    height=500,
+                    dragmode=False,
+                    margin=dict(l=50, r=50, t=80, b=50)
+                )
+
+                st.plotly_chart(fig, use_container_width=True, config={'displayModeBar': False})
+
+                st.success("✨ This prediction is based on your historical spending patterns using AI (Prophet model)")
+                st.caption("💡 The more data you have, the more accurate the predictions become!")
+
+def render_currency_tab(converter):
+    """Currency Converter tab"""
+    st.subheader("💱 Real-Time Currency Converter")
+
+    # Update rates button
+    if st.button("🔄 Update Exchange Rates"):
+        converter.fetch_rates(force_update=True)
+        st.success("✅ Exchange rates updated!")
+
+    # Display last update time
+    if converter.last_update:
+        st.info(f"Last updated: {converter.last_update.strftime('%Y-%m-%d %H:%M:%S')}")
+
+    # Converter interface
+    col1, col2, col3 = st.columns(3)
+
+    with col1:
+        amount_to_convert = st.number_input("Amount", value=100.0, min_value=0.0)
+    with col2:
+        from_currency = st.selectbox("From", ['USD', 'IDR', 'CNY'])
+    with col3:
+        to_currency = st.selectbox("To", ['USD', 'IDR', 'CNY'])
+
+    if st.button("Convert"):
+        converted_amount = converter.convert(amount_to_convert, from_currency, to_currency)
+        st.success(f"{amount_to_convert:,.2f} {from_currency} = {converted_amount:,.2f} {to_currency}")
+
+    # Exchange rate matrix
+    st.subheader("📊 Exchange Rate Matrix")
+    rate_matrix = converter.get_rate_matrix()
+    st.dataframe(rate_matrix, use_container_width=True)
+
+def show_report_download(future, label, file_name, fmt):
+    """Offer a background-rendered report for download once it is ready"""
+    try:
+        # Only a short poll, so a slow render never holds the script thread
+        data = future.result(timeout=REPORT_CONFIG['poll_seconds'])
+    except FutureTimeoutError:
+        st.info("⏳ Still generating...")
+        st.button("🔄 Check again", key=f"report_check_{fmt}_{file_name}")
+        return
+    except Exception as e:
+        st.error(f"Report generation failed: {e}")
+        return
+
+    mime, extension = REPORT_FORMATS[fmt]
+    st.download_button(label=label, data=data, file_name=f"{file_name}.{extension}", mime=mime)
+
+
+def render_reports_tab(user_id, user_info, currency, converter, start_date, end_date):
+    """Reports tab: export and summary statistics"""
+    user_transactions = get_converted_transactions(user_id, currency, converter, start_date, end_date)
+
+    st.subheader("📄 Export Reports")
+
+    if len(user_transactions) > 0:
+        engine = get_report_engine()
+        # Same user, range, currency, data and rates -> same cached report
+        report_key = (user_id, start_date, end_date, currency, get_data_version(user_id), converter.last_update)
+        file_stem = f"{user_id}_{start_date.strftime('%Y%m%d')}_{end_date.strftime('%Y%m%d')}"
+
+        col1, col2 = st.columns(2)
+
+        with col1:
+            # Export transaction data (written in chunks on a background worker).
+            # The request is remembered for this exact report only: another range,
+            # currency or data version needs a new click and never submits a job by itself.
+            export_key = report_key + ('csv',)
+            if st.button("📥 Export Transactions (CSV)"):
+                st.session_state['report_export_requested'] = export_key
+
+            if st.session_state.get('report_export_requested') == export_key:
+                # PostgreSQL streams the rows from a server-side cursor; other modes export the cached frame
+                batches = get_export_batches(user_id, currency, converter, start_date, end_date)
+                future = engine.submit_export(export_key, user_transactions if batches is None else batches)
+                show_report_download(future, "Download CSV", f"transactions_{file_stem}", 'csv')
+
+        with col2:
+            # Summary report from the monthly aggregates, rendered on a background worker
+            report_format = st.selectbox("Summary format", ['pdf', 'xlsx'], format_func=str.upper)
+            summary_key = report_key + (report_format,)
+            if st.button("📊 Generate Summary Report"):
+                st.session_state['report_summary_requested'] = summary_key
+
+            if st.session_state.get('report_summary_requested') == summary_key:
+                monthly_df = get_monthly_spending(user_id, start_date, end_date)
+                factors = converter.get_conversion_factors(monthly_df['currency'].unique(), currency)
+                meta = {
+                    'user_name': user_info['name'],
+                    'currency': currency,
+                    'period': f"{start_date.strftime('%Y-%m-%d')} to {end_date.strftime('%Y-%m-%d')}"
+                }
+                # Served straight from the nightly batch when it still matches the data
+                prebuilt = find_prebuilt_report(user_id, start_date, end_date, currency, report_format, monthly_df)
+                if prebuilt is not None and prebuilt.exists():
+                    mime, extension = REPORT_FORMATS[report_format]
+                    st.download_button(label=f"Download {report_format.upper()}", data=prebuilt.read_bytes(),
+                                       file_name=f"summary_{file_stem}.{extension}", mime=mime)
+                else:
+                    future = engine.submit_summary(summary_key, report_format, monthly_df, factors, meta)
+                    show_report_download(future, f"Download {report_format.upper()}", f"summary_{file_stem}", report_format)
+
+        # Display summary statistics
+        st.subheader("📈 Summary Statistics")
+
+        daily_series = get_daily_series(user_id, currency, converter, start_date, end_date)
+        if len(daily_series) > 0:
+            avg_daily = f"{currency} {daily_series.mean():,.2f}"
+            top_day = f"{daily_series.idxmax().strftime('%Y-%m-%d')} ({currency} {daily_series.max():,.2f})"
+        else:
+            avg_daily = top_day = 'N/A'
+
+        summary_stats = {
+            'Metric': [
+                'Total Transactions',
+                'Total Spending',
+                'Average Transaction',
+                'Most Frequent Category',
+                'Highest Single Transaction',
+                'Average Daily Spending',
+                'Highest Spending Day',
+                'Date Range'
+            ],
+            'Value': [
+                f"{len(user_transactions):,}",
+                f"{currency} {user_transactions[f'amount_{currency}'].sum():,.2f}",
+                f"{currency} {user_transactions[f'amount_{currency}'].mean():,.2f}",
+                user_transactions['category'].mode()[0] if len(user_transactions) > 0 else 'N/A',
+                f"{currency} {user_transactions[f'amount_{currency}'].max():,.2f}",
+                avg_daily,
+                top_day,
+                f"{start_date.strftime('%Y-%m-%d')} to {end_date.strftime('%Y-%m-%d')}"
+            ]
+        }
+
+        st.table(pd.DataFrame(summary_stats))
+    else:
+        st.info("No transactions to export. Add some transactions first!")
+
 def main():
     # Get current user
     user_id = get_current_user_id()
     user_email = get_current_user_email()
 
-    # Get user info early
-    auth = AuthManager()
-    user_info = auth.get_user_info(user_id)
+    # Get user info early (cached for the session, so widget reruns do no auth I/O)
+    user_info = get_current_user_info()
 
     if not user_info:
         st.error("User not found")
@@ -781,13 +1319,6 @@ def main():
         if st.button("Logout", type="primary"):
             logout()
 
-    # Load data
-    try:
-        users_df, transactions_df = load_data()
-    except Exception as e:
-        st.error(f"Error loading data: {str(e)}")
-        return
-
     # Sidebar
     st.sidebar.title("⚙️ Settings")
 
@@ -878,547 +1409,75 @@ def main():
         ['Last 7 Days', 'Last 30 Days', 'Last 3 Months', 'Last 6 Months', 'All Time', 'Custom']
     )
 
+    # Whole days, so the range (and the cache key built from it) is stable across reruns
+    today = pd.Timestamp(datetime.now()).normalize()
+    end_of_today = today + timedelta(days=1) - timedelta(seconds=1)
+
     if date_filter == 'Last 7 Days':
-        start_date = datetime.now() - timedelta(days=7)
-        end_date = datetime.now()
+        start_date = today - timedelta(days=7)
+        end_date = end_of_today
     elif date_filter == 'Last 30 Days':
-        start_date = datetime.now() - timedelta(days=30)
-        end_date = datetime.now()
+        start_date = today - timedelta(days=30)
+        end_date = end_of_today
     elif date_filter == 'Last 3 Months':
-        start_date = datetime.now() - timedelta(days=90)
-        end_date = datetime.now()
+        start_date = today - timedelta(days=90)
+        end_date = end_of_today
     elif date_filter == 'Last 6 Months':
-        start_date = datetime.now() - timedelta(days=180)
-        end_date = datetime.now()
+        start_date = today - timedelta(days=180)
+        end_date = end_of_today
     elif date_filter == 'Custom':
         col1, col2 = st.sidebar.columns(2)
         start_date = col1.date_input("From", datetime.now() - timedelta(days=90))
         end_date = col2.date_input("To", datetime.now())
         start_date = pd.to_datetime(start_date)
-        end_date = pd.to_datetime(end_date)
+        # Through the end of the "To" day, like the presets, so transaction
+        # queries and the day-based rollup queries cover the same days
+        end_date = pd.to_datetime(end_date) + timedelta(days=1) - timedelta(seconds=1)
     else:  # All Time
-        start_date = transactions_df['transaction_date'].min()
-        end_date = transactions_df['transaction_date'].max()
-
-    # Filter user transactions
-    user_transactions = transactions_df[
-        (transactions_df['user_id'] == user_id) &
-        (transactions_df['transaction_date'] >= start_date) &
-        (transactions_df['transaction_date'] <= end_date)
-    ].copy()
+        start_date = None
+        end_date = None
 
-
-    # Convert amounts to selected currency
-    converter = st.session_state.currency_converter
-    if len(user_transactions) > 0:
+    # All Time spans the user's own history
+    if start_date is None:
         try:
-            user_transactions = converter.convert_dataframe(
-                user_transactions,
-                amount_column='amount',
-                currency_column='currency',
-                target_currency=currency
-            )
+            user_history = get_user_transactions(user_id)
         except Exception as e:
-            st.sidebar.error(f"Currency conversion error: {str(e)}")
-            # Fallback: just add the column with original amounts
-            user_transactions[f'amount_{currency}'] = user_transactions['amount']
-
-        # Ensure the currency column exists (in case conversion didn't create it)
-        # This handles cases where convert_dataframe fails or returns without creating the column
-        if f'amount_{currency}' not in user_transactions.columns:
-            user_transactions[f'amount_{currency}'] = user_transactions['amount']
-
-    # Main content tabs
-    tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs([
-        "📊 Overview",
-        "➕ Add Transaction",
-        "🗑️ Manage Transactions",
-        "💡 Budget Recommendations",
-        "💱 Currency Converter",
-        "📄 Reports"
-    ])
-
-    # TAB 1: Overview
-    with tab1:
-        st.subheader(f"📊 Financial Overview - {user_info['name']}")
-
-        if len(user_transactions) == 0:
-            st.info("No transactions found for this period. Add your first transaction in the 'Add Transaction' tab!")
-        else:
-            # Key metrics
-            col1, col2, col3, col4 = st.columns(4)
+            st.error(f"Error loading data: {str(e)}")
+            return
 
-            total_spent = user_transactions[f'amount_{currency}'].sum()
-            num_transactions = len(user_transactions)
-            avg_transaction = user_transactions[f'amount_{currency}'].mean()
-
-            with col1:
-                st.metric("Total Spending", f"{currency} {total_spent:,.2f}")
-            with col2:
-                st.metric("Transactions", f"{num_transactions:,}")
-            with col3:
-                st.metric("Avg. Transaction", f"{currency} {avg_transaction:,.2f}")
-            with col4:
-                monthly_income_converted = converter.convert(
-                    user_info['monthly_income'], user_info['preferred_currency'], currency
-                )
-                st.metric("Monthly Income", f"{currency} {monthly_income_converted:,.2f}")
-
-            # Spending by category
-            col1, col2 = st.columns([2, 1])
-
-            with col1:
-                st.subheader("💸 Spending by Category")
-                category_spending = user_transactions.groupby('category')[f'amount_{currency}'].sum().sort_values(ascending=False)
-
-                # Muted & sophisticated color palette
-                category_colors = {
-                    'Groceries': '#9ca3af',      # Slate gray - neutral, essential
-                    'Utilities': '#7dd3fc',      # Light sky blue - reliable
-                    'Rent': '#a78bfa',           # Soft purple - stability
-                    'Healthcare': '#5eead4',     # Teal - medical, wellness
-                    'Insurance': '#93c5fd',      # Soft blue - protection
-                    'Transportation': '#fbbf24', # Warm yellow - movement
-                    'Dining': '#fb923c',         # Warm orange - dining
-                    'Entertainment': '#f472b6',  # Rose pink - fun, leisure
-                    'Shopping': '#fda4af',       # Light coral - retail
-                    'Travel': '#60a5fa',         # Medium blue - adventure
-                    'Hobbies': '#c084fc',        # Lavender - creativity
-                    'Savings': '#94a3b8',        # Slate blue - conservative growth
-                    'Investment': '#818cf8',     # Indigo - wealth, prosperity
-                    'Emergency Fund': '#f87171'  # Soft red - urgent
-                }
-
-                # Map colors to categories
-                bar_colors = [category_colors.get(cat, '#6b7280') for cat in category_spending.index]
-
-                fig = go.Figure(data=[
-                    go.Bar(x=category_spending.index, y=category_spending.values,
-                           marker=dict(color=bar_colors))
-                ])
-                fig.update_layout(
-                    title=f'Spending by Category ({currency})',
-                    xaxis_title='Category',
-                    yaxis_title=f'Amount ({currency})',
-                    height=500,
-                    dragmode=False,
-                    plot_bgcolor='rgba(0,0,0,0)',
-                    paper_bgcolor='rgba(0,0,0,0)',
-                    margin=dict(l=50, r=50, t=80, b=50)
-                )
-                st.plotly_chart(fig, use_container_width=True, config={'displayModeBar': False})
-
-            with col2:
-                st.subheader("📊 Category Distribution")
-                # Use same category colors for consistency
-                pie_colors = [category_colors.get(cat, '#6b7280') for cat in category_spending.index]
-
-                fig = px.pie(
-                    values=category_spending.values,
-                    names=category_spending.index,
-                    title='Spending Distribution',
-                    color_discrete_sequence=pie_colors
-                )
-                fig.update_layout(
-                    height=500,
-                    dragmode=False,
-                    plot_bgcolor='rgba(0,0,0,0)',
-                    paper_bgcolor='rgba(0,0,0,0)',
-                    margin=dict(l=20, r=20, t=80, b=20)
-                )
-                st.plotly_chart(fig, use_container_width=True, config={'displayModeBar': False})
-
-            # Spending over time
-            st.subheader("📅 Spending Trend")
-            daily_spending = user_transactions.groupby(
-                user_transactions['transaction_date'].dt.date
-            )[f'amount_{currency}'].sum().reset_index()
-            daily_spending.columns = ['Date', 'Amount']
-
-            # Soft coral line for spending trend
-            fig = px.line(
-                daily_spending,
-                x='Date',
-                y='Amount',
-                title=f'Daily Spending Trend ({currency})'
-            )
-            fig.update_traces(line=dict(color='#fb7185', width=3), fill='tozeroy', fillcolor='rgba(251, 113, 133, 0.15)')
-            fig.update_layout(
-                height=500,
-                dragmode=False,
-                plot_bgcolor='rgba(0,0,0,0)',
-                paper_bgcolor='rgba(0,0,0,0)',
-                margin=dict(l=50, r=50, t=80, b=50)
-            )
-            st.plotly_chart(fig, use_container_width=True, config={'displayModeBar': False})
+        if len(user_history) > 0:
+            start_date = user_history['transaction_date'].min()
+            end_date = user_history['transaction_date'].max()
+        else:
+            start_date = end_date = pd.Timestamp(datetime.now())
 
-            # Recent transactions
-            st.subheader("📝 Recent Transactions")
-            recent_transactions = user_transactions.nlargest(10, 'transaction_date')[
-                ['transaction_date', 'category', 'merchant', f'amount_{currency}', 'description']
-            ].copy()
-            recent_transactions['transaction_date'] = recent_transactions['transaction_date'].dt.strftime('%Y-%m-%d %H:%M')
+    converter = st.session_state.currency_converter
 
-            # Style the dataframe with purple theme
+    # Cache effectiveness (hits/misses since the server started)
+    with st.sidebar.expander("🗄️ Cache Statistics"):
+        cache_stats = get_cache_stats()
+        if cache_stats:
             st.dataframe(
-                recent_transactions,
+                pd.DataFrame(cache_stats).T.astype({'hits': int, 'misses': int}),
                 use_container_width=True,
-                column_config={
-                    "transaction_date": st.column_config.TextColumn("Date", width="medium"),
-                    "category": st.column_config.TextColumn("Category", width="medium"),
-                    "merchant": st.column_config.TextColumn("Merchant", width="medium"),
-                    f"amount_{currency}": st.column_config.NumberColumn(f"Amount ({currency})", format="%.2f"),
-                    "description": st.column_config.TextColumn("Description", width="large")
-                }
+                column_config={"hit_ratio": st.column_config.NumberColumn("Hit Ratio", format="%.2f")}
             )
-
-    # TAB 2: Add Transaction
-    with tab2:
-        st.subheader("➕ Add New Transaction")
-
-        with st.form("add_transaction_form"):
-            col1, col2 = st.columns(2)
-
-            with col1:
-                category = st.selectbox("Category", [
-                    'Groceries', 'Utilities', 'Rent', 'Healthcare', 'Insurance', 'Transportation',
-                    'Dining', 'Entertainment', 'Shopping', 'Travel', 'Hobbies',
-                    'Savings', 'Investment', 'Emergency Fund'
-                ])
-                merchant = st.text_input("Merchant/Store")
-
-            with col2:
-                amount = st.number_input("Amount", min_value=0.0, step=0.01)
-                trans_currency = st.selectbox("Currency", ['USD', 'IDR', 'CNY'], index=['USD', 'IDR', 'CNY'].index(user_info['preferred_currency']))
-
-            description = st.text_area("Description (optional)")
-
-            submitted = st.form_submit_button("Add Transaction")
-
-            if submitted:
-                if not merchant or amount <= 0:
-                    st.error("Please fill in merchant and amount")
-                else:
-                    success = add_transaction(user_id, category, merchant, amount, trans_currency, description)
-                    if success:
-                        st.success("✅ Transaction added successfully!")
-                        st.balloons()
-                        # Rerun to refresh data
-                        st.rerun()
-
-    # TAB 3: Manage Transactions (Bulk Delete)
-    with tab3:
-        st.subheader("🗑️ Manage Your Transactions")
-        st.markdown("**Delete wrong or duplicate transactions - Select multiple to delete at once!**")
-
-        if len(user_transactions) == 0:
-            st.info("No transactions to manage. Add your first transaction!")
         else:
-            # Bulk delete feature
-            st.write(f"**Total Transactions:** {len(user_transactions)}")
-
-            # Create transaction display dataframe
-            display_df = user_transactions.sort_values('transaction_date', ascending=False).copy()
-            display_df['Select'] = False
-            display_df['Date'] = display_df['transaction_date'].dt.strftime('%Y-%m-%d %H:%M')
-            display_df['Amount'] = display_df[f'amount_{currency}'].apply(lambda x: f"{currency} {x:,.2f}")
-
-            # Show only relevant columns
-            display_columns = ['Date', 'category', 'merchant', 'Amount', 'description']
-
-            # Create selection interface
-            st.markdown("### 📋 Select Transactions to Delete")
-
-            # Multi-select using checkboxes
-            selected_ids = []
-
-            for idx, row in display_df.iterrows():
-                col1, col2, col3, col4, col5, col6 = st.columns([0.5, 2, 1.5, 1.5, 2, 2])
-
-                with col1:
-                    # Checkbox for selection
-                    is_selected = st.checkbox("Select", key=f"select_{row['transaction_id']}", label_visibility="collapsed")
-                    if is_selected:
-                        selected_ids.append(row['transaction_id'])
-
-                with col2:
-                    st.markdown(f"**📅 {row['Date']}**")
-                with col3:
-                    st.markdown(f"📁 {row['category']}")
-                with col4:
-                    st.markdown(f"🏪 {row['merchant']}")
-                with col5:
-                    st.markdown(f"**💰 {row['Amount']}**")
-                with col6:
-                    if row['description'] and row['description'] != '':
-                        st.caption(f"📝 {row['description']}")
-
-                st.markdown("---")
-
-            # Bulk delete button
-            if len(selected_ids) > 0:
-                st.markdown(f"### ⚠️ **{len(selected_ids)} transaction(s) selected**")
-
-                col1, col2, col3 = st.columns([1, 2, 1])
-                with col2:
-                    if st.button(f"🗑️ DELETE {len(selected_ids)} SELECTED TRANSACTION(S)",
-                                type="primary",
-                                use_container_width=True):
-                        # Delete all selected transactions
-                        success_count = 0
-                        for trans_id in selected_ids:
-                            success, _ = delete_transaction(trans_id, user_id)
-                            if success:
-                                success_count += 1
-
-                        if success_count == len(selected_ids):
-                            st.success(f"✅ Successfully deleted {success_count} transaction(s)!")
-                            st.balloons()
-                            st.rerun()
-                        else:
-                            st.warning(f"Deleted {success_count} out of {len(selected_ids)} transactions")
-                            st.rerun()
-            else:
-                st.info("💡 **Tip:** Check the box next to transactions you want to delete, then click the delete button.")
-
-    # TAB 4: Budget Recommendations
-    with tab4:
-        st.subheader("💡 Budget Recommendations (50/30/20 Rule)")
-
-        if len(user_transactions) == 0:
-            st.info("Add some transactions first to see budget recommendations!")
-        else:
-            # Get analysis and recommendations
-            recommender = st.session_state.budget_recommender
-            analysis = recommender.analyze_user_spending(transactions_df, user_id, months=3, target_currency=currency)
-
-            if analysis:
-                recommendations = recommender.generate_recommendations(
-                    {'amount': user_info['monthly_income'], 'currency': user_info['preferred_currency']},
-                    analysis,
-                    target_currency=currency
-                )
-
-                # Budget health score
-                col1, col2, col3, col4 = st.columns(4)
-                with col1:
-                    score = recommendations['budget_health_score']['overall']
-                    color = 'green' if score >= 70 else 'orange' if score >= 50 else 'red'
-                    st.markdown(f"<div style='text-align: center;'><h1 style='color: {color};'>{score:.0f}</h1><p>Health Score</p></div>", unsafe_allow_html=True)
-                with col2:
-                    st.metric("Essentials Score", f"{recommendations['budget_health_score']['essentials']:.0f}")
-                with col3:
-                    st.metric("Discretionary Score", f"{recommendations['budget_health_score']['discretionary']:.0f}")
-                with col4:
-                    st.metric("Savings Score", f"{recommendations['budget_health_score']['savings']:.0f}")
-
-                # Budget comparison
-                st.subheader("📊 Ideal vs Actual Spending")
-
-                categories = ['Essentials', 'Discretionary', 'Savings']
-                ideal_values = [
-                    recommendations['ideal_budget']['essentials'],
-                    recommendations['ideal_budget']['discretionary'],
-                    recommendations['ideal_budget']['savings']
-                ]
-                actual_values = [
-                    recommendations['current_spending']['essentials'],
-                    recommendations['current_spending']['discretionary'],
-                    recommendations['current_spending']['savings']
-                ]
-
-                # Soft mint for ideal, soft coral for actual (subtle contrast)
-                fig = go.Figure(data=[
-                    go.Bar(name='Ideal (50/30/20)', x=categories, y=ideal_values, marker_color='#6ee7b7'),
-                    go.Bar(name='Actual', x=categories, y=actual_values, marker_color='#fda4af')
-                ])
-                fig.update_layout(
-                    barmode='group',
-                    yaxis_title=f'Amount ({currency})',
-                    height=500,
-                    dragmode=False,
-                    plot_bgcolor='rgba(0,0,0,0)',
-                    paper_bgcolor='rgba(0,0,0,0)',
-                    margin=dict(l=50, r=50, t=80, b=50)
-                )
-                st.plotly_chart(fig, use_container_width=True, config={'displayModeBar': False})
-
-                # Recommendations
-                st.subheader("💡 Personalized Recommendations")
-                for rec in recommendations['recommendations']:
-                    if rec['type'] == 'critical':
-                        st.markdown(f"<div class='alert-box'>🚨 <strong>{rec['category'].title()}:</strong> {rec['message']}</div>", unsafe_allow_html=True)
-                    elif rec['type'] == 'warning':
-                        st.markdown(f"<div class='warning-box'>⚠️ <strong>{rec['category'].title()}:</strong> {rec['message']}</div>", unsafe_allow_html=True)
-                    else:
-                        st.markdown(f"<div class='success-box'>✅ <strong>{rec['category'].title()}:</strong> {rec['message']}</div>", unsafe_allow_html=True)
-
-                # SPENDING FORECAST
-                st.markdown("---")
-                st.subheader("📈 Spending Forecast - Next 30 Days")
-                st.markdown("**AI-powered prediction of your future expenses**")
-
-                with st.spinner("Generating forecast..."):
-                    forecast_data, error = forecast_user_spending(user_id, transactions_df, days_ahead=30)
-
-                if error:
-                    st.warning(f"⚠️ Cannot generate forecast: {error}")
-                    st.info("💡 Tip: Add more transactions (at least 7 days of data) to see spending predictions!")
-                elif forecast_data is not None:
-                    # Convert to user's currency
-                    forecast_data['predicted'] = forecast_data['yhat'].apply(
-                        lambda x: converter.convert(x, 'USD', currency)
-                    )
-                    forecast_data['predicted_low'] = forecast_data['yhat_lower'].apply(
-                        lambda x: converter.convert(max(0, x), 'USD', currency)
-                    )
-                    forecast_data['predicted_high'] = forecast_data['yhat_upper'].apply(
-                        lambda x: converter.convert(x, 'USD', currency)
-                    )
-
-                    # Show total predicted spending
-                    total_predicted = forecast_data['predicted'].sum()
-                    avg_daily = total_predicted / 30
-
-                    col1, col2, col3 = st.columns(3)
-                    with col1:
-                        st.metric("📊 Predicted Total (30 days)", f"{currency} {total_predicted:,.2f}")
-                    with col2:
-                        st.metric("📅 Average Daily Spending", f"{currency} {avg_daily:,.2f}")
-                    with col3:
-                        monthly_income = converter.convert(user_info['monthly_income'], user_info['preferred_currency'], currency)
-                        remaining = monthly_income - total_predicted
-                        st.metric("💰 Expected Remaining", f"{currency} {remaining:,.2f}",
-                                 delta=f"{(remaining/monthly_income)*100:.1f}% of income")
-
-                    # Plot forecast
-                    fig = go.Figure()
-
-                    # Add prediction line
-                    fig.add_trace(go.Scatter(
-                        x=forecast_data['ds'],
-                        y=forecast_data['predicted'],
-                        mode='lines',
-                        name='Predicted Spending',
-                        line=dict(color='#7c3aed', width=3)
-                    ))
-
-                    # Add confidence interval
-                    fig.add_trace(go.Scatter(
-                        x=forecast_data['ds'],
-                        y=forecast_data['predicted_high'],
-                        mode='lines',
-                        name='Upper Bound',
-                        line=dict(width=0),
-                        showlegend=False
-                    ))
-                    fig.add_trace(go.Scatter(
-                        x=forecast_data['ds'],
-                        y=forecast_data['predicted_low'],
-                        fill='tonexty',
-                        mode='lines',
-                        name='Confidence Range',
-                        line=dict(width=0),
-                        fillcolor='rgba(124, 58, 237, 0.2)'
-                    ))
-
-                    fig.update_layout(
-                        title=f'Daily Spending Forecast - Next 30 Days ({currency})',
-                        xaxis_title='Date',
-                        yaxis_title=f'Predicted Spending ({currency})',
-                        hovermode='x unified',
-                        plot_bgcolor='rgba(0,0,0,0)',
-                        paper_bgcolor='rgba(0,0,0,0)',
-                        height=500,
-                        dragmode=False,
-                        margin=dict(l=50, r=50, t=80, b=50)
-                    )
-
-                    st.plotly_chart(fig, use_container_width=True, config={'displayModeBar': False})
-
-                    st.success("✨ This prediction is based on your historical spending patterns using AI (Prophet model)")
-                    st.caption("💡 The more data you have, the more accurate the predictions become!")
-
-    # TAB 5: Currency Converter
-    with tab5:
-        st.subheader("💱 Real-Time Currency Converter")
-
-        # Update rates button
-        if st.button("🔄 Update Exchange Rates"):
-            converter.fetch_rates(force_update=True)
-            st.success("✅ Exchange rates updated!")
-
-        # Display last update time
-        if converter.last_update:
-            st.info(f"Last updated: {converter.last_update.strftime('%Y-%m-%d %H:%M:%S')}")
-
-        # Converter interface
-        col1, col2, col3 = st.columns(3)
-
-        with col1:
-            amount_to_convert = st.number_input("Amount", value=100.0, min_value=0.0)
-        with col2:
-            from_currency = st.selectbox("From", ['USD', 'IDR', 'CNY'])
-        with col3:
-            to_currency = st.selectbox("To", ['USD', 'IDR', 'CNY'])
-
-        if st.button("Convert"):
-            converted_amount = converter.convert(amount_to_convert, from_currency, to_currency)
-            st.success(f"{amount_to_convert:,.2f} {from_currency} = {converted_amount:,.2f} {to_currency}")
-
-        # Exchange rate matrix
-        st.subheader("📊 Exchange Rate Matrix")
-        rate_matrix = converter.get_rate_matrix()
-        st.dataframe(rate_matrix, use_container_width=True)
-
-    # TAB 6: Reports
-    with tab6:
-        st.subheader("📄 Export Reports")
-
-        if len(user_transactions) > 0:
-            col1, col2 = st.columns(2)
-
-            with col1:
-                # Export transaction data
-                if st.button("📥 Export Transactions (CSV)"):
-                    csv = user_transactions.to_csv(index=False)
-                    st.download_button(
-                        label="Download CSV",
-                        data=csv,
-                        file_name=f"transactions_{user_id}_{datetime.now().strftime('%Y%m%d')}.csv",
-                        mime="text/csv"
-                    )
-
-            with col2:
-                # Export summary report
-                if st.button("📊 Generate Summary Report"):
-                    st.success("Report generation feature coming soon!")
-
-            # Display summary statistics
-            st.subheader("📈 Summary Statistics")
-
-            summary_stats = {
-                'Metric': [
-                    'Total Transactions',
-                    'Total Spending',
-                    'Average Transaction',
-                    'Most Frequent Category',
-                    'Highest Single Transaction',
-                    'Date Range'
-                ],
-                'Value': [
-                    f"{len(user_transactions):,}",
-                    f"{currency} {user_transactions[f'amount_{currency}'].sum():,.2f}",
-                    f"{currency} {user_transactions[f'amount_{currency}'].mean():,.2f}",
-                    user_transactions['category'].mode()[0] if len(user_transactions) > 0 else 'N/A',
-                    f"{currency} {user_transactions[f'amount_{currency}'].max():,.2f}",
-                    f"{start_date.strftime('%Y-%m-%d')} to {end_date.strftime('%Y-%m-%d')}"
-                ]
-            }
-
-            st.table(pd.DataFrame(summary_stats))
-        else:
-            st.info("No transactions to export. Add some transactions first!")
+            st.caption("No cached reads yet")
+
+    # Section navigation: unlike st.tabs, only the selected section is computed
+    sections = {
+        "📊 Overview": lambda: render_overview_tab(user_id, user_info, currency, converter, start_date, end_date),
+        "➕ Add Transaction": lambda: render_add_transaction_tab(user_id, user_info, converter),
+        "🗑️ Manage Transactions": lambda: render_manage_tab(user_id, currency, converter, start_date, end_date),
+        "💡 Budget Recommendations": lambda: render_budget_tab(user_id, user_info, currency, converter),
+        "💱 Currency Converter": lambda: render_currency_tab(converter),
+        "📄 Reports": lambda: render_reports_tab(user_id, user_info, currency, converter, start_date, end_date)
+    }
+    selected_section = st.radio(
+        "Section", list(sections), horizontal=True, label_visibility="collapsed", key="active_section"
+    )
+    sections[selected_section]()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,129 @@
+"""
+User-Partitioned Transaction Index
+In-memory index over the transactions CSV, shared by every dashboard session in the process
+"""
+import numpy as np
+import pandas as pd
+import threading
+import os
+
+
+class TransactionIndex:
+    """
+    Transactions sorted by (user_id, transaction_date) with per-user offset ranges
+
+    A user's rows are the contiguous block frame[start:stop], found with one
+    dict lookup; a date range inside it is found by binary search. Appended
+    rows go to a small pending buffer that is merged into the sorted frame
+    once it grows past MERGE_THRESHOLD, so an append never re-sorts the file.
+
+    All state lives in one tuple that is swapped atomically, so readers on
+    other script threads never see a half-updated index.
+    """
+
+    MERGE_THRESHOLD = 1000
+
+    def __init__(self, transactions_df, source_mtime=None):
+        self.source_mtime = source_mtime
+        self.columns = list(transactions_df.columns)
+        self.last_transaction_id = transactions_df['transaction_id'].iloc[-1] if len(transactions_df) > 0 else None
+        self._state = self._build(transactions_df, transactions_df.iloc[0:0])
+
+    @staticmethod
+    def _build(transactions_df, pending_df):
+        """Sort the rows and compute each user's [start, stop) offsets"""
+        frame = transactions_df.sort_values(['user_id', 'transaction_date'], kind='stable').reset_index(drop=True)
+
+        user_ids = frame['user_id'].to_numpy()
+        if len(user_ids) > 0:
+            starts = np.flatnonzero(np.r_[True, user_ids[1:] != user_ids[:-1]])
+            stops = np.r_[starts[1:], len(user_ids)]
+            offsets = dict(zip(user_ids[starts], zip(starts, stops)))
+        else:
+            offsets = {}
+
+        return frame, offsets, frame['transaction_date'].to_numpy(), pending_df
+
+    def __len__(self):
+        frame, _, _, pending_df = self._state
+        return len(frame) + len(pending_df)
+
+    def user_range(self, user_id, start_date=None, end_date=None):
+        """
+        Get one user's transactions, optionally limited to [start_date, end_date]
+
+        Returns:
+            DataFrame: The user's rows sorted by transaction_date
+        """
+        frame, offsets, dates, pending_df = self._state
+
+        start, stop = offsets.get(user_id, (0, 0))
+        user_dates = dates[start:stop]
+        low, high = 0, len(user_dates)
+        if start_date is not None:
+            low = np.searchsorted(user_dates, np.datetime64(pd.Timestamp(start_date)), side='left')
+        if end_date is not None:
+            high = np.searchsorted(user_dates, np.datetime64(pd.Timestamp(end_date)), side='right')
+        user_df = frame.iloc[start + low:start + high]
+
+        if len(pending_df) > 0:
+            pending_rows = pending_df[pending_df['user_id'] == user_id]
+            if start_date is not None:
+                pending_rows = pending_rows[pending_rows['transaction_date'] >= start_date]
+            if end_date is not None:
+                pending_rows = pending_rows[pending_rows['transaction_date'] <= end_date]
+            if len(pending_rows) > 0:
+                user_df = pd.concat([user_df, pending_rows]).sort_values('transaction_date', kind='stable')
+
+        return user_df
+
+    def append(self, rows_df):
+        """Add new rows (transaction_date already parsed) without re-sorting the index"""
+        frame, offsets, dates, pending_df = self._state
+        pending_df = pd.concat([pending_df, rows_df], ignore_index=True)
+
+        if len(pending_df) > self.MERGE_THRESHOLD:
+            self._state = self._build(pd.concat([frame, pending_df], ignore_index=True), pending_df.iloc[0:0])
+        else:
+            self._state = (frame, offsets, dates, pending_df)
+
+        self.last_transaction_id = rows_df['transaction_id'].iloc[-1]
+
+
+# Process-wide instance, rebuilt when the CSV changes outside this process
+_transaction_index = None
+_transaction_index_lock = threading.Lock()
+
+
+def get_transaction_index(csv_path):
+    """Get the shared index for a transactions CSV, (re)building it if the file changed"""
+    global _transaction_index
+    mtime = os.path.getmtime(csv_path)
+
+    with _transaction_index_lock:
+        if _transaction_index is None or _transaction_index.source_mtime != mtime:
+            transactions_df = pd.read_csv(csv_path)
+            transactions_df['transaction_date'] = pd.to_datetime(transactions_df['transaction_date'])
+            _transaction_index = TransactionIndex(transactions_df, source_mtime=mtime)
+        return _transaction_index
+
+
+def append_transactions(csv_path, rows_df):
+    """
+    Append rows to the transactions CSV and to the shared index
+
+    The file is appended to rather than rewritten, and the index absorbs the
+    rows incrementally instead of being rebuilt from the file.
+    """
+    index = get_transaction_index(csv_path)
+
+    with _transaction_index_lock:
+        rows_df = rows_df.reindex(columns=index.columns)
+        rows_df.to_csv(csv_path, mode='a', header=False, index=False)
+
+        parsed_rows = rows_df.copy()
+        parsed_rows['transaction_date'] = pd.to_datetime(parsed_rows['transaction_date'])
+        index.append(parsed_rows)
+
+        # Our own write: keep the index instead of rebuilding it on the next read
+        index.source_mtime = os.path.getmtime(csv_path)
@@ -0,0 +1,150 @@
+"""
+User Lookup Index
+In-memory index over the users CSV, shared by every dashboard session in the process
+"""
+import pandas as pd
+import threading
+import os
+
+USER_COLUMNS = ['user_id', 'name', 'email', 'password_hash', 'monthly_income', 'preferred_currency']
+
+
+class UserIndex:
+    """
+    User records keyed by lower-cased email and by user_id
+
+    Both maps point into one list of records, so login, email checks and
+    profile lookups are a single dict lookup instead of a scan of the file.
+    As with the original CSV filters, the first row wins when an email or
+    user_id appears more than once.
+    """
+
+    def __init__(self, users_df, source_mtime=None):
+        self.source_mtime = source_mtime
+        self.columns = list(users_df.columns) if len(users_df.columns) > 0 else list(USER_COLUMNS)
+        self._records = []
+        self._by_email = {}
+        self._by_id = {}
+        self.last_user_id = None
+
+        for record in users_df.to_dict('records'):
+            self._add(record)
+
+    def _add(self, record):
+        """Register one record in both maps"""
+        position = len(self._records)
+        self._records.append(record)
+        self._by_email.setdefault(str(record['email']).lower(), position)
+        self._by_id.setdefault(record['user_id'], position)
+        self.last_user_id = record['user_id']
+
+    def __len__(self):
+        return len(self._records)
+
+    def get_by_email(self, email):
+        """Get a user record by email (case-insensitive), or None"""
+        position = self._by_email.get(email.lower())
+        return dict(self._records[position]) if position is not None else None
+
+    def get_by_id(self, user_id):
+        """Get a user record by user_id, or None"""
+        position = self._by_id.get(user_id)
+        return dict(self._records[position]) if position is not None else None
+
+    def email_exists(self, email):
+        """Check if an email (case-insensitive) is registered"""
+        return email.lower() in self._by_email
+
+    def next_user_id(self):
+        """Generate the user ID following the last row of the file"""
+        if self.last_user_id is None:
+            return 'U00001'
+
+        number = int(self.last_user_id[1:]) + 1
+        return f'U{number:05d}'
+
+    def append(self, record):
+        """Add a newly registered user without rebuilding the maps"""
+        self._add(record)
+
+    def update(self, user_id, fields):
+        """Change fields of the record for this user_id (email is not re-keyed)"""
+        position = self._by_id.get(user_id)
+        if position is not None:
+            self._records[position].update(fields)
+
+
+# Process-wide instance, rebuilt when the CSV changes outside this process
+_user_index = None
+_user_index_lock = threading.Lock()
+
+
+def get_user_index(csv_path):
+    """Get the shared index for a users CSV, (re)building it if the file changed"""
+    global _user_index
+    mtime = os.path.getmtime(csv_path) if os.path.exists(csv_path) else None
+
+    with _user_index_lock:
+        if _user_index is None or _user_index.source_mtime != mtime:
+            users_df = pd.read_csv(csv_path) if mtime is not None else pd.DataFrame(columns=USER_COLUMNS)
+            _user_index = UserIndex(users_df, source_mtime=mtime)
+        return _user_index
+
+
+def append_user(csv_path, record):
+    """
+    Append one user to the users CSV and to the shared index
+
+    The file is appended to rather than rewritten; it is only created (with
+    a header) when it does not exist yet, and rewritten once with a wider
+    header when the record has fields the file lacks (e.g. password_hash in
+    a users.csv exported without it).
+    """
+    index = get_user_index(csv_path)
+
+    with _user_index_lock:
+        file_exists = os.path.exists(csv_path)
+        new_columns = [column for column in record if column not in index.columns]
+        if new_columns:
+            index.columns.extend(new_columns)
+            if file_exists:
+                users_df = pd.read_csv(csv_path).reindex(columns=index.columns)
+                users_df.to_csv(csv_path, index=False)
+
+        row_df = pd.DataFrame([record]).reindex(columns=index.columns)
+        row_df.to_csv(csv_path, mode='a', header=not file_exists, index=False)
+
+        index.append(row_df.iloc[0].to_dict())
+
+        # Our own write: keep the index instead of rebuilding it on the next read
+        index.source_mtime = os.path.getmtime(csv_path)
+
+
+def update_user(csv_path, user_id, **fields):
+    """
+    Change fields of an existing user in the users CSV and the shared index
+
+    Unlike append_user this rewrites the file, so it is meant for rare
+    updates such as upgrading a password hash.
+
+    Returns:
+        bool: True if the user was found and updated
+    """
+    index = get_user_index(csv_path)
+
+    with _user_index_lock:
+        users_df = pd.read_csv(csv_path)
+        mask = users_df['user_id'] == user_id
+        if not mask.any():
+            return False
+
+        for column, value in fields.items():
+            users_df.loc[mask, column] = value
+        users_df.to_csv(csv_path, index=False)
+
+        # New fields widen the header; later appends must match it
+        index.columns.extend(column for column in users_df.columns if column not in index.columns)
+
+        index.update(user_id, fields)
+        index.source_mtime = os.path.getmtime(csv_path)
+        return True
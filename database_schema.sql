@@ -4,6 +4,10 @@
 -- ========================================
 
 -- Drop tables if exist (for fresh install)
+-- Incremental changes (e.g. the daily_spending_rollup table and its trigger)
+-- are applied by PostgreSQLManager.apply_migrations() on first connect.
+DROP TABLE IF EXISTS schema_migrations CASCADE;
+DROP TABLE IF EXISTS daily_spending_rollup CASCADE;
 DROP TABLE IF EXISTS transactions CASCADE;
 DROP TABLE IF EXISTS users CASCADE;
 
@@ -14,7 +18,7 @@ CREATE TABLE users (
     user_id VARCHAR(10) PRIMARY KEY,
     name VARCHAR(100) NOT NULL,
     email VARCHAR(100) UNIQUE NOT NULL,
-    password_hash VARCHAR(64) NOT NULL,  -- SHA256 hash (64 characters)
+    password_hash VARCHAR(255) NOT NULL,  -- pbkdf2_sha256$<rounds>$<salt>$<hash> (legacy: SHA256 hex)
     monthly_income DECIMAL(12, 2) DEFAULT 0.00,
     preferred_currency VARCHAR(3) DEFAULT 'USD',
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
@@ -60,6 +64,8 @@ CREATE INDEX idx_transactions_user_id ON transactions(user_id);
 CREATE INDEX idx_transactions_date ON transactions(transaction_date);
 CREATE INDEX idx_transactions_category ON transactions(category);
 CREATE INDEX idx_transactions_user_date ON transactions(user_id, transaction_date);
+-- Covering index: summary/category breakdown queries become index-only scans
+CREATE INDEX idx_transactions_user_date_covering ON transactions(user_id, transaction_date) INCLUDE (category, amount);
 
 -- ========================================
 -- TRIGGERS
@@ -4,8 +4,9 @@ Migrate existing CSV data to PostgreSQL database
 """
 import pandas as pd
 import psycopg2
-from psycopg2.extras import execute_batch
+import io
 import os
+import time
 from dotenv import load_dotenv
 from pathlib import Path
 import hashlib
@@ -20,12 +21,108 @@ DATA_DIR = BASE_DIR / 'config' / 'data' / 'raw'
 USERS_CSV = DATA_DIR / 'users.csv'
 TRANSACTIONS_CSV = DATA_DIR / 'transactions.csv'
 
+# Rows read from the CSV and sent through COPY per chunk
+CHUNK_SIZE = 100_000
+
+USER_COLUMNS = ['user_id', 'name', 'email', 'password_hash', 'monthly_income', 'preferred_currency']
+TRANSACTION_COLUMNS = [
+    'transaction_id', 'user_id', 'amount', 'currency', 'category',
+    'merchant', 'description', 'transaction_date'
+]
+
 
 def hash_password(password):
     """Hash password using SHA256"""
     return hashlib.sha256(password.encode()).hexdigest()
 
 
+def copy_dataframe(cur, df, table, columns):
+    """
+    Stream a DataFrame into a table with COPY ... FROM STDIN
+
+    The chunk is serialized to an in-memory CSV buffer, so no per-row
+    parameter tuples are ever built.
+    """
+    buffer = io.StringIO()
+    df[columns].to_csv(buffer, index=False, header=False)
+    buffer.seek(0)
+    cur.copy_expert(
+        f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)",
+        buffer
+    )
+
+
+def create_staging_table(cur, table):
+    """
+    Create a temporary staging table shaped like `table` for COPY
+
+    load_order numbers the rows as they arrive, so the upsert can keep the
+    last row of a duplicated key. Temp tables are not WAL-logged and are
+    dropped when the transaction commits.
+
+    Returns:
+        str: Staging table name
+    """
+    staging = f"{table}_staging"
+    cur.execute(f"""
+        CREATE TEMP TABLE {staging} (LIKE {table} INCLUDING DEFAULTS, load_order BIGSERIAL)
+        ON COMMIT DROP
+    """)
+    return staging
+
+
+def upsert_from_staging(cur, staging, table, columns, key):
+    """
+    Move staged rows into `table`, the last staged row winning for a repeated key
+
+    Same semantics as the row-by-row INSERT ... ON CONFLICT DO UPDATE this
+    replaces: duplicate keys in the CSV update instead of aborting the load.
+
+    Returns:
+        int: Number of distinct keys written
+    """
+    column_list = ', '.join(columns)
+    updates = ', '.join(f"{column} = EXCLUDED.{column}" for column in columns if column != key)
+    cur.execute(f"""
+        INSERT INTO {table} ({column_list})
+        SELECT DISTINCT ON ({key}) {column_list}
+        FROM {staging}
+        ORDER BY {key}, load_order DESC
+        ON CONFLICT ({key}) DO UPDATE SET {updates}
+    """)
+    return cur.rowcount
+
+
+def drop_secondary_indexes(cur, table):
+    """
+    Drop a table's non-constraint indexes so the load does not maintain them
+
+    Returns:
+        list: CREATE INDEX statements to restore them afterwards
+    """
+    cur.execute("""
+        SELECT i.indexname, i.indexdef
+        FROM pg_indexes i
+        WHERE i.tablename = %s
+        AND NOT EXISTS (SELECT 1 FROM pg_constraint c WHERE c.conname = i.indexname)
+    """, (table,))
+    indexes = cur.fetchall()
+
+    for index_name, _ in indexes:
+        cur.execute(f"DROP INDEX IF EXISTS {index_name}")
+
+    return [index_def for _, index_def in indexes]
+
+
+def rollup_trigger_exists(cur):
+    """Check whether the daily spending rollup trigger has been installed"""
+    cur.execute("""
+        SELECT 1 FROM pg_trigger
+        WHERE tgname = 'trg_transactions_rollup' AND NOT tgisinternal
+    """)
+    return cur.fetchone() is not None
+
+
 def connect_to_database():
     """Connect to PostgreSQL database"""
     try:
@@ -67,43 +164,30 @@ def migrate_users(conn):
         print("⚠️  No password_hash column found. Creating default passwords...")
         users_df['password_hash'] = hash_password('password123')
 
-    # Prepare data for insertion
-    users_data = []
-    for _, row in users_df.iterrows():
-        user_data = (
-            row['user_id'],
-            row['name'],
-            row['email'].lower(),
-            row.get('password_hash', hash_password('password123')),
-            float(row.get('monthly_income', 0)),
-            row.get('preferred_currency', 'USD')
-        )
-        users_data.append(user_data)
+    # Prepare data for insertion (vectorized, no per-row loop)
+    users_df['email'] = users_df['email'].str.lower()
+    users_df['password_hash'] = users_df['password_hash'].fillna(hash_password('password123'))
+    users_df['monthly_income'] = users_df.get('monthly_income', pd.Series(0.0, index=users_df.index)).fillna(0.0).astype(float)
+    users_df['preferred_currency'] = users_df.get('preferred_currency', pd.Series('USD', index=users_df.index)).fillna('USD')
 
     # Insert into database
     try:
         cur = conn.cursor()
 
         # Clear existing data (optional - comment out if you want to keep existing data)
-        cur.execute("DELETE FROM users")
+        # TRUNCATE skips the per-row delete triggers; CASCADE matches ON DELETE CASCADE
+        cur.execute("TRUNCATE users CASCADE")
         print("🗑️  Cleared existing users")
 
-        # Insert users
-        insert_query = """
-            INSERT INTO users (user_id, name, email, password_hash, monthly_income, preferred_currency)
-            VALUES (%s, %s, %s, %s, %s, %s)
-            ON CONFLICT (user_id) DO UPDATE SET
-                name = EXCLUDED.name,
-                email = EXCLUDED.email,
-                password_hash = EXCLUDED.password_hash,
-                monthly_income = EXCLUDED.monthly_income,
-                preferred_currency = EXCLUDED.preferred_currency
-        """
-
-        execute_batch(cur, insert_query, users_data)
+        # Load users with COPY, then upsert so duplicate user_ids don't abort the load
+        staging = create_staging_table(cur, 'users')
+        copy_dataframe(cur, users_df, staging, USER_COLUMNS)
+        migrated = upsert_from_staging(cur, staging, 'users', USER_COLUMNS, 'user_id')
         conn.commit()
 
-        print(f"✅ Migrated {len(users_data)} users successfully!")
+        if migrated < len(users_df):
+            print(f"⚠️  {len(users_df) - migrated} duplicate user_id rows merged (last row kept)")
+        print(f"✅ Migrated {migrated} users successfully!")
 
         # Show sample
         cur.execute("SELECT user_id, name, email, preferred_currency FROM users LIMIT 5")
@@ -131,55 +215,18 @@ def migrate_transactions(conn):
         print(f"❌ Transactions CSV file not found: {TRANSACTIONS_CSV}")
         return False
 
-    # Read CSV
-    transactions_df = pd.read_csv(TRANSACTIONS_CSV)
-    print(f"📊 Found {len(transactions_df)} transactions in CSV")
-
-    # Convert transaction_date to datetime
-    transactions_df['transaction_date'] = pd.to_datetime(transactions_df['transaction_date'])
-
-    # Prepare data for insertion
-    transactions_data = []
-    for _, row in transactions_df.iterrows():
-        txn_data = (
-            row['transaction_id'],
-            row['user_id'],
-            float(row['amount']),
-            row.get('currency', 'USD'),
-            row['category'],
-            row.get('merchant', ''),
-            row.get('description', ''),
-            row['transaction_date']
-        )
-        transactions_data.append(txn_data)
-
     # Insert into database
     try:
         cur = conn.cursor()
 
         # Clear existing data (optional)
-        cur.execute("DELETE FROM transactions")
+        cur.execute("TRUNCATE transactions")
         print("🗑️  Cleared existing transactions")
 
-        # Insert transactions in batches
-        insert_query = """
-            INSERT INTO transactions
-            (transaction_id, user_id, amount, currency, category, merchant, description, transaction_date)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-            ON CONFLICT (transaction_id) DO UPDATE SET
-                user_id = EXCLUDED.user_id,
-                amount = EXCLUDED.amount,
-                currency = EXCLUDED.currency,
-                category = EXCLUDED.category,
-                merchant = EXCLUDED.merchant,
-                description = EXCLUDED.description,
-                transaction_date = EXCLUDED.transaction_date
-        """
-
-        execute_batch(cur, insert_query, transactions_data, page_size=1000)
+        loaded = bulk_load_transactions(cur, TRANSACTIONS_CSV)
         conn.commit()
 
-        print(f"✅ Migrated {len(transactions_data)} transactions successfully!")
+        print(f"✅ Migrated {loaded} transactions successfully!")
 
         # Show statistics
         cur.execute("""
@@ -222,6 +269,74 @@ def migrate_transactions(conn):
         return False
 
 
+def bulk_load_transactions(cur, csv_path, chunksize=CHUNK_SIZE):
+    """
+    Bulk load transactions from a CSV with COPY, reading it in chunks
+
+    Chunks are COPYed into a staging table and upserted in one statement,
+    so a transaction_id repeated in the CSV keeps its last row instead of
+    aborting the load. Secondary indexes are dropped for the load and
+    rebuilt once at the end, and the per-row rollup trigger is replaced by
+    one rollup rebuild. Runs inside the caller's transaction, so a failure
+    leaves the table intact.
+
+    Args:
+        cur: psycopg2 cursor
+        csv_path (Path): Transactions CSV
+        chunksize (int): Rows per COPY chunk
+
+    Returns:
+        int: Number of transactions written (distinct transaction_ids)
+    """
+    start_time = time.perf_counter()
+    staging = create_staging_table(cur, 'transactions')
+
+    index_definitions = drop_secondary_indexes(cur, 'transactions')
+    print(f"⏸️  Dropped {len(index_definitions)} secondary indexes for the load")
+
+    has_rollup = rollup_trigger_exists(cur)
+    if has_rollup:
+        cur.execute("ALTER TABLE transactions DISABLE TRIGGER trg_transactions_rollup")
+
+    loaded = 0
+    for chunk in pd.read_csv(csv_path, chunksize=chunksize, dtype={'transaction_id': str, 'user_id': str}):
+        chunk['currency'] = chunk.get('currency', pd.Series('USD', index=chunk.index)).fillna('USD')
+        for column in ('merchant', 'description'):
+            if column not in chunk.columns:
+                chunk[column] = ''
+
+        copy_dataframe(cur, chunk, staging, TRANSACTION_COLUMNS)
+        loaded += len(chunk)
+
+        elapsed = time.perf_counter() - start_time
+        print(f"Progress: {loaded:,} transactions staged ({loaded / elapsed:,.0f} rows/s)")
+
+    written = upsert_from_staging(cur, staging, 'transactions', TRANSACTION_COLUMNS, 'transaction_id')
+    if written < loaded:
+        print(f"⚠️  {loaded - written:,} duplicate transaction_id rows merged (last row kept)")
+
+    print(f"🔨 Rebuilding {len(index_definitions)} indexes...")
+    for index_definition in index_definitions:
+        cur.execute(index_definition)
+
+    if has_rollup:
+        print("🔨 Rebuilding daily spending rollup...")
+        cur.execute("DELETE FROM daily_spending_rollup")
+        cur.execute("""
+            INSERT INTO daily_spending_rollup
+                (user_id, day, category, currency, txn_count, total_amount, min_amount, max_amount)
+            SELECT user_id, transaction_date::date, category, currency,
+                   COUNT(*), SUM(amount), MIN(amount), MAX(amount)
+            FROM transactions
+            GROUP BY user_id, transaction_date::date, category, currency
+        """)
+        cur.execute("ALTER TABLE transactions ENABLE TRIGGER trg_transactions_rollup")
+
+    elapsed = time.perf_counter() - start_time
+    print(f"⏱️  Loaded {written:,} transactions in {elapsed:.1f}s ({loaded / max(elapsed, 1e-9):,.0f} rows/s)")
+    return written
+
+
 def verify_migration(conn):
     """Verify migration was successful"""
     print("\n" + "="*50)
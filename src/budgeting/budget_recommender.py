@@ -15,10 +15,17 @@ from src.currency.currency_converter import CurrencyConverter
 
 
 class BudgetRecommender:
-    def __init__(self):
+    def __init__(self, converter=None):
         self.budget_rules = BUDGET_CONFIG
         self.categories = TRANSACTION_CATEGORIES
-        self.converter = CurrencyConverter()
+        self.converter = converter or CurrencyConverter()
+
+        # category -> 'essentials' / 'discretionary' / 'savings'
+        self.category_groups = {
+            category: group
+            for group, categories in self.categories.items()
+            for category in categories
+        }
 
     def load_user_data(self, user_id=None):
         """Load user and transaction data"""
@@ -47,46 +54,82 @@ class BudgetRecommender:
 
     def categorize_spending(self, transactions_df, amount_column='amount_usd'):
         """Categorize transactions into essentials/discretionary/savings"""
-        categorized = {'essentials': 0, 'discretionary': 0, 'savings': 0}
-
-        for _, row in transactions_df.iterrows():
-            category = row['category']
-            amount = row[amount_column] if amount_column in transactions_df.columns else row.get('amount', 0)
+        if amount_column not in transactions_df.columns:
+            amount_column = 'amount'
 
-            if category in self.categories['essentials']:
-                categorized['essentials'] += amount
-            elif category in self.categories['discretionary']:
-                categorized['discretionary'] += amount
-            elif category in self.categories['savings']:
-                categorized['savings'] += amount
+        group_totals = transactions_df[amount_column].groupby(
+            transactions_df['category'].map(self.category_groups)
+        ).sum()
 
+        categorized = {
+            group: float(group_totals.get(group, 0))
+            for group in ['essentials', 'discretionary', 'savings']
+        }
         categorized['total'] = sum(categorized.values())
         return categorized
 
+    @staticmethod
+    def prepare_user_transactions(user_transactions):
+        """
+        Index one user's transactions by date, sorted ascending
+
+        The result can be passed straight to analyze_user_spending, which
+        then skips the user filter and slices recent months by binary search.
+        """
+        if isinstance(user_transactions.index, pd.DatetimeIndex) and user_transactions.index.is_monotonic_increasing:
+            return user_transactions
+
+        dates = pd.to_datetime(user_transactions['transaction_date'])
+        return user_transactions.set_index(dates.rename(None)).sort_index(kind='stable')
+
+    @classmethod
+    def index_transactions_by_user(cls, transactions_df):
+        """
+        Split a multi-user frame into prepared per-user frames
+
+        Returns:
+            dict: {user_id: date-indexed DataFrame}
+        """
+        return {
+            user_id: cls.prepare_user_transactions(user_df)
+            for user_id, user_df in transactions_df.groupby('user_id', sort=False)
+        }
+
     def analyze_user_spending(self, transactions_df, user_id, months=3, target_currency='USD'):
-        """Analyze user spending over specified months"""
-        # Filter transactions for the user
-        user_transactions = transactions_df[transactions_df['user_id'] == user_id].copy()
+        """
+        Analyze user spending over specified months
 
-        # Ensure date column is datetime
-        if 'transaction_date' in user_transactions.columns:
-            user_transactions['transaction_date'] = pd.to_datetime(user_transactions['transaction_date'])
+        transactions_df may be:
+        - a frame from prepare_user_transactions (one user, date-indexed),
+        - a dict from index_transactions_by_user,
+        - or any transactions frame (filtered to the user first).
+        """
+        if isinstance(transactions_df, dict):
+            user_transactions = transactions_df.get(user_id)
+            if user_transactions is None:
+                user_transactions = pd.DataFrame(columns=['category', 'amount', 'currency'])
+        elif isinstance(transactions_df.index, pd.DatetimeIndex):
+            user_transactions = transactions_df
+        else:
+            # Filter for the user before doing anything else with the rows
+            user_transactions = transactions_df[transactions_df['user_id'] == user_id]
 
-            # Filter for recent months
+        # Filter for recent months (binary search on the sorted date index)
+        if 'transaction_date' in user_transactions.columns and len(user_transactions) > 0:
+            user_transactions = self.prepare_user_transactions(user_transactions)
             cutoff_date = pd.Timestamp.now() - pd.DateOffset(months=months)
-            user_transactions = user_transactions[user_transactions['transaction_date'] >= cutoff_date]
+            user_transactions = user_transactions.iloc[user_transactions.index.searchsorted(cutoff_date):]
 
         # Determine amount column to use
         amount_column = f'amount_{target_currency}'
         if amount_column not in user_transactions.columns:
             # Try to convert if we have currency info
             if 'currency' in user_transactions.columns and 'amount' in user_transactions.columns:
-                user_transactions = self.converter.convert_dataframe(
-                    user_transactions,
-                    amount_column='amount',
-                    currency_column='currency',
-                    target_currency=target_currency
-                )
+                user_transactions = user_transactions.assign(**{
+                    amount_column: self.converter.convert_amounts(
+                        user_transactions['amount'], user_transactions['currency'], target_currency
+                    )
+                })
             else:
                 amount_column = 'amount'
 
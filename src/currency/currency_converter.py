@@ -14,8 +14,18 @@ sys.path.insert(0, project_root)
 from config.config import CURRENCY_CONFIG
 
 
+# Stored rates older than this are ignored in favour of the live API
+STORED_RATES_MAX_AGE_DAYS = 2
+
+
 class CurrencyConverter:
-    def __init__(self):
+    def __init__(self, rate_store=None):
+        """
+        Args:
+            rate_store: Optional database manager with get_latest_exchange_rates();
+                rates written there by the FX pipeline are used before the live API
+        """
+        self.rate_store = rate_store
         self.base_currency = CURRENCY_CONFIG['base_currency']
         self.target_currencies = CURRENCY_CONFIG['target_currencies']
         self.api_url = CURRENCY_CONFIG['api_url']
@@ -43,6 +53,9 @@ class CurrencyConverter:
             print("[Cache] Using cached exchange rates")
             return self.cache
 
+        if not force_update and self._load_stored_rates():
+            return self.cache
+
         try:
             print(f"[API] Fetching rates from {self.api_url}")
             response = requests.get(self.api_url, params={'base': self.base_currency}, timeout=5)
@@ -65,6 +78,26 @@ class CurrencyConverter:
             self._use_fallback_rates()
             return self.fallback_rates
 
+    def _load_stored_rates(self):
+        """Use the latest rates from the rate store if they are recent enough"""
+        if self.rate_store is None:
+            return False
+
+        try:
+            rate_date, rates = self.rate_store.get_latest_exchange_rates(self.base_currency)
+        except Exception as e:
+            print(f"[Warning] Could not read stored rates: {str(e)}")
+            return False
+
+        if not rate_date or datetime.now() - datetime.strptime(rate_date, '%Y-%m-%d') > timedelta(days=STORED_RATES_MAX_AGE_DAYS):
+            return False
+
+        self.cache = {self.base_currency: 1.0, **rates}
+        self.cache_timestamp = datetime.now()
+        self.last_update = datetime.now()
+        print(f"[DB] Using stored exchange rates from {rate_date}")
+        return True
+
     def _use_fallback_rates(self):
         """Set fallback rates as cache"""
         if not self.cache:
@@ -98,6 +131,32 @@ class CurrencyConverter:
         rates = self.fetch_rates()
         return rates.get(currency, self.fallback_rates.get(currency, 1.0))
 
+    def get_conversion_factors(self, currencies, to_currency):
+        """
+        Get the multiplier that converts one unit of each currency to to_currency
+
+        Returns:
+            dict: {currency: factor}
+        """
+        rates = self.fetch_rates()
+
+        def rate(currency):
+            if currency == self.base_currency:
+                return 1.0
+            return rates.get(currency, self.fallback_rates.get(currency, 1.0))
+
+        return {currency: rate(to_currency) / rate(currency) for currency in currencies}
+
+    def convert_amounts(self, amounts, currencies, to_currency):
+        """
+        Convert a Series of amounts with a matching Series of currency codes
+
+        Vectorized: one factor per distinct currency instead of one
+        convert() call per row. Rounded to 2 decimals like convert().
+        """
+        factors = self.get_conversion_factors(currencies.unique(), to_currency)
+        return (amounts * currencies.map(factors)).round(2)
+
     def format_amount(self, amount, currency):
         """Format amount with currency symbol"""
         symbols = {'USD': '$', 'CNY': '¥', 'IDR': 'Rp'}
@@ -113,15 +172,14 @@ class CurrencyConverter:
         import pandas as pd
 
         df = df.copy()
-        converted_amounts = []
-
-        for _, row in df.iterrows():
-            amount = row[amount_column]
-            from_currency = row[currency_column] if currency_column in df.columns else 'USD'
-            converted = self.convert(amount, from_currency, target_currency)
-            converted_amounts.append(converted)
+        if currency_column in df.columns:
+            currencies = df[currency_column]
+        else:
+            currencies = pd.Series('USD', index=df.index)
 
-        df[f'{amount_column}_{target_currency}'] = converted_amounts
+        df[f'{amount_column}_{target_currency}'] = self.convert_amounts(
+            df[amount_column], currencies, target_currency
+        )
         return df
 
     def get_rate_matrix(self):
@@ -0,0 +1,115 @@
+"""
+Exchange Rate Ingestion Pipeline
+Keeps the exchange_rates table complete for the last N days, so dashboards
+read stored rates instead of calling the rates API
+"""
+import requests
+from datetime import date, timedelta
+import time
+import sys
+import os
+
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, project_root)
+
+from config.config import CURRENCY_CONFIG, AIRFLOW_CONFIG
+
+
+def get_rate_store():
+    """
+    Get the database manager that stores exchange rates
+
+    PostgreSQL when DATA_STORAGE_MODE is 'postgresql', otherwise the local
+    SQLite database (CSV mode has no table to write to).
+    """
+    if os.getenv('DATA_STORAGE_MODE', 'csv') == 'postgresql':
+        from src.database.postgres_manager import get_db_manager
+    else:
+        from src.database.sqlite_manager import get_db_manager
+    return get_db_manager()
+
+
+def fetch_timeseries(start_date, end_date, base_currency, currencies):
+    """
+    Fetch daily rates for a date range in a single API request
+
+    Returns:
+        dict: {'YYYY-MM-DD': {currency: rate}}
+    """
+    url = CURRENCY_CONFIG['api_url'].rsplit('/', 1)[0] + '/timeseries'
+    params = {
+        'start_date': str(start_date),
+        'end_date': str(end_date),
+        'base': base_currency,
+        'symbols': ','.join(currencies)
+    }
+    if CURRENCY_CONFIG['api_key']:
+        params['access_key'] = CURRENCY_CONFIG['api_key']
+
+    print(f"[API] Fetching rates {start_date} to {end_date} from {url}")
+    response = requests.get(url, params=params, timeout=30)
+    response.raise_for_status()
+
+    data = response.json()
+    if 'rates' not in data:
+        raise ValueError(f"Unexpected rates response: {data}")
+    return data['rates']
+
+
+def missing_rate_days(store, base_currency, currencies, start_date, end_date):
+    """List the days in [start_date, end_date] without a complete set of stored rates"""
+    stored = store.get_exchange_rate_dates(base_currency, currencies, start_date, end_date)
+    days = (start_date + timedelta(days=offset) for offset in range((end_date - start_date).days + 1))
+    return [day for day in days if str(day) not in stored]
+
+
+def run_currency_pipeline(store=None, end_date=None, backfill_days=None, fetch=fetch_timeseries):
+    """
+    Backfill missing daily exchange rates in one fetch and one batched upsert
+
+    Idempotent: days that already have every rate are skipped, and re-running
+    after a partial failure rewrites only what is still missing.
+
+    Args:
+        store: Database manager with the exchange rate methods (default: get_rate_store())
+        end_date (date): Last day to cover (default: today)
+        backfill_days (int): Days to keep complete, ending at end_date
+        fetch (callable): fetch(start_date, end_date, base, currencies) -> {day: {currency: rate}}
+
+    Returns:
+        dict: Run summary (days checked/missing/filled, rows written, seconds)
+    """
+    started = time.perf_counter()
+    store = store or get_rate_store()
+    end_date = end_date or date.today()
+    backfill_days = backfill_days or AIRFLOW_CONFIG['fx_backfill_days']
+    start_date = end_date - timedelta(days=backfill_days - 1)
+
+    base_currency = CURRENCY_CONFIG['base_currency']
+    currencies = [c for c in CURRENCY_CONFIG['target_currencies'] if c != base_currency]
+
+    missing = missing_rate_days(store, base_currency, currencies, start_date, end_date)
+    summary = {'days_checked': backfill_days, 'days_missing': len(missing),
+               'days_filled': 0, 'rows_written': 0}
+
+    if missing:
+        # One request spanning every gap, then keep only the missing days
+        rates_by_day = fetch(missing[0], missing[-1], base_currency, currencies)
+        missing_keys = {str(day) for day in missing}
+
+        rows = [
+            (base_currency, currency, float(day_rates[currency]), day)
+            for day, day_rates in rates_by_day.items() if day in missing_keys
+            for currency in currencies if currency in day_rates
+        ]
+        summary['rows_written'] = store.upsert_exchange_rates(rows)
+        summary['days_filled'] = len({row[3] for row in rows})
+
+    summary['seconds'] = round(time.perf_counter() - started, 3)
+    print(f"[OK] FX pipeline: {summary['days_missing']} of {backfill_days} days missing, "
+          f"{summary['days_filled']} filled ({summary['rows_written']} rows) in {summary['seconds']}s")
+    return summary
+
+
+if __name__ == "__main__":
+    run_currency_pipeline()
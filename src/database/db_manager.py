@@ -2,17 +2,26 @@
 PostgreSQL Database Integration
 Handles database schema creation and CRUD operations
 """
-import 
-
-
-from psycopg2.extras import RealDictCursor
+import psycopg2
+from psycopg2.extras import RealDictCursor, execute_values
 import pandas as pd
 from datetime import datetime
+import time
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config.config import DB_CONFIG
 
+# Rows per multi-row INSERT statement in the bulk upserts
+BULK_PAGE_SIZE = 1000
+
+USER_COLUMNS = ['user_id', 'name', 'email', 'age', 'location',
+                'monthly_income', 'preferred_currency', 'created_date']
+TRANSACTION_COLUMNS = ['transaction_id', 'user_id', 'amount', 'currency', 'category',
+                       'merchant', 'transaction_date', 'description', 'is_fraud']
+FRAUD_ALERT_COLUMNS = ['transaction_id', 'user_id', 'fraud_score', 'detection_method',
+                       'alert_status', 'notes']
+
 class DatabaseManager:
     def __init__(self):
         self.config = DB_CONFIG
@@ -149,6 +158,24 @@ class DatabaseManager:
                 )
             """)
             
+            # Fraud monitoring: one alert per transaction and method (reruns insert nothing),
+            # a keyset index for "rows added since", and the scan high-water marks
+            self.cursor.execute("""
+                CREATE UNIQUE INDEX IF NOT EXISTS idx_fraud_alerts_transaction_method
+                ON fraud_alerts(transaction_id, detection_method)
+            """)
+            self.cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_transactions_created
+                ON transactions(created_at, transaction_id)
+            """)
+            self.cursor.execute("""
+                CREATE TABLE IF NOT EXISTS monitoring_watermarks (
+                    name VARCHAR(50) PRIMARY KEY,
+                    last_created_at TIMESTAMP NOT NULL,
+                    last_transaction_id VARCHAR(20) NOT NULL,
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
          
             self.conn.commit()
             print("✓ Database schema created successfully")
@@ -209,23 +236,148 @@ class DatabaseManager:
             print(f"✗ Error inserting fraud alert: {str(e)}")
             return False
     
-    def bulk_insert_users(self, users_df):
-        """Bulk insert users from dataframe"""
-        count = 0
-        for _, row in users_df.iterrows():
-            if self.insert_user(row.to_dict()):
-                count += 1
-        print(f"✓ Inserted {count} users")
-        return count
+    def bulk_insert_users(self, users_df, page_size=BULK_PAGE_SIZE):
+        """
+        Bulk upsert users from dataframe
+
+        Sends page_size rows per INSERT with execute_values, all in one transaction.
+
+        Returns:
+            dict: {'rows': rows written, 'seconds': elapsed time} (rows is 0 on error)
+        """
+        return self._bulk_upsert(
+            users_df,
+            """
+                INSERT INTO users (user_id, name, email, age, location, monthly_income, preferred_currency, created_date)
+                VALUES %s
+                ON CONFLICT (user_id) DO UPDATE SET
+                    name = EXCLUDED.name,
+                    email = EXCLUDED.email,
+                    age = EXCLUDED.age,
+                    location = EXCLUDED.location,
+                    monthly_income = EXCLUDED.monthly_income,
+                    preferred_currency = EXCLUDED.preferred_currency
+            """,
+            USER_COLUMNS, 'users', page_size
+        )
     
-    def bulk_insert_transactions(self, transactions_df):
-        """Bulk insert transactions from dataframe"""
+    def bulk_insert_transactions(self, transactions_df, page_size=BULK_PAGE_SIZE):
+        """
+        Bulk insert transactions from dataframe (existing transaction_ids are skipped)
+
+        Sends page_size rows per INSERT with execute_values, all in one transaction.
+
+        Returns:
+            dict: {'rows': rows written, 'seconds': elapsed time} (rows is 0 on error)
+        """
+        transactions_df = transactions_df.copy()
+        # BOOLEAN column: 0/1 integers from the CSV are not accepted as-is
+        if 'is_fraud' in transactions_df.columns:
+            transactions_df['is_fraud'] = transactions_df['is_fraud'].fillna(False).astype(bool)
+        else:
+            transactions_df['is_fraud'] = False
+
+        return self._bulk_upsert(
+            transactions_df,
+            """
+                INSERT INTO transactions (transaction_id, user_id, amount, currency, category, merchant, transaction_date, description, is_fraud)
+                VALUES %s
+                ON CONFLICT (transaction_id) DO NOTHING
+            """,
+            TRANSACTION_COLUMNS, 'transactions', page_size
+        )
+    
+    def _bulk_upsert(self, df, query, columns, label, page_size):
+        """Run a VALUES %s upsert over a dataframe in pages inside a single transaction"""
+        start_time = time.perf_counter()
+
+        # Missing columns become NULL; NaN/NaT become None so psycopg2 sends NULL
+        values = df.reindex(columns=columns).astype(object)
+        values = values.where(values.notna(), None)
+        rows = list(values.itertuples(index=False, name=None))
+
         count = 0
-        for _, row in transactions_df.iterrows():
-            if self.insert_transaction(row.to_dict()):
-                count += 1
-        print(f"✓ Inserted {count} transactions")
-        return count
+        try:
+            with self.conn.cursor() as cursor:
+                for start in range(0, len(rows), page_size):
+                    page = rows[start:start + page_size]
+                    execute_values(cursor, query, page, page_size=len(page))
+                    count += cursor.rowcount
+            self.conn.commit()
+        except Exception as e:
+            self.conn.rollback()
+            print(f"✗ Error bulk inserting {label}: {str(e)}")
+            return {'rows': 0, 'seconds': time.perf_counter() - start_time, 'error': str(e)}
+
+        elapsed = time.perf_counter() - start_time
+        print(f"✓ Inserted {count} {label} in {elapsed:.2f}s ({count / max(elapsed, 1e-9):,.0f} rows/s)")
+        return {'rows': count, 'seconds': elapsed}
+    
+    def bulk_insert_fraud_alerts(self, alerts_df, page_size=BULK_PAGE_SIZE):
+        """
+        Bulk insert fraud alerts (an alert already raised for the same transaction
+        and detection method is skipped, so rescoring a batch is harmless)
+
+        Returns:
+            dict: {'rows': rows written, 'seconds': elapsed time} (plus 'error' on failure)
+        """
+        return self._bulk_upsert(
+            alerts_df,
+            """
+                INSERT INTO fraud_alerts (transaction_id, user_id, fraud_score, detection_method, alert_status, notes)
+                VALUES %s
+                ON CONFLICT (transaction_id, detection_method) DO NOTHING
+            """,
+            FRAUD_ALERT_COLUMNS, 'fraud alerts', page_size
+        )
+    
+    def get_watermark(self, name):
+        """Get a stored (created_at, transaction_id) high-water mark, or None"""
+        self.cursor.execute(
+            "SELECT last_created_at, last_transaction_id FROM monitoring_watermarks WHERE name = %s",
+            (name,)
+        )
+        row = self.cursor.fetchone()
+        return (row['last_created_at'], row['last_transaction_id']) if row else None
+    
+    def set_watermark(self, name, watermark):
+        """Store a (created_at, transaction_id) high-water mark"""
+        try:
+            self.cursor.execute("""
+                INSERT INTO monitoring_watermarks (name, last_created_at, last_transaction_id)
+                VALUES (%s, %s, %s)
+                ON CONFLICT (name) DO UPDATE SET
+                    last_created_at = EXCLUDED.last_created_at,
+                    last_transaction_id = EXCLUDED.last_transaction_id,
+                    updated_at = CURRENT_TIMESTAMP
+            """, (name, *watermark))
+            self.conn.commit()
+            return True
+        except Exception as e:
+            self.conn.rollback()
+            print(f"✗ Error storing watermark: {str(e)}")
+            return False
+    
+    def get_transactions_after(self, watermark=None, limit=10000):
+        """
+        Get transactions added after a (created_at, transaction_id) high-water mark
+
+        Keyset order on created_at (insert time, not transaction_date), so
+        back-dated transactions are still picked up and history is never rescanned.
+
+        Returns:
+            DataFrame: Up to limit rows in (created_at, transaction_id) order
+        """
+        query = "SELECT * FROM transactions"
+        params = []
+        if watermark is not None:
+            query += " WHERE (created_at, transaction_id) > (%s, %s)"
+            params.extend(watermark)
+        query += " ORDER BY created_at, transaction_id LIMIT %s"
+        params.append(limit)
+        
+        self.cursor.execute(query, params)
+        return pd.DataFrame(self.cursor.fetchall())
     
     def get_user(self, user_id):
         """Retrieve user by ID"""
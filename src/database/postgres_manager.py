@@ -3,13 +3,20 @@ PostgreSQL Database Manager for Smart Finance
 Handles all database operations with connection pooling and security
 """
 import psycopg2
-from psycopg2.extras import RealDictCursor
+from psycopg2.extras import RealDictCursor, execute_values
 from psycopg2 import pool
+import numpy as np
+import pandas as pd
 import os
 from dotenv import load_dotenv
-import hashlib
 from datetime import datetime
 import logging
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from src.security.password_hasher import get_password_hasher
 
 # Load environment variables
 load_dotenv()
@@ -18,6 +25,152 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Connection pool sizing (ThreadedConnectionPool is shared by all Streamlit sessions)
+POOL_MIN_CONNECTIONS = int(os.getenv('DB_POOL_MIN', '1'))
+POOL_MAX_CONNECTIONS = int(os.getenv('DB_POOL_MAX', '10'))
+# Seconds to wait for a free connection before giving up
+POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', '30'))
+# Connections idle longer than this are pinged before being handed out
+POOL_HEALTHCHECK_INTERVAL = float(os.getenv('DB_POOL_HEALTHCHECK_INTERVAL', '60'))
+
+# Rows fetched per round trip by the server-side streaming cursors
+STREAM_ITERSIZE = int(os.getenv('DB_STREAM_ITERSIZE', '5000'))
+
+# Columns stream_transactions() may select (the names are spliced into the SQL)
+TRANSACTION_COLUMNS = (
+    'transaction_id', 'user_id', 'amount', 'currency', 'category',
+    'merchant', 'description', 'transaction_date', 'created_at'
+)
+
+# Removes OLD from its rollup bucket. min/max cannot be decremented, so they
+# are recomputed from the (index-backed) remaining rows of that bucket.
+_ROLLUP_BUCKET_ROWS = """
+    SELECT t.amount FROM transactions t
+    WHERE t.user_id = OLD.user_id
+    AND t.transaction_date >= OLD.transaction_date::date
+    AND t.transaction_date < OLD.transaction_date::date + 1
+    AND t.category = OLD.category AND t.currency = OLD.currency
+"""
+
+ROLLUP_BACKFILL = """
+    INSERT INTO daily_spending_rollup
+        (user_id, day, category, currency, txn_count, total_amount, min_amount, max_amount)
+    SELECT user_id, transaction_date::date, category, currency,
+           COUNT(*), SUM(amount), MIN(amount), MAX(amount)
+    FROM transactions
+    GROUP BY user_id, transaction_date::date, category, currency
+"""
+
+# Schema migrations applied on top of database_schema.sql.
+# The schema_migrations table records which versions have already run.
+SCHEMA_MIGRATIONS = [
+    # 1: Covering index so summary/category breakdown are index-only scans
+    [
+        """
+        CREATE INDEX IF NOT EXISTS idx_transactions_user_date_covering
+        ON transactions(user_id, transaction_date) INCLUDE (category, amount)
+        """,
+    ],
+    # 2: Per-user daily spending rollup, kept in sync by a trigger so the
+    #    analytics queries read O(days) rows instead of O(transactions).
+    [
+        """
+        CREATE TABLE IF NOT EXISTS daily_spending_rollup (
+            user_id VARCHAR(10) NOT NULL,
+            day DATE NOT NULL,
+            category VARCHAR(50) NOT NULL,
+            currency VARCHAR(3) NOT NULL,
+            txn_count INTEGER NOT NULL DEFAULT 0,
+            total_amount DECIMAL(14, 2) NOT NULL DEFAULT 0.00,
+            min_amount DECIMAL(12, 2),
+            max_amount DECIMAL(12, 2),
+            PRIMARY KEY (user_id, day, category, currency)
+        )
+        """,
+        f"""
+        CREATE OR REPLACE FUNCTION maintain_daily_spending_rollup()
+        RETURNS TRIGGER AS $$
+        BEGIN
+            IF TG_OP IN ('DELETE', 'UPDATE') THEN
+                UPDATE daily_spending_rollup r SET
+                    txn_count = r.txn_count - 1,
+                    total_amount = r.total_amount - OLD.amount,
+                    min_amount = (SELECT MIN(b.amount) FROM ({_ROLLUP_BUCKET_ROWS}) b),
+                    max_amount = (SELECT MAX(b.amount) FROM ({_ROLLUP_BUCKET_ROWS}) b)
+                WHERE r.user_id = OLD.user_id AND r.day = OLD.transaction_date::date
+                AND r.category = OLD.category AND r.currency = OLD.currency;
+
+                DELETE FROM daily_spending_rollup r
+                WHERE r.user_id = OLD.user_id AND r.day = OLD.transaction_date::date
+                AND r.category = OLD.category AND r.currency = OLD.currency
+                AND r.txn_count <= 0;
+            END IF;
+
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                INSERT INTO daily_spending_rollup
+                    (user_id, day, category, currency, txn_count, total_amount, min_amount, max_amount)
+                VALUES
+                    (NEW.user_id, NEW.transaction_date::date, NEW.category, NEW.currency, 1, NEW.amount, NEW.amount, NEW.amount)
+                ON CONFLICT (user_id, day, category, currency) DO UPDATE SET
+                    txn_count = daily_spending_rollup.txn_count + 1,
+                    total_amount = daily_spending_rollup.total_amount + EXCLUDED.total_amount,
+                    min_amount = LEAST(daily_spending_rollup.min_amount, EXCLUDED.min_amount),
+                    max_amount = GREATEST(daily_spending_rollup.max_amount, EXCLUDED.max_amount);
+            END IF;
+
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """,
+        "DROP TRIGGER IF EXISTS trg_transactions_rollup ON transactions",
+        """
+        CREATE TRIGGER trg_transactions_rollup
+            AFTER INSERT OR DELETE OR UPDATE OF user_id, amount, currency, category, transaction_date
+            ON transactions
+            FOR EACH ROW
+            EXECUTE FUNCTION maintain_daily_spending_rollup()
+        """,
+        "DELETE FROM daily_spending_rollup",
+        ROLLUP_BACKFILL,
+    ],
+    # 3: Keyset pagination seeks on (transaction_date, transaction_id) per user
+    [
+        """
+        CREATE INDEX IF NOT EXISTS idx_transactions_user_date_id
+        ON transactions(user_id, transaction_date, transaction_id)
+        """,
+    ],
+    # 4: Expression index for the case-insensitive login lookup
+    #    (WHERE LOWER(email) = LOWER(%s)), which can't use idx_users_email
+    [
+        "CREATE INDEX IF NOT EXISTS idx_users_email_lower ON users (LOWER(email))",
+        "ANALYZE users",
+    ],
+    # 5: Room for salted PBKDF2 hashes (the column was sized for SHA-256 hex)
+    [
+        "ALTER TABLE users ALTER COLUMN password_hash TYPE VARCHAR(255)",
+    ],
+    # 6: Daily exchange rates written by the FX pipeline, read by the
+    #    dashboard instead of calling the rates API
+    [
+        """
+        CREATE TABLE IF NOT EXISTS exchange_rates (
+            rate_id SERIAL PRIMARY KEY,
+            from_currency VARCHAR(3) NOT NULL,
+            to_currency VARCHAR(3) NOT NULL,
+            rate DECIMAL(15, 6) NOT NULL,
+            rate_date DATE NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE (from_currency, to_currency, rate_date)
+        )
+        """,
+        """
+        CREATE INDEX IF NOT EXISTS idx_exchange_rates_base_date
+        ON exchange_rates(from_currency, rate_date)
+        """,
+    ],
+]
+
 
 class PostgreSQLManager:
     """
@@ -28,9 +181,9 @@ class PostgreSQLManager:
     def __init__(self):
         """Initialize database connection pool"""
         try:
-            # Create connection pool (min 1, max 10 connections)
-            self.connection_pool = psycopg2.pool.SimpleConnectionPool(
-                1, 10,
+            # Thread-safe pool: Streamlit runs every session on its own thread
+            self.connection_pool = psycopg2.pool.ThreadedConnectionPool(
+                POOL_MIN_CONNECTIONS, POOL_MAX_CONNECTIONS,
                 host=os.getenv('DB_HOST', 'localhost'),
                 port=os.getenv('DB_PORT', '5432'),
                 database=os.getenv('DB_NAME', 'smart_finance'),
@@ -39,26 +192,176 @@ class PostgreSQLManager:
             )
 
             if self.connection_pool:
-                logger.info("✅ Database connection pool created successfully")
+                logger.info(
+                    f"✅ Database connection pool created successfully "
+                    f"(min {POOL_MIN_CONNECTIONS}, max {POOL_MAX_CONNECTIONS})"
+                )
 
         except (Exception, psycopg2.DatabaseError) as error:
             logger.error(f"❌ Error creating connection pool: {error}")
             raise
 
+        # ThreadedConnectionPool raises as soon as it is exhausted; the semaphore
+        # makes callers wait (up to POOL_TIMEOUT) for a connection instead.
+        self._pool_slots = threading.BoundedSemaphore(POOL_MAX_CONNECTIONS)
+        self._stats_lock = threading.Lock()
+        self._last_used = {}
+        self._stats = {
+            'checked_out': 0,
+            'peak_checked_out': 0,
+            'total_checkouts': 0,
+            'total_wait_seconds': 0.0,
+            'max_wait_seconds': 0.0,
+            'timeouts': 0,
+            'discarded_connections': 0
+        }
+
+        self.apply_migrations()
+
+    def apply_migrations(self):
+        """Apply pending schema migrations (tracked in the schema_migrations table)"""
+        with self.connection() as conn:
+            try:
+                with conn.cursor() as cur:
+                    cur.execute("""
+                        CREATE TABLE IF NOT EXISTS schema_migrations (
+                            version INTEGER PRIMARY KEY,
+                            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                        )
+                    """)
+                    cur.execute("SELECT COALESCE(MAX(version), 0) FROM schema_migrations")
+                    current_version = cur.fetchone()[0]
+                    conn.commit()
+
+                    for version, statements in enumerate(SCHEMA_MIGRATIONS, start=1):
+                        if version <= current_version:
+                            continue
+
+                        for statement in statements:
+                            cur.execute(statement)
+                        cur.execute("INSERT INTO schema_migrations (version) VALUES (%s)", (version,))
+                        conn.commit()
+                        logger.info(f"✅ Applied schema migration {version}")
+
+            except (Exception, psycopg2.DatabaseError) as error:
+                conn.rollback()
+                logger.error(f"❌ Error applying schema migrations: {error}")
+                raise
+
     def get_connection(self):
-        """Get a connection from the pool"""
+        """
+        Get a healthy connection from the pool
+
+        Prefer the connection() context manager, which always returns it.
+        """
+        wait_start = time.perf_counter()
+        if not self._pool_slots.acquire(timeout=POOL_TIMEOUT):
+            with self._stats_lock:
+                self._stats['timeouts'] += 1
+            logger.error(f"Timed out after {POOL_TIMEOUT}s waiting for a database connection")
+            raise psycopg2.pool.PoolError("connection pool exhausted")
+
         try:
-            return self.connection_pool.getconn()
+            conn = self.connection_pool.getconn()
+            while not self._is_healthy(conn):
+                self._discard_connection(conn)
+                conn = self.connection_pool.getconn()
         except (Exception, psycopg2.DatabaseError) as error:
+            self._pool_slots.release()
             logger.error(f"Error getting connection from pool: {error}")
             raise
 
+        wait_seconds = time.perf_counter() - wait_start
+        with self._stats_lock:
+            self._stats['checked_out'] += 1
+            self._stats['peak_checked_out'] = max(self._stats['peak_checked_out'], self._stats['checked_out'])
+            self._stats['total_checkouts'] += 1
+            self._stats['total_wait_seconds'] += wait_seconds
+            self._stats['max_wait_seconds'] = max(self._stats['max_wait_seconds'], wait_seconds)
+
+        return conn
+
     def return_connection(self, conn):
         """Return a connection to the pool"""
         try:
-            self.connection_pool.putconn(conn)
+            # Never hand the next caller a connection with an open transaction
+            if not conn.closed and conn.info.transaction_status != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                conn.rollback()
+            self._last_used[id(conn)] = time.monotonic()
+            self.connection_pool.putconn(conn, close=bool(conn.closed))
         except (Exception, psycopg2.DatabaseError) as error:
             logger.error(f"Error returning connection to pool: {error}")
+        finally:
+            with self._stats_lock:
+                self._stats['checked_out'] -= 1
+            self._pool_slots.release()
+
+    @contextmanager
+    def connection(self):
+        """
+        Borrow a pooled connection for the duration of a with-block
+
+        The connection is rolled back on exception and always returned.
+
+        Example:
+            with db.connection() as conn:
+                with conn.cursor() as cur:
+                    cur.execute("SELECT 1")
+        """
+        conn = self.get_connection()
+        try:
+            yield conn
+        except Exception:
+            if not conn.closed:
+                conn.rollback()
+            raise
+        finally:
+            self.return_connection(conn)
+
+    def _is_healthy(self, conn):
+        """Check a pooled connection before handing it out"""
+        if conn.closed:
+            return False
+
+        idle_seconds = time.monotonic() - self._last_used.get(id(conn), 0.0)
+        if idle_seconds < POOL_HEALTHCHECK_INTERVAL:
+            return True
+
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except (Exception, psycopg2.DatabaseError):
+            return False
+
+    def _discard_connection(self, conn):
+        """Close a broken connection and drop it from the pool"""
+        self._last_used.pop(id(conn), None)
+        try:
+            self.connection_pool.putconn(conn, close=True)
+        except (Exception, psycopg2.DatabaseError) as error:
+            logger.error(f"Error discarding connection: {error}")
+        with self._stats_lock:
+            self._stats['discarded_connections'] += 1
+        logger.warning("⚠️  Discarded unhealthy database connection")
+
+    def get_pool_stats(self):
+        """
+        Get connection pool metrics
+
+        Returns:
+            dict: Pool sizing, checked-out count and wait-time statistics
+        """
+        with self._stats_lock:
+            stats = dict(self._stats)
+
+        stats['min_connections'] = POOL_MIN_CONNECTIONS
+        stats['max_connections'] = POOL_MAX_CONNECTIONS
+        stats['avg_wait_seconds'] = (
+            stats['total_wait_seconds'] / stats['total_checkouts'] if stats['total_checkouts'] else 0.0
+        )
+        return stats
 
     def close_all_connections(self):
         """Close all database connections"""
@@ -73,8 +376,8 @@ class PostgreSQLManager:
     # ========================================
 
     def hash_password(self, password):
-        """Hash password using SHA256"""
-        return hashlib.sha256(password.encode()).hexdigest()
+        """Hash password with the shared PBKDF2 hasher"""
+        return get_password_hasher().hash(password)
 
     def get_user_by_email(self, email):
         """
@@ -86,20 +389,18 @@ class PostgreSQLManager:
         Returns:
             dict: User data or None if not found
         """
-        conn = self.get_connection()
-        try:
-            with conn.cursor(cursor_factory=RealDictCursor) as cur:
-                cur.execute(
-                    "SELECT * FROM users WHERE LOWER(email) = LOWER(%s)",
-                    (email,)
-                )
-                user = cur.fetchone()
-                return dict(user) if user else None
-        except (Exception, psycopg2.DatabaseError) as error:
-            logger.error(f"Error getting user by email: {error}")
-            return None
-        finally:
-            self.return_connection(conn)
+        with self.connection() as conn:
+            try:
+                with conn.cursor(cursor_factory=RealDictCursor) as cur:
+                    cur.execute(
+                        "SELECT * FROM users WHERE LOWER(email) = LOWER(%s)",
+                        (email,)
+                    )
+                    user = cur.fetchone()
+                    return dict(user) if user else None
+            except (Exception, psycopg2.DatabaseError) as error:
+                logger.error(f"Error getting user by email: {error}")
+                return None
 
     def get_user_by_id(self, user_id):
         """
@@ -111,20 +412,18 @@ class PostgreSQLManager:
         Returns:
             dict: User data or None if not found
         """
-        conn = self.get_connection()
-        try:
-            with conn.cursor(cursor_factory=RealDictCursor) as cur:
-                cur.execute(
-                    "SELECT * FROM users WHERE user_id = %s",
-                    (user_id,)
-                )
-                user = cur.fetchone()
-                return dict(user) if user else None
-        except (Exception, psycopg2.DatabaseError) as error:
-            logger.error(f"Error getting user by ID: {error}")
-            return None
-        finally:
-            self.return_connection(conn)
+        with self.connection() as conn:
+            try:
+                with conn.cursor(cursor_factory=RealDictCursor) as cur:
+                    cur.execute(
+                        "SELECT * FROM users WHERE user_id = %s",
+                        (user_id,)
+                    )
+                    user = cur.fetchone()
+                    return dict(user) if user else None
+            except (Exception, psycopg2.DatabaseError) as error:
+                logger.error(f"Error getting user by ID: {error}")
+                return None
 
     def create_user(self, name, email, password, monthly_income, preferred_currency='USD'):
         """
@@ -151,45 +450,43 @@ class PostgreSQLManager:
         if self.get_user_by_email(email):
             return False, None, "Email already registered"
 
-        conn = self.get_connection()
-        try:
-            with conn.cursor() as cur:
-                # Generate next user_id
-                cur.execute("SELECT user_id FROM users ORDER BY user_id DESC LIMIT 1")
-                last_user = cur.fetchone()
-
-                if last_user:
-                    last_id = last_user[0]
-                    number = int(last_id[1:]) + 1
-                    new_user_id = f'U{number:05d}'
-                else:
-                    new_user_id = 'U00001'
-
-                # Hash password
-                password_hash = self.hash_password(password)
-
-                # Insert new user
-                cur.execute(
-                    """
-                    INSERT INTO users (user_id, name, email, password_hash, monthly_income, preferred_currency)
-                    VALUES (%s, %s, %s, %s, %s, %s)
-                    RETURNING user_id
-                    """,
-                    (new_user_id, name, email.lower(), password_hash, monthly_income, preferred_currency)
-                )
+        with self.connection() as conn:
+            try:
+                with conn.cursor() as cur:
+                    # Generate next user_id
+                    cur.execute("SELECT user_id FROM users ORDER BY user_id DESC LIMIT 1")
+                    last_user = cur.fetchone()
 
-                user_id = cur.fetchone()[0]
-                conn.commit()
+                    if last_user:
+                        last_id = last_user[0]
+                        number = int(last_id[1:]) + 1
+                        new_user_id = f'U{number:05d}'
+                    else:
+                        new_user_id = 'U00001'
 
-                logger.info(f"✅ User created: {user_id} - {email}")
-                return True, user_id, "Registration successful!"
+                    # Hash password
+                    password_hash = self.hash_password(password)
 
-        except (Exception, psycopg2.DatabaseError) as error:
-            conn.rollback()
-            logger.error(f"❌ Error creating user: {error}")
-            return False, None, f"Database error: {str(error)}"
-        finally:
-            self.return_connection(conn)
+                    # Insert new user
+                    cur.execute(
+                        """
+                        INSERT INTO users (user_id, name, email, password_hash, monthly_income, preferred_currency)
+                        VALUES (%s, %s, %s, %s, %s, %s)
+                        RETURNING user_id
+                        """,
+                        (new_user_id, name, email.lower(), password_hash, monthly_income, preferred_currency)
+                    )
+
+                    user_id = cur.fetchone()[0]
+                    conn.commit()
+
+                    logger.info(f"✅ User created: {user_id} - {email}")
+                    return True, user_id, "Registration successful!"
+
+            except (Exception, psycopg2.DatabaseError) as error:
+                conn.rollback()
+                logger.error(f"❌ Error creating user: {error}")
+                return False, None, f"Database error: {str(error)}"
 
     def verify_login(self, email, password):
         """
@@ -208,12 +505,41 @@ class PostgreSQLManager:
             return False, None, "Email not found"
 
         # Verify password
-        password_hash = self.hash_password(password)
-        if user['password_hash'] != password_hash:
+        valid, new_hash = get_password_hasher().verify_and_update(password, user['password_hash'])
+        if not valid:
             return False, None, "Incorrect password"
 
+        # Upgrade legacy SHA-256 / lower-cost hashes now that we know the password
+        if new_hash:
+            self.update_password_hash(user['user_id'], new_hash)
+
         return True, user['user_id'], "Login successful!"
 
+    def update_password_hash(self, user_id, password_hash):
+        """
+        Replace a user's stored password hash
+
+        Args:
+            user_id (str): User ID
+            password_hash (str): New hash from the password hasher
+
+        Returns:
+            bool: True if the hash was stored
+        """
+        with self.connection() as conn:
+            try:
+                with conn.cursor() as cur:
+                    cur.execute(
+                        "UPDATE users SET password_hash = %s WHERE user_id = %s",
+                        (password_hash, user_id)
+                    )
+                    conn.commit()
+                    return True
+            except (Exception, psycopg2.DatabaseError) as error:
+                conn.rollback()
+                logger.error(f"❌ Error updating password hash: {error}")
+                return False
+
     def get_all_users(self):
         """
         Get all users (for admin purposes)
@@ -222,17 +548,15 @@ class PostgreSQLManager:
         Returns:
             list: List of all users
         """
-        conn = self.get_connection()
-        try:
-            with conn.cursor(cursor_factory=RealDictCursor) as cur:
-                cur.execute("SELECT user_id, name, email, monthly_income, preferred_currency, created_at FROM users ORDER BY created_at DESC")
-                users = cur.fetchall()
-                return [dict(user) for user in users]
-        except (Exception, psycopg2.DatabaseError) as error:
-            logger.error(f"Error getting all users: {error}")
-            return []
-        finally:
-            self.return_connection(conn)
+        with self.connection() as conn:
+            try:
+                with conn.cursor(cursor_factory=RealDictCursor) as cur:
+                    cur.execute("SELECT user_id, name, email, monthly_income, preferred_currency, created_at FROM users ORDER BY created_at DESC")
+                    users = cur.fetchall()
+                    return [dict(user) for user in users]
+            except (Exception, psycopg2.DatabaseError) as error:
+                logger.error(f"Error getting all users: {error}")
+                return []
 
     # ========================================
     # TRANSACTION OPERATIONS
@@ -250,36 +574,183 @@ class PostgreSQLManager:
         Returns:
             list: List of transactions
         """
-        conn = self.get_connection()
-        try:
-            with conn.cursor(cursor_factory=RealDictCursor) as cur:
-                if start_date and end_date:
-                    cur.execute(
-                        """
-                        SELECT * FROM transactions
-                        WHERE user_id = %s
-                        AND transaction_date BETWEEN %s AND %s
-                        ORDER BY transaction_date DESC
-                        """,
-                        (user_id, start_date, end_date)
-                    )
-                else:
-                    cur.execute(
-                        """
-                        SELECT * FROM transactions
-                        WHERE user_id = %s
-                        ORDER BY transaction_date DESC
-                        """,
-                        (user_id,)
-                    )
+        with self.connection() as conn:
+            try:
+                with conn.cursor(cursor_factory=RealDictCursor) as cur:
+                    if start_date and end_date:
+                        cur.execute(
+                            """
+                            SELECT * FROM transactions
+                            WHERE user_id = %s
+                            AND transaction_date BETWEEN %s AND %s
+                            ORDER BY transaction_date DESC
+                            """,
+                            (user_id, start_date, end_date)
+                        )
+                    else:
+                        cur.execute(
+                            """
+                            SELECT * FROM transactions
+                            WHERE user_id = %s
+                            ORDER BY transaction_date DESC
+                            """,
+                            (user_id,)
+                        )
+
+                    transactions = cur.fetchall()
+                    return [dict(txn) for txn in transactions]
+            except (Exception, psycopg2.DatabaseError) as error:
+                logger.error(f"Error getting user transactions: {error}")
+                return []
+
+    def get_user_transactions_page(self, user_id, cursor=None, page_size=50, ascending=False,
+                                   search=None, start_date=None, end_date=None):
+        """
+        Get one page of a user's transactions using keyset pagination
 
-                transactions = cur.fetchall()
-                return [dict(txn) for txn in transactions]
-        except (Exception, psycopg2.DatabaseError) as error:
-            logger.error(f"Error getting user transactions: {error}")
-            return []
-        finally:
-            self.return_connection(conn)
+        Seeks on (transaction_date, transaction_id) instead of OFFSET, so every
+        page costs the same no matter how deep into the history it is.
+
+        Args:
+            user_id (str): User ID
+            cursor (tuple): (transaction_date, transaction_id) of the last row
+                of the previous page, or None for the first page
+            page_size (int): Maximum rows per page
+            ascending (bool): Oldest first instead of newest first
+            search (str): Case-insensitive match on category, merchant or description
+            start_date (datetime): Start date filter
+            end_date (datetime): End date filter
+
+        Returns:
+            tuple: (transactions: list, next_cursor: tuple or None)
+        """
+        with self.connection() as conn:
+            try:
+                with conn.cursor(cursor_factory=RealDictCursor) as cur:
+                    query = "SELECT * FROM transactions WHERE user_id = %s"
+                    params = [user_id]
+
+                    if start_date and end_date:
+                        query += " AND transaction_date BETWEEN %s AND %s"
+                        params.extend([start_date, end_date])
+
+                    if search:
+                        query += " AND (category ILIKE %s OR merchant ILIKE %s OR description ILIKE %s)"
+                        params.extend([f'%{search}%'] * 3)
+
+                    if cursor:
+                        comparison = '>' if ascending else '<'
+                        query += f" AND (transaction_date, transaction_id) {comparison} (%s, %s)"
+                        params.extend(cursor)
+
+                    direction = 'ASC' if ascending else 'DESC'
+                    query += f" ORDER BY transaction_date {direction}, transaction_id {direction} LIMIT %s"
+                    # Fetch one extra row to know whether another page exists
+                    params.append(page_size + 1)
+
+                    cur.execute(query, params)
+                    transactions = [dict(txn) for txn in cur.fetchall()]
+
+                    next_cursor = None
+                    if len(transactions) > page_size:
+                        transactions = transactions[:page_size]
+                        next_cursor = (transactions[-1]['transaction_date'], transactions[-1]['transaction_id'])
+
+                    return transactions, next_cursor
+            except (Exception, psycopg2.DatabaseError) as error:
+                logger.error(f"Error getting transactions page: {error}")
+                return [], None
+
+    def stream_transactions(self, user_id=None, start_date=None, end_date=None,
+                            columns=None, itersize=None):
+        """
+        Stream transactions in column batches through a named server-side cursor
+
+        Only `itersize` rows are held client-side at a time, and each batch is
+        built straight from the row tuples (no per-row dict), so exports and
+        model-training reads stay bounded in memory.
+
+        Args:
+            user_id (str): User ID, or None for all users
+            start_date (datetime): Start date filter
+            end_date (datetime): End date filter
+            columns (list): Columns to read, from TRANSACTION_COLUMNS (default: all)
+            itersize (int): Rows fetched per round trip / per batch
+
+        Yields:
+            dict: Column name -> NumPy array for one batch
+
+        Raises:
+            ValueError: If a column is not in TRANSACTION_COLUMNS
+        """
+        itersize = itersize or STREAM_ITERSIZE
+        columns = list(columns or TRANSACTION_COLUMNS)
+        unknown = [column for column in columns if column not in TRANSACTION_COLUMNS]
+        if unknown:
+            raise ValueError(f"Unknown transaction columns: {unknown}")
+        query = f"SELECT {', '.join(columns)} FROM transactions"
+
+        conditions = []
+        params = []
+        if user_id:
+            conditions.append("user_id = %s")
+            params.append(user_id)
+        if start_date and end_date:
+            conditions.append("transaction_date BETWEEN %s AND %s")
+            params.extend([start_date, end_date])
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY transaction_date, transaction_id"
+
+        with self.connection() as conn:
+            try:
+                # Named cursors live on the server for the duration of the transaction
+                with conn.cursor(name=f"stream_{uuid.uuid4().hex}") as cur:
+                    cur.itersize = itersize
+                    cur.execute(query, params)
+
+                    while True:
+                        rows = cur.fetchmany(itersize)
+                        if not rows:
+                            break
+                        names = [desc[0] for desc in cur.description]
+                        yield self._rows_to_columns(names, rows)
+            except (Exception, psycopg2.DatabaseError) as error:
+                logger.error(f"Error streaming transactions: {error}")
+                raise
+            # Returning the connection rolls back the read-only transaction,
+            # which releases the server-side cursor and its snapshot
+
+    def read_transactions_frame(self, user_id=None, start_date=None, end_date=None,
+                                columns=None, itersize=None):
+        """
+        Read transactions into a DataFrame via stream_transactions
+
+        Returns:
+            DataFrame: One column per selected field (empty if no rows)
+        """
+        batches = list(self.stream_transactions(user_id, start_date, end_date, columns, itersize))
+        if not batches:
+            return pd.DataFrame(columns=list(columns or TRANSACTION_COLUMNS))
+
+        return pd.DataFrame({
+            name: np.concatenate([batch[name] for batch in batches])
+            for name in batches[0]
+        })
+
+    @staticmethod
+    def _rows_to_columns(names, rows):
+        """Transpose row tuples into typed NumPy column arrays"""
+        batch = {}
+        for name, values in zip(names, zip(*rows)):
+            if name == 'amount':
+                # DECIMAL arrives as decimal.Decimal
+                batch[name] = np.array(values, dtype=np.float64)
+            elif name in ('transaction_date', 'created_at'):
+                batch[name] = np.array(values, dtype='datetime64[ns]')
+            else:
+                batch[name] = np.array(values, dtype=object)
+        return batch
 
     def add_transaction(self, user_id, amount, currency, category, merchant, description=''):
         """
@@ -303,43 +774,41 @@ class PostgreSQLManager:
         if amount <= 0:
             return False, None, "Invalid amount"
 
-        conn = self.get_connection()
-        try:
-            with conn.cursor() as cur:
-                # Generate next transaction_id
-                cur.execute("SELECT transaction_id FROM transactions ORDER BY transaction_id DESC LIMIT 1")
-                last_txn = cur.fetchone()
-
-                if last_txn:
-                    last_id = last_txn[0]
-                    number = int(last_id[1:]) + 1
-                    new_txn_id = f'T{number:05d}'
-                else:
-                    new_txn_id = 'T00001'
-
-                # Insert transaction
-                cur.execute(
-                    """
-                    INSERT INTO transactions
-                    (transaction_id, user_id, amount, currency, category, merchant, description, transaction_date)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-                    RETURNING transaction_id
-                    """,
-                    (new_txn_id, user_id, amount, currency, category, merchant, description, datetime.now())
-                )
+        with self.connection() as conn:
+            try:
+                with conn.cursor() as cur:
+                    # Generate next transaction_id
+                    cur.execute("SELECT transaction_id FROM transactions ORDER BY transaction_id DESC LIMIT 1")
+                    last_txn = cur.fetchone()
+
+                    if last_txn:
+                        last_id = last_txn[0]
+                        number = int(last_id[1:]) + 1
+                        new_txn_id = f'T{number:05d}'
+                    else:
+                        new_txn_id = 'T00001'
+
+                    # Insert transaction
+                    cur.execute(
+                        """
+                        INSERT INTO transactions
+                        (transaction_id, user_id, amount, currency, category, merchant, description, transaction_date)
+                        VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+                        RETURNING transaction_id
+                        """,
+                        (new_txn_id, user_id, amount, currency, category, merchant, description, datetime.now())
+                    )
 
-                txn_id = cur.fetchone()[0]
-                conn.commit()
+                    txn_id = cur.fetchone()[0]
+                    conn.commit()
 
-                logger.info(f"✅ Transaction created: {txn_id} for user {user_id}")
-                return True, txn_id, "Transaction added successfully!"
+                    logger.info(f"✅ Transaction created: {txn_id} for user {user_id}")
+                    return True, txn_id, "Transaction added successfully!"
 
-        except (Exception, psycopg2.DatabaseError) as error:
-            conn.rollback()
-            logger.error(f"❌ Error adding transaction: {error}")
-            return False, None, f"Database error: {str(error)}"
-        finally:
-            self.return_connection(conn)
+            except (Exception, psycopg2.DatabaseError) as error:
+                conn.rollback()
+                logger.error(f"❌ Error adding transaction: {error}")
+                return False, None, f"Database error: {str(error)}"
 
     def delete_transaction(self, transaction_id, user_id):
         """
@@ -352,40 +821,71 @@ class PostgreSQLManager:
         Returns:
             tuple: (success: bool, message: str)
         """
-        conn = self.get_connection()
-        try:
-            with conn.cursor(cursor_factory=RealDictCursor) as cur:
-                # First, verify transaction belongs to user
-                cur.execute(
-                    "SELECT user_id FROM transactions WHERE transaction_id = %s",
-                    (transaction_id,)
-                )
+        with self.connection() as conn:
+            try:
+                with conn.cursor(cursor_factory=RealDictCursor) as cur:
+                    # First, verify transaction belongs to user
+                    cur.execute(
+                        "SELECT user_id FROM transactions WHERE transaction_id = %s",
+                        (transaction_id,)
+                    )
 
-                txn = cur.fetchone()
+                    txn = cur.fetchone()
 
-                if not txn:
-                    return False, "Transaction not found"
+                    if not txn:
+                        return False, "Transaction not found"
 
-                if txn['user_id'] != user_id:
-                    return False, "You can only delete your own transactions"
+                    if txn['user_id'] != user_id:
+                        return False, "You can only delete your own transactions"
 
-                # Delete transaction
-                cur.execute(
-                    "DELETE FROM transactions WHERE transaction_id = %s",
-                    (transaction_id,)
-                )
+                    # Delete transaction
+                    cur.execute(
+                        "DELETE FROM transactions WHERE transaction_id = %s",
+                        (transaction_id,)
+                    )
 
-                conn.commit()
+                    conn.commit()
 
-                logger.info(f"✅ Transaction deleted: {transaction_id} by user {user_id}")
-                return True, "Transaction deleted successfully!"
+                    logger.info(f"✅ Transaction deleted: {transaction_id} by user {user_id}")
+                    return True, "Transaction deleted successfully!"
 
-        except (Exception, psycopg2.DatabaseError) as error:
-            conn.rollback()
-            logger.error(f"❌ Error deleting transaction: {error}")
-            return False, f"Database error: {str(error)}"
-        finally:
-            self.return_connection(conn)
+            except (Exception, psycopg2.DatabaseError) as error:
+                conn.rollback()
+                logger.error(f"❌ Error deleting transaction: {error}")
+                return False, f"Database error: {str(error)}"
+
+    def delete_transactions(self, transaction_ids, user_id):
+        """
+        Delete several of a user's transactions in one statement and one transaction
+
+        Args:
+            transaction_ids (list): Transaction IDs
+            user_id (str): User ID (ids owned by anyone else are not deleted)
+
+        Returns:
+            int: Number of transactions deleted
+        """
+        transaction_ids = list(transaction_ids)
+        if not transaction_ids:
+            return 0
+
+        with self.connection() as conn:
+            try:
+                with conn.cursor() as cur:
+                    cur.execute(
+                        "DELETE FROM transactions WHERE user_id = %s AND transaction_id = ANY(%s)",
+                        (user_id, transaction_ids)
+                    )
+                    deleted_count = cur.rowcount
+                    conn.commit()
+
+                    logger.info(f"✅ {deleted_count} transaction(s) deleted by user {user_id}")
+                    return deleted_count
+
+            except (Exception, psycopg2.DatabaseError) as error:
+                conn.rollback()
+                logger.error(f"❌ Error deleting transactions: {error}")
+                return 0
 
     def get_transaction_by_id(self, transaction_id):
         """
@@ -397,20 +897,18 @@ class PostgreSQLManager:
         Returns:
             dict: Transaction data or None
         """
-        conn = self.get_connection()
-        try:
-            with conn.cursor(cursor_factory=RealDictCursor) as cur:
-                cur.execute(
-                    "SELECT * FROM transactions WHERE transaction_id = %s",
-                    (transaction_id,)
-                )
-                txn = cur.fetchone()
-                return dict(txn) if txn else None
-        except (Exception, psycopg2.DatabaseError) as error:
-            logger.error(f"Error getting transaction: {error}")
-            return None
-        finally:
-            self.return_connection(conn)
+        with self.connection() as conn:
+            try:
+                with conn.cursor(cursor_factory=RealDictCursor) as cur:
+                    cur.execute(
+                        "SELECT * FROM transactions WHERE transaction_id = %s",
+                        (transaction_id,)
+                    )
+                    txn = cur.fetchone()
+                    return dict(txn) if txn else None
+            except (Exception, psycopg2.DatabaseError) as error:
+                logger.error(f"Error getting transaction: {error}")
+                return None
 
     # ========================================
     # ANALYTICS & REPORTING
@@ -420,6 +918,8 @@ class PostgreSQLManager:
         """
         Get spending summary for a user
 
+        Reads the daily rollup, so date filters are applied at day granularity.
+
         Args:
             user_id (str): User ID
             start_date (datetime): Start date
@@ -428,86 +928,287 @@ class PostgreSQLManager:
         Returns:
             dict: Spending summary
         """
-        conn = self.get_connection()
-        try:
-            with conn.cursor(cursor_factory=RealDictCursor) as cur:
-                query = """
-                    SELECT
-                        COUNT(*) as total_transactions,
-                        SUM(amount) as total_spending,
-                        AVG(amount) as avg_transaction,
-                        MAX(amount) as max_transaction,
-                        MIN(amount) as min_transaction
-                    FROM transactions
-                    WHERE user_id = %s
-                """
-
-                params = [user_id]
-
-                if start_date and end_date:
-                    query += " AND transaction_date BETWEEN %s AND %s"
-                    params.extend([start_date, end_date])
-
-                cur.execute(query, params)
-                summary = cur.fetchone()
-
-                return dict(summary) if summary else {}
-        except (Exception, psycopg2.DatabaseError) as error:
-            logger.error(f"Error getting spending summary: {error}")
-            return {}
-        finally:
-            self.return_connection(conn)
+        with self.connection() as conn:
+            try:
+                with conn.cursor(cursor_factory=RealDictCursor) as cur:
+                    query = """
+                        SELECT
+                            COALESCE(SUM(txn_count), 0) as total_transactions,
+                            SUM(total_amount) as total_spending,
+                            SUM(total_amount) / NULLIF(SUM(txn_count), 0) as avg_transaction,
+                            MAX(max_amount) as max_transaction,
+                            MIN(min_amount) as min_transaction
+                        FROM daily_spending_rollup
+                        WHERE user_id = %s
+                    """
+
+                    params = [user_id]
+
+                    if start_date and end_date:
+                        query += " AND day BETWEEN %s::date AND %s::date"
+                        params.extend([start_date, end_date])
+
+                    cur.execute(query, params)
+                    summary = cur.fetchone()
+
+                    return dict(summary) if summary else {}
+            except (Exception, psycopg2.DatabaseError) as error:
+                logger.error(f"Error getting spending summary: {error}")
+                return {}
 
-    def get_category_breakdown(self, user_id, start_date=None, end_date=None):
+    def get_category_breakdown(self, user_id, start_date=None, end_date=None, by_currency=False):
         """
         Get spending breakdown by category for a user
 
+        Reads the daily rollup, so date filters are applied at day granularity.
+
         Args:
             user_id (str): User ID
             start_date (datetime): Start date
             end_date (datetime): End date
+            by_currency (bool): Keep one row per category and currency
 
         Returns:
             list: Category breakdown
         """
-        conn = self.get_connection()
-        try:
-            with conn.cursor(cursor_factory=RealDictCursor) as cur:
-                query = """
-                    SELECT
-                        category,
-                        COUNT(*) as transaction_count,
-                        SUM(amount) as total_amount,
-                        AVG(amount) as avg_amount
-                    FROM transactions
-                    WHERE user_id = %s
-                """
+        group_columns = "category, currency" if by_currency else "category"
+
+        with self.connection() as conn:
+            try:
+                with conn.cursor(cursor_factory=RealDictCursor) as cur:
+                    query = f"""
+                        SELECT
+                            {group_columns},
+                            SUM(txn_count) as transaction_count,
+                            SUM(total_amount) as total_amount,
+                            SUM(total_amount) / SUM(txn_count) as avg_amount
+                        FROM daily_spending_rollup
+                        WHERE user_id = %s
+                    """
 
-                params = [user_id]
+                    params = [user_id]
 
-                if start_date and end_date:
-                    query += " AND transaction_date BETWEEN %s AND %s"
-                    params.extend([start_date, end_date])
+                    if start_date and end_date:
+                        query += " AND day BETWEEN %s::date AND %s::date"
+                        params.extend([start_date, end_date])
 
-                query += " GROUP BY category ORDER BY total_amount DESC"
+                    query += f" GROUP BY {group_columns} ORDER BY total_amount DESC"
 
-                cur.execute(query, params)
-                breakdown = cur.fetchall()
+                    cur.execute(query, params)
+                    breakdown = cur.fetchall()
 
-                return [dict(row) for row in breakdown]
-        except (Exception, psycopg2.DatabaseError) as error:
-            logger.error(f"Error getting category breakdown: {error}")
-            return []
-        finally:
-            self.return_connection(conn)
+                    return [dict(row) for row in breakdown]
+            except (Exception, psycopg2.DatabaseError) as error:
+                logger.error(f"Error getting category breakdown: {error}")
+                return []
+
+    def get_daily_spending(self, user_id, start_date=None, end_date=None):
+        """
+        Get per-day spending totals for a user (one row per day and currency)
+
+        Args:
+            user_id (str): User ID
+            start_date (datetime): Start date
+            end_date (datetime): End date
+
+        Returns:
+            list: Rows with day, currency, transaction_count, total_amount
+        """
+        with self.connection() as conn:
+            try:
+                with conn.cursor(cursor_factory=RealDictCursor) as cur:
+                    query = """
+                        SELECT
+                            day,
+                            currency,
+                            SUM(txn_count) as transaction_count,
+                            SUM(total_amount) as total_amount
+                        FROM daily_spending_rollup
+                        WHERE user_id = %s
+                    """
+
+                    params = [user_id]
+
+                    if start_date and end_date:
+                        query += " AND day BETWEEN %s::date AND %s::date"
+                        params.extend([start_date, end_date])
+
+                    query += " GROUP BY day, currency ORDER BY day"
+
+                    cur.execute(query, params)
+                    return [dict(row) for row in cur.fetchall()]
+            except (Exception, psycopg2.DatabaseError) as error:
+                logger.error(f"Error getting daily spending: {error}")
+                return []
+
+    def get_monthly_spending(self, user_id, start_date=None, end_date=None):
+        """
+        Get per-month spending totals for a user (one row per month, category and currency)
+
+        Returns:
+            list: Rows with month ('YYYY-MM'), category, currency, transaction_count, total_amount
+        """
+        with self.connection() as conn:
+            try:
+                with conn.cursor(cursor_factory=RealDictCursor) as cur:
+                    query = """
+                        SELECT
+                            to_char(day, 'YYYY-MM') as month,
+                            category,
+                            currency,
+                            SUM(txn_count) as transaction_count,
+                            SUM(total_amount) as total_amount
+                        FROM daily_spending_rollup
+                        WHERE user_id = %s
+                    """
+
+                    params = [user_id]
+
+                    if start_date and end_date:
+                        query += " AND day BETWEEN %s::date AND %s::date"
+                        params.extend([start_date, end_date])
+
+                    query += " GROUP BY month, category, currency ORDER BY month, category"
+
+                    cur.execute(query, params)
+                    return [dict(row) for row in cur.fetchall()]
+            except (Exception, psycopg2.DatabaseError) as error:
+                logger.error(f"Error getting monthly spending: {error}")
+                return []
+
+    def get_spending_rollup(self, start_date, end_date):
+        """
+        Get every user's daily spending buckets in a date range (for batch jobs)
+
+        Returns:
+            list: Rows with user_id, day ('YYYY-MM-DD'), category, currency, transaction_count, total_amount
+        """
+        with self.connection() as conn:
+            try:
+                with conn.cursor(cursor_factory=RealDictCursor) as cur:
+                    cur.execute(
+                        """
+                        SELECT user_id, to_char(day, 'YYYY-MM-DD') as day, category, currency,
+                               txn_count as transaction_count, total_amount
+                        FROM daily_spending_rollup
+                        WHERE day BETWEEN %s::date AND %s::date
+                        """,
+                        (start_date, end_date)
+                    )
+                    return [dict(row) for row in cur.fetchall()]
+            except (Exception, psycopg2.DatabaseError) as error:
+                logger.error(f"Error getting spending rollup: {error}")
+                return []
+
+    def rebuild_spending_rollup(self):
+        """Recompute the daily spending rollup from the transactions table"""
+        with self.connection() as conn:
+            try:
+                with conn.cursor() as cur:
+                    cur.execute("DELETE FROM daily_spending_rollup")
+                    cur.execute(ROLLUP_BACKFILL)
+                    conn.commit()
+                    logger.info("✅ Daily spending rollup rebuilt")
+            except (Exception, psycopg2.DatabaseError) as error:
+                conn.rollback()
+                logger.error(f"❌ Error rebuilding spending rollup: {error}")
+                raise
+
+    # ========================================
+    # EXCHANGE RATES
+    # ========================================
+
+    def get_exchange_rate_dates(self, from_currency, to_currencies, start_date, end_date):
+        """
+        Get the days in [start_date, end_date] that have a rate for every target currency
+
+        Returns:
+            set: 'YYYY-MM-DD' strings
+        """
+        with self.connection() as conn:
+            try:
+                with conn.cursor() as cur:
+                    cur.execute(
+                        """
+                        SELECT rate_date FROM exchange_rates
+                        WHERE from_currency = %s AND rate_date BETWEEN %s AND %s
+                        AND to_currency = ANY(%s)
+                        GROUP BY rate_date
+                        HAVING COUNT(*) = %s
+                        """,
+                        (from_currency, start_date, end_date, list(to_currencies), len(to_currencies))
+                    )
+                    return {str(row[0]) for row in cur.fetchall()}
+            except (Exception, psycopg2.DatabaseError) as error:
+                logger.error(f"Error getting exchange rate dates: {error}")
+                return set()
+
+    def upsert_exchange_rates(self, rows):
+        """
+        Insert or update daily exchange rates in one transaction
+
+        Args:
+            rows (list): (from_currency, to_currency, rate, rate_date) tuples
+
+        Returns:
+            int: Number of rows written
+        """
+        rows = list(rows)
+        with self.connection() as conn:
+            try:
+                with conn.cursor() as cur:
+                    execute_values(
+                        cur,
+                        """
+                        INSERT INTO exchange_rates (from_currency, to_currency, rate, rate_date)
+                        VALUES %s
+                        ON CONFLICT (from_currency, to_currency, rate_date) DO UPDATE SET rate = EXCLUDED.rate
+                        """,
+                        rows
+                    )
+                    conn.commit()
+                    return len(rows)
+            except (Exception, psycopg2.DatabaseError) as error:
+                conn.rollback()
+                logger.error(f"❌ Error upserting exchange rates: {error}")
+                raise
+
+    def get_latest_exchange_rates(self, from_currency):
+        """
+        Get the most recent stored rates for a base currency
+
+        Returns:
+            tuple: (rate_date: str or None, rates: dict)
+        """
+        with self.connection() as conn:
+            try:
+                with conn.cursor(cursor_factory=RealDictCursor) as cur:
+                    cur.execute(
+                        """
+                        SELECT to_currency, rate, rate_date FROM exchange_rates
+                        WHERE from_currency = %s
+                        AND rate_date = (SELECT MAX(rate_date) FROM exchange_rates WHERE from_currency = %s)
+                        """,
+                        (from_currency, from_currency)
+                    )
+                    rows = cur.fetchall()
+                    if not rows:
+                        return None, {}
+                    return str(rows[0]['rate_date']), {row['to_currency']: float(row['rate']) for row in rows}
+            except (Exception, psycopg2.DatabaseError) as error:
+                logger.error(f"Error getting exchange rates: {error}")
+                return None, {}
 
 
 # Singleton instance
 _db_manager = None
+_db_manager_lock = threading.Lock()
 
 def get_db_manager():
     """Get or create PostgreSQLManager singleton instance"""
     global _db_manager
     if _db_manager is None:
-        _db_manager = PostgreSQLManager()
+        with _db_manager_lock:
+            if _db_manager is None:
+                _db_manager = PostgreSQLManager()
     return _db_manager
@@ -3,12 +3,13 @@ SQLite Database Manager for Smart Finance
 Simple, no server needed, perfect for development!
 """
 import sqlite3
-import hashlib
 from datetime import datetime
 from pathlib import Path
 import logging
 import os
 
+from src.security.password_hasher import get_password_hasher
+
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -18,6 +19,139 @@ DB_DIR = Path(__file__).resolve().parent.parent.parent / 'data'
 DB_DIR.mkdir(exist_ok=True)
 DB_FILE = DB_DIR / 'smart_finance.db'
 
+# Removes OLD from its rollup bucket. min/max cannot be decremented, so they
+# are recomputed from the (index-backed) remaining rows of that bucket.
+_ROLLUP_BUCKET = """
+    user_id = OLD.user_id AND day = date(OLD.transaction_date)
+    AND category = OLD.category AND currency = OLD.currency
+"""
+_ROLLUP_BUCKET_ROWS = """
+    SELECT amount FROM transactions
+    WHERE user_id = OLD.user_id
+    AND transaction_date >= date(OLD.transaction_date)
+    AND transaction_date < date(OLD.transaction_date, '+1 day')
+    AND category = OLD.category AND currency = OLD.currency
+"""
+ROLLUP_REMOVE_OLD = f"""
+    UPDATE daily_spending_rollup SET
+        txn_count = txn_count - 1,
+        total_amount = total_amount - OLD.amount,
+        min_amount = (SELECT MIN(amount) FROM ({_ROLLUP_BUCKET_ROWS})),
+        max_amount = (SELECT MAX(amount) FROM ({_ROLLUP_BUCKET_ROWS}))
+    WHERE {_ROLLUP_BUCKET};
+    DELETE FROM daily_spending_rollup WHERE {_ROLLUP_BUCKET} AND txn_count <= 0;
+"""
+
+ROLLUP_BACKFILL = """
+    INSERT OR REPLACE INTO daily_spending_rollup
+        (user_id, day, category, currency, txn_count, total_amount, min_amount, max_amount)
+    SELECT user_id, date(transaction_date), category, currency,
+           COUNT(*), SUM(amount), MIN(amount), MAX(amount)
+    FROM transactions
+    GROUP BY user_id, date(transaction_date), category, currency
+"""
+
+# Schema migrations applied after the base tables exist.
+# PRAGMA user_version records how many of them have already run.
+SCHEMA_MIGRATIONS = [
+    # 1: Composite/covering indexes for the per-user analytics queries.
+    #    (user_id, transaction_date) serves the date-ranged listing, and the
+    #    trailing category/amount columns let the summary and category
+    #    breakdown be answered from the index alone.
+    [
+        "CREATE INDEX IF NOT EXISTS idx_transactions_user_date_covering "
+        "ON transactions(user_id, transaction_date, category, amount)",
+        # Left-prefix of the covering index, no longer needed
+        "DROP INDEX IF EXISTS idx_transactions_user_id",
+    ],
+    # 2: Per-user daily spending rollup, kept in sync by triggers so the
+    #    analytics queries read O(days) rows instead of O(transactions).
+    [
+        """
+        CREATE TABLE IF NOT EXISTS daily_spending_rollup (
+            user_id TEXT NOT NULL,
+            day TEXT NOT NULL,
+            category TEXT NOT NULL,
+            currency TEXT NOT NULL,
+            txn_count INTEGER NOT NULL DEFAULT 0,
+            total_amount REAL NOT NULL DEFAULT 0.0,
+            min_amount REAL,
+            max_amount REAL,
+            PRIMARY KEY (user_id, day, category, currency)
+        ) WITHOUT ROWID
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_transactions_rollup_insert
+        AFTER INSERT ON transactions
+        BEGIN
+            INSERT INTO daily_spending_rollup
+                (user_id, day, category, currency, txn_count, total_amount, min_amount, max_amount)
+            VALUES
+                (NEW.user_id, date(NEW.transaction_date), NEW.category, NEW.currency, 1, NEW.amount, NEW.amount, NEW.amount)
+            ON CONFLICT (user_id, day, category, currency) DO UPDATE SET
+                txn_count = txn_count + 1,
+                total_amount = total_amount + excluded.total_amount,
+                min_amount = MIN(min_amount, excluded.min_amount),
+                max_amount = MAX(max_amount, excluded.max_amount);
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_transactions_rollup_delete
+        AFTER DELETE ON transactions
+        BEGIN
+            {ROLLUP_REMOVE_OLD}
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_transactions_rollup_update
+        AFTER UPDATE OF user_id, amount, currency, category, transaction_date ON transactions
+        BEGIN
+            {ROLLUP_REMOVE_OLD}
+            INSERT INTO daily_spending_rollup
+                (user_id, day, category, currency, txn_count, total_amount, min_amount, max_amount)
+            VALUES
+                (NEW.user_id, date(NEW.transaction_date), NEW.category, NEW.currency, 1, NEW.amount, NEW.amount, NEW.amount)
+            ON CONFLICT (user_id, day, category, currency) DO UPDATE SET
+                txn_count = txn_count + 1,
+                total_amount = total_amount + excluded.total_amount,
+                min_amount = MIN(min_amount, excluded.min_amount),
+                max_amount = MAX(max_amount, excluded.max_amount);
+        END
+        """,
+        ROLLUP_BACKFILL,
+    ],
+    # 3: Keyset pagination seeks on (transaction_date, transaction_id) per user
+    [
+        "CREATE INDEX IF NOT EXISTS idx_transactions_user_date_id "
+        "ON transactions(user_id, transaction_date, transaction_id)",
+    ],
+    # 4: Case-insensitive login lookups (WHERE LOWER(email) = LOWER(?)) can't
+    #    use idx_users_email on the raw column; index the expression instead.
+    [
+        "CREATE INDEX IF NOT EXISTS idx_users_email_lower ON users(LOWER(email))",
+    ],
+    # 5: Daily exchange rates written by the FX pipeline, read by the
+    #    dashboard instead of calling the rates API
+    [
+        """
+        CREATE TABLE IF NOT EXISTS exchange_rates (
+            rate_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            from_currency TEXT NOT NULL,
+            to_currency TEXT NOT NULL,
+            rate REAL NOT NULL,
+            rate_date DATE NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE (from_currency, rate_date, to_currency)
+        )
+        """,
+    ],
+    # 6: create_tables used to recreate the index dropped in migration 1 on
+    #    every start; drop it again on databases that picked it back up
+    [
+        "DROP INDEX IF EXISTS idx_transactions_user_id",
+    ],
+]
+
 
 class SQLiteManager:
     """
@@ -79,20 +213,58 @@ class SQLiteManager:
 
             # Create indexes
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_users_email ON users(email)")
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_transactions_user_id ON transactions(user_id)")
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_transactions_date ON transactions(transaction_date)")
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_transactions_category ON transactions(category)")
 
             self.conn.commit()
             logger.info("✅ Database tables created/verified")
 
+            self.apply_migrations()
+
         except Exception as e:
             logger.error(f"❌ Error creating tables: {e}")
             raise
 
+    def apply_migrations(self):
+        """Apply pending schema migrations (tracked with PRAGMA user_version)"""
+        cursor = self.conn.cursor()
+        current_version = cursor.execute("PRAGMA user_version").fetchone()[0]
+
+        for version, statements in enumerate(SCHEMA_MIGRATIONS, start=1):
+            if version <= current_version:
+                continue
+
+            try:
+                cursor.execute("BEGIN")
+                for statement in statements:
+                    cursor.execute(statement)
+                # PRAGMA does not accept bound parameters
+                cursor.execute(f"PRAGMA user_version = {version}")
+                self.conn.commit()
+                logger.info(f"✅ Applied schema migration {version}")
+            except Exception as e:
+                self.conn.rollback()
+                logger.error(f"❌ Error applying schema migration {version}: {e}")
+                raise
+
+    def explain_query_plan(self, query, params=()):
+        """
+        Return the EXPLAIN QUERY PLAN details for a query
+
+        Args:
+            query (str): SQL query
+            params (tuple): Query parameters
+
+        Returns:
+            list: Plan step descriptions (e.g. 'SEARCH transactions USING COVERING INDEX ...')
+        """
+        cursor = self.conn.cursor()
+        cursor.execute(f"EXPLAIN QUERY PLAN {query}", params)
+        return [row['detail'] for row in cursor.fetchall()]
+
     def hash_password(self, password):
-        """Hash password using SHA256"""
-        return hashlib.sha256(password.encode()).hexdigest()
+        """Hash password with the shared PBKDF2 hasher"""
+        return get_password_hasher().hash(password)
 
     # ========================================
     # USER OPERATIONS
@@ -197,12 +369,28 @@ class SQLiteManager:
             return False, None, "Email not found"
 
         # Verify password
-        password_hash = self.hash_password(password)
-        if user['password_hash'] != password_hash:
+        valid, new_hash = get_password_hasher().verify_and_update(password, user['password_hash'])
+        if not valid:
             return False, None, "Incorrect password"
 
+        # Upgrade legacy SHA-256 / lower-cost hashes now that we know the password
+        if new_hash:
+            self.update_password_hash(user['user_id'], new_hash)
+
         return True, user['user_id'], "Login successful!"
 
+    def update_password_hash(self, user_id, password_hash):
+        """Replace a user's stored password hash"""
+        try:
+            cursor = self.conn.cursor()
+            cursor.execute("UPDATE users SET password_hash = ? WHERE user_id = ?", (password_hash, user_id))
+            self.conn.commit()
+            return True
+        except Exception as e:
+            self.conn.rollback()
+            logger.error(f"❌ Error updating password hash: {e}")
+            return False
+
     def get_all_users(self):
         """Get all users (for admin purposes)"""
         try:
@@ -251,6 +439,64 @@ class SQLiteManager:
             logger.error(f"Error getting user transactions: {e}")
             return []
 
+    def get_user_transactions_page(self, user_id, cursor=None, page_size=50, ascending=False,
+                                   search=None, start_date=None, end_date=None):
+        """
+        Get one page of a user's transactions using keyset pagination
+
+        Seeks on (transaction_date, transaction_id) instead of OFFSET, so every
+        page costs the same no matter how deep into the history it is.
+
+        Args:
+            user_id (str): User ID
+            cursor (tuple): (transaction_date, transaction_id) of the last row
+                of the previous page, or None for the first page
+            page_size (int): Maximum rows per page
+            ascending (bool): Oldest first instead of newest first
+            search (str): Case-insensitive match on category, merchant or description
+            start_date (datetime): Start date filter
+            end_date (datetime): End date filter
+
+        Returns:
+            tuple: (transactions: list, next_cursor: tuple or None)
+        """
+        try:
+            db_cursor = self.conn.cursor()
+
+            query = "SELECT * FROM transactions WHERE user_id = ?"
+            params = [user_id]
+
+            if start_date and end_date:
+                query += " AND transaction_date BETWEEN ? AND ?"
+                params.extend([start_date, end_date])
+
+            if search:
+                query += " AND (category LIKE ? OR merchant LIKE ? OR description LIKE ?)"
+                params.extend([f'%{search}%'] * 3)
+
+            if cursor:
+                comparison = '>' if ascending else '<'
+                query += f" AND (transaction_date, transaction_id) {comparison} (?, ?)"
+                params.extend(cursor)
+
+            direction = 'ASC' if ascending else 'DESC'
+            query += f" ORDER BY transaction_date {direction}, transaction_id {direction} LIMIT ?"
+            # Fetch one extra row to know whether another page exists
+            params.append(page_size + 1)
+
+            db_cursor.execute(query, params)
+            rows = [dict(row) for row in db_cursor.fetchall()]
+
+            next_cursor = None
+            if len(rows) > page_size:
+                rows = rows[:page_size]
+                next_cursor = (rows[-1]['transaction_date'], rows[-1]['transaction_id'])
+
+            return rows, next_cursor
+        except Exception as e:
+            logger.error(f"Error getting transactions page: {e}")
+            return [], None
+
     def add_transaction(self, user_id, amount, currency, category, merchant, description=''):
         """Add a new transaction for a user"""
         # Validate inputs
@@ -320,6 +566,36 @@ class SQLiteManager:
             logger.error(f"❌ Error deleting transaction: {e}")
             return False, f"Database error: {str(e)}"
 
+    def delete_transactions(self, transaction_ids, user_id):
+        """
+        Delete several of a user's transactions in one statement and one transaction
+
+        Ids that don't exist or belong to another user are simply not deleted.
+
+        Returns:
+            int: Number of transactions deleted
+        """
+        transaction_ids = list(transaction_ids)
+        if not transaction_ids:
+            return 0
+
+        try:
+            cursor = self.conn.cursor()
+            placeholders = ', '.join('?' * len(transaction_ids))
+            cursor.execute(
+                f"DELETE FROM transactions WHERE user_id = ? AND transaction_id IN ({placeholders})",
+                [user_id] + transaction_ids
+            )
+            self.conn.commit()
+
+            logger.info(f"✅ {cursor.rowcount} transaction(s) deleted by user {user_id}")
+            return cursor.rowcount
+
+        except Exception as e:
+            self.conn.rollback()
+            logger.error(f"❌ Error deleting transactions: {e}")
+            return 0
+
     def get_transaction_by_id(self, transaction_id):
         """Get a specific transaction by ID"""
         try:
@@ -336,89 +612,266 @@ class SQLiteManager:
     # ========================================
 
     def get_user_spending_summary(self, user_id, start_date=None, end_date=None):
-        """Get spending summary for a user"""
+        """
+        Get spending summary for a user
+
+        Reads the daily rollup, so date filters are applied at day granularity.
+        """
         try:
             cursor = self.conn.cursor()
 
+            query = """
+                SELECT
+                    COALESCE(SUM(txn_count), 0) as total_transactions,
+                    SUM(total_amount) as total_spending,
+                    SUM(total_amount) / SUM(txn_count) as avg_transaction,
+                    MAX(max_amount) as max_transaction,
+                    MIN(min_amount) as min_transaction
+                FROM daily_spending_rollup
+                WHERE user_id = ?
+            """
+            params = [user_id]
+
             if start_date and end_date:
-                cursor.execute(
-                    """
-                    SELECT
-                        COUNT(*) as total_transactions,
-                        SUM(amount) as total_spending,
-                        AVG(amount) as avg_transaction,
-                        MAX(amount) as max_transaction,
-                        MIN(amount) as min_transaction
-                    FROM transactions
-                    WHERE user_id = ?
-                    AND transaction_date BETWEEN ? AND ?
-                    """,
-                    (user_id, start_date, end_date)
-                )
-            else:
-                cursor.execute(
-                    """
-                    SELECT
-                        COUNT(*) as total_transactions,
-                        SUM(amount) as total_spending,
-                        AVG(amount) as avg_transaction,
-                        MAX(amount) as max_transaction,
-                        MIN(amount) as min_transaction
-                    FROM transactions
-                    WHERE user_id = ?
-                    """,
-                    (user_id,)
-                )
+                query += " AND day BETWEEN date(?) AND date(?)"
+                params.extend([start_date, end_date])
 
+            cursor.execute(query, params)
             row = cursor.fetchone()
             return dict(row) if row else {}
         except Exception as e:
             logger.error(f"Error getting spending summary: {e}")
             return {}
 
-    def get_category_breakdown(self, user_id, start_date=None, end_date=None):
-        """Get spending breakdown by category for a user"""
+    def get_category_breakdown(self, user_id, start_date=None, end_date=None, by_currency=False):
+        """
+        Get spending breakdown by category for a user
+
+        Reads the daily rollup, so date filters are applied at day granularity.
+        With by_currency=True there is one row per category and currency.
+        """
+        group_columns = "category, currency" if by_currency else "category"
+
         try:
             cursor = self.conn.cursor()
 
+            query = f"""
+                SELECT
+                    {group_columns},
+                    SUM(txn_count) as transaction_count,
+                    SUM(total_amount) as total_amount,
+                    SUM(total_amount) / SUM(txn_count) as avg_amount
+                FROM daily_spending_rollup
+                WHERE user_id = ?
+            """
+            params = [user_id]
+
             if start_date and end_date:
-                cursor.execute(
-                    """
-                    SELECT
-                        category,
-                        COUNT(*) as transaction_count,
-                        SUM(amount) as total_amount,
-                        AVG(amount) as avg_amount
-                    FROM transactions
-                    WHERE user_id = ?
-                    AND transaction_date BETWEEN ? AND ?
-                    GROUP BY category
-                    ORDER BY total_amount DESC
-                    """,
-                    (user_id, start_date, end_date)
-                )
-            else:
-                cursor.execute(
-                    """
-                    SELECT
-                        category,
-                        COUNT(*) as transaction_count,
-                        SUM(amount) as total_amount,
-                        AVG(amount) as avg_amount
-                    FROM transactions
-                    WHERE user_id = ?
-                    GROUP BY category
-                    ORDER BY total_amount DESC
-                    """,
-                    (user_id,)
-                )
+                query += " AND day BETWEEN date(?) AND date(?)"
+                params.extend([start_date, end_date])
+
+            query += f" GROUP BY {group_columns} ORDER BY total_amount DESC"
 
+            cursor.execute(query, params)
             rows = cursor.fetchall()
             return [dict(row) for row in rows]
         except Exception as e:
             logger.error(f"Error getting category breakdown: {e}")
             return []
 
+    def get_daily_spending(self, user_id, start_date=None, end_date=None):
+        """
+        Get per-day spending totals for a user (one row per day and currency)
+
+        Args:
+            user_id (str): User ID
+            start_date (datetime): Start date
+            end_date (datetime): End date
+
+        Returns:
+            list: Rows with day, currency, transaction_count, total_amount
+        """
+        try:
+            cursor = self.conn.cursor()
+
+            query = """
+                SELECT
+                    day,
+                    currency,
+                    SUM(txn_count) as transaction_count,
+                    SUM(total_amount) as total_amount
+                FROM daily_spending_rollup
+                WHERE user_id = ?
+            """
+            params = [user_id]
+
+            if start_date and end_date:
+                query += " AND day BETWEEN date(?) AND date(?)"
+                params.extend([start_date, end_date])
+
+            query += " GROUP BY day, currency ORDER BY day"
+
+            cursor.execute(query, params)
+            rows = cursor.fetchall()
+            return [dict(row) for row in rows]
+        except Exception as e:
+            logger.error(f"Error getting daily spending: {e}")
+            return []
+
+    def get_monthly_spending(self, user_id, start_date=None, end_date=None):
+        """
+        Get per-month spending totals for a user (one row per month, category and currency)
+
+        Returns:
+            list: Rows with month ('YYYY-MM'), category, currency, transaction_count, total_amount
+        """
+        try:
+            cursor = self.conn.cursor()
+
+            query = """
+                SELECT
+                    strftime('%Y-%m', day) as month,
+                    category,
+                    currency,
+                    SUM(txn_count) as transaction_count,
+                    SUM(total_amount) as total_amount
+                FROM daily_spending_rollup
+                WHERE user_id = ?
+            """
+            params = [user_id]
+
+            if start_date and end_date:
+                query += " AND day BETWEEN date(?) AND date(?)"
+                params.extend([start_date, end_date])
+
+            query += " GROUP BY month, category, currency ORDER BY month, category"
+
+            cursor.execute(query, params)
+            rows = cursor.fetchall()
+            return [dict(row) for row in rows]
+        except Exception as e:
+            logger.error(f"Error getting monthly spending: {e}")
+            return []
+
+    def get_spending_rollup(self, start_date, end_date):
+        """
+        Get every user's daily spending buckets in a date range (for batch jobs)
+
+        Returns:
+            list: Rows with user_id, day ('YYYY-MM-DD'), category, currency, transaction_count, total_amount
+        """
+        try:
+            cursor = self.conn.cursor()
+            cursor.execute(
+                """
+                SELECT user_id, day, category, currency,
+                       txn_count as transaction_count, total_amount
+                FROM daily_spending_rollup
+                WHERE day BETWEEN date(?) AND date(?)
+                """,
+                (start_date, end_date)
+            )
+            rows = cursor.fetchall()
+            return [dict(row) for row in rows]
+        except Exception as e:
+            logger.error(f"Error getting spending rollup: {e}")
+            return []
+
+    def rebuild_spending_rollup(self):
+        """Recompute the daily spending rollup from the transactions table"""
+        try:
+            cursor = self.conn.cursor()
+            cursor.execute("DELETE FROM daily_spending_rollup")
+            cursor.execute(ROLLUP_BACKFILL)
+            self.conn.commit()
+            logger.info("✅ Daily spending rollup rebuilt")
+        except Exception as e:
+            self.conn.rollback()
+            logger.error(f"❌ Error rebuilding spending rollup: {e}")
+            raise
+
+    # ========================================
+    # EXCHANGE RATES
+    # ========================================
+
+    def get_exchange_rate_dates(self, from_currency, to_currencies, start_date, end_date):
+        """
+        Get the days in [start_date, end_date] that have a rate for every target currency
+
+        Returns:
+            set: 'YYYY-MM-DD' strings
+        """
+        placeholders = ', '.join('?' for _ in to_currencies)
+        try:
+            cursor = self.conn.cursor()
+            cursor.execute(
+                f"""
+                SELECT rate_date FROM exchange_rates
+                WHERE from_currency = ? AND rate_date BETWEEN ? AND ?
+                AND to_currency IN ({placeholders})
+                GROUP BY rate_date
+                HAVING COUNT(*) = ?
+                """,
+                (from_currency, str(start_date), str(end_date), *to_currencies, len(to_currencies))
+            )
+            return {str(row[0]) for row in cursor.fetchall()}
+        except Exception as e:
+            logger.error(f"Error getting exchange rate dates: {e}")
+            return set()
+
+    def upsert_exchange_rates(self, rows):
+        """
+        Insert or update daily exchange rates in one transaction
+
+        Args:
+            rows (list): (from_currency, to_currency, rate, rate_date) tuples
+
+        Returns:
+            int: Number of rows written
+        """
+        rows = list(rows)
+        try:
+            cursor = self.conn.cursor()
+            cursor.executemany(
+                """
+                INSERT INTO exchange_rates (from_currency, to_currency, rate, rate_date)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT (from_currency, rate_date, to_currency) DO UPDATE SET rate = excluded.rate
+                """,
+                rows
+            )
+            self.conn.commit()
+            return len(rows)
+        except Exception as e:
+            self.conn.rollback()
+            logger.error(f"❌ Error upserting exchange rates: {e}")
+            raise
+
+    def get_latest_exchange_rates(self, from_currency):
+        """
+        Get the most recent stored rates for a base currency
+
+        Returns:
+            tuple: (rate_date: str or None, rates: dict)
+        """
+        try:
+            cursor = self.conn.cursor()
+            cursor.execute(
+                """
+                SELECT to_currency, rate, rate_date FROM exchange_rates
+                WHERE from_currency = ?
+                AND rate_date = (SELECT MAX(rate_date) FROM exchange_rates WHERE from_currency = ?)
+                """,
+                (from_currency, from_currency)
+            )
+            rows = cursor.fetchall()
+            if not rows:
+                return None, {}
+            return str(rows[0]['rate_date']), {row['to_currency']: row['rate'] for row in rows}
+        except Exception as e:
+            logger.error(f"Error getting exchange rates: {e}")
+            return None, {}
+
     def close(self):
         """Close database connection"""
         if self.conn:
@@ -4,7 +4,6 @@ Uses Prophet for forecasting future spending patterns
 """
 import pandas as pd
 import numpy as np
-from prophet import Prophet
 import joblib
 import sys
 import os
@@ -51,7 +50,11 @@ class SpendingForecaster:
         return category_data
 
     def train_models(self, category_data):
+        # Prophet (and its Stan backend) is slow to import, so only load it to fit
+        from prophet import Prophet
+
         print("\n[3/5] Training Prophet models per category...")
+        trained = []
         for i, (category, data) in enumerate(category_data.items(), 1):
             try:
                 print(f"  [{i}/{len(category_data)}] Training: {category}")
@@ -60,16 +63,19 @@ class SpendingForecaster:
                 model.add_seasonality(name='monthly', period=30.5, fourier_order=5)
                 model.fit(data)
                 self.models[category] = model
+                trained.append(category)
             except Exception as e:
                 print(f"    Warning: {category}: {str(e)}")
-        print(f"\n  Trained {len(self.models)} models")
+        print(f"\n  Trained {len(trained)} models")
+        return trained
 
-    def generate_forecasts(self):
+    def generate_forecasts(self, categories=None):
         print(f"\n[4/5] Generating {self.forecast_periods}-day forecasts...")
         all_forecasts = {}
-        for i, (category, model) in enumerate(self.models.items(), 1):
+        models = {c: m for c, m in self.models.items() if categories is None or c in categories}
+        for i, (category, model) in enumerate(models.items(), 1):
             try:
-                print(f"  [{i}/{len(self.models)}] Forecasting: {category}")
+                print(f"  [{i}/{len(models)}] Forecasting: {category}")
                 future = model.make_future_dataframe(periods=self.forecast_periods, freq='D')
                 forecast = model.predict(future)
                 forecast_data = forecast[['ds', 'yhat', 'yhat_lower', 'yhat_upper']].copy()
@@ -83,15 +89,26 @@ class SpendingForecaster:
         print(f"\n  Generated forecasts for {len(all_forecasts)} categories")
         return all_forecasts
 
-    def save_models_and_forecasts(self, all_forecasts):
+    def save_models_and_forecasts(self, all_forecasts, keep_categories=None):
+        """
+        Save the models and forecasts
+
+        keep_categories: categories whose rows in the existing forecasts file
+        are kept as-is (used by partial retrains)
+        """
         print("\n[5/5] Saving models and forecasts...")
         model_data = {'models': self.models, 'forecast_periods': self.forecast_periods}
         joblib.dump(model_data, MODEL_PATHS['forecaster'])
         print(f"  Models saved to: {MODEL_PATHS['forecaster']}")
         
+        forecast_path = PROCESSED_DATA_DIR / 'spending_forecasts.csv'
+        if keep_categories and forecast_path.exists():
+            previous = pd.read_csv(forecast_path, parse_dates=['ds'])
+            previous = previous[previous['category'].isin(keep_categories)]
+            all_forecasts = {**{c: g for c, g in previous.groupby('category')}, **all_forecasts}
+
         if all_forecasts:
             combined = pd.concat(all_forecasts.values(), ignore_index=True)
-            forecast_path = PROCESSED_DATA_DIR / 'spending_forecasts.csv'
             combined.to_csv(forecast_path, index=False)
             print(f"  Forecasts saved to: {forecast_path}")
             
@@ -103,11 +120,45 @@ class SpendingForecaster:
             print(f"\n    Total: ${category_totals.sum():,.2f}")
         return combined if all_forecasts else None
 
-    def train_and_save(self):
+    def load_models(self):
+        """Load previously trained models; returns False if there are none"""
+        if not MODEL_PATHS['forecaster'].exists():
+            return False
+        model_data = joblib.load(MODEL_PATHS['forecaster'])
+        self.models = model_data['models']
+        print(f"Models loaded from: {MODEL_PATHS['forecaster']}")
+        return True
+
+    def retrain_categories(self, df, categories):
+        """
+        Retrain and re-forecast only the given categories, keeping every other saved model
+
+        Categories with no rows left in df are dropped from the saved models.
+
+        Returns:
+            list: Categories retrained successfully
+        """
+        print("\n" + "="*60)
+        print(f"  PARTIAL FORECASTER RETRAINING ({len(categories)} categories)")
+        print("="*60)
+        self.load_models()
+
+        for category in set(categories) - set(df['category'].unique()):
+            self.models.pop(category, None)
+
+        category_data = self.prepare_data_for_prophet(df[df['category'].isin(categories)])
+        trained = self.train_models(category_data)
+        all_forecasts = self.generate_forecasts(categories=trained)
+
+        unchanged = [c for c in self.models if c not in trained]
+        self.save_models_and_forecasts(all_forecasts, keep_categories=unchanged)
+        return trained
+
+    def train_and_save(self, df=None):
         print("\n" + "="*60)
         print("  TIME-SERIES FORECASTING MODEL TRAINING")
         print("="*60)
-        df = self.load_data()
+        df = self.load_data() if df is None else df
         category_data = self.prepare_data_for_prophet(df)
         self.train_models(category_data)
         all_forecasts = self.generate_forecasts()
@@ -4,10 +4,6 @@ Uses PyOD (IsolationForest and AutoEncoder) for anomaly detection
 """
 import pandas as pd
 import numpy as np
-from sklearn.preprocessing import StandardScaler, LabelEncoder
-from sklearn.model_selection import train_test_split
-from pyod.models.iforest import IForest
-from pyod.models.auto_encoder import AutoEncoder
 import joblib
 import sys
 import os
@@ -23,9 +19,14 @@ class FraudDetector:
     def __init__(self):
         self.iforest_model = None
         self.autoencoder_model = None
-        self.scaler = StandardScaler()
+        # Fitted in train_models() or restored by load_models(); sklearn/pyod
+        # (and torch, via the AutoEncoder) are only imported when training
+        self.scaler = None
         self.label_encoders = {}
         self.feature_columns = []
+        # Training-time aggregates, reused when scoring small batches
+        self.user_stats = None
+        self.category_stats = None
 
     def load_data(self):
         """Load transaction data"""
@@ -36,9 +37,17 @@ class FraudDetector:
         print(f"  Loaded {len(df)} transactions")
         return df
 
-    def engineer_features(self, df):
-        """Create features for fraud detection"""
-        print("\n[2/6] Engineering features for fraud detection...")
+    def engineer_features(self, df, fit=True, verbose=True):
+        """
+        Create features for fraud detection
+
+        fit=True learns the label encodings and user/category aggregates from df
+        (training). fit=False reuses the ones learned at training time, so a
+        small batch of new transactions is scored against the full history.
+        verbose=False silences the progress output (e.g. per scoring batch).
+        """
+        if verbose:
+            print("\n[2/6] Engineering features for fraud detection...")
 
         # Time-based features
         df['hour'] = pd.to_datetime(df['transaction_date']).dt.hour
@@ -59,6 +68,12 @@ class FraudDetector:
             ('user_max_amount', 'max'),
             ('user_transaction_count', 'count')
         ]).reset_index()
+        if fit:
+            self.user_stats = user_stats
+        elif self.user_stats is not None:
+            # Known users keep their training-time stats; new users fall back to the batch
+            user_stats = self.user_stats.set_index('user_id').combine_first(
+                user_stats.set_index('user_id')).reset_index()
         df = df.merge(user_stats, on='user_id', how='left')
 
         # Deviation from user's normal behavior
@@ -70,14 +85,25 @@ class FraudDetector:
             ('category_mean_amount', 'mean'),
             ('category_std_amount', 'std')
         ]).reset_index()
+        if fit:
+            self.category_stats = category_stats
+        elif self.category_stats is not None:
+            category_stats = self.category_stats.set_index('category').combine_first(
+                category_stats.set_index('category')).reset_index()
         df = df.merge(category_stats, on='category', how='left')
 
-        # Encode categorical variables
+        # Encode categorical variables (values unseen at training time become -1)
         categorical_cols = ['category', 'payment_method', 'currency']
         for col in categorical_cols:
-            le = LabelEncoder()
-            df[f'{col}_encoded'] = le.fit_transform(df[col].astype(str))
-            self.label_encoders[col] = le
+            values = df[col].astype(str) if col in df.columns else pd.Series('unknown', index=df.index)
+            if fit:
+                from sklearn.preprocessing import LabelEncoder
+                le = LabelEncoder()
+                df[f'{col}_encoded'] = le.fit_transform(values)
+                self.label_encoders[col] = le
+            else:
+                codes = {label: code for code, label in enumerate(self.label_encoders[col].classes_)}
+                df[f'{col}_encoded'] = values.map(codes).fillna(-1).astype(int)
 
         # Transaction velocity (transactions per hour per user)
         df = df.sort_values(['user_id', 'transaction_date'])
@@ -88,7 +114,8 @@ class FraudDetector:
         # Round amount detection (potential fraud indicator)
         df['is_round_amount'] = ((df['amount_usd'] % 100 == 0) & (df['amount_usd'] > 0)).astype(int)
 
-        print(f"  Created {len(df.columns)} total features")
+        if verbose:
+            print(f"  Created {len(df.columns)} total features")
 
         return df
 
@@ -120,9 +147,15 @@ class FraudDetector:
 
     def train_models(self, X, y):
         """Train both IsolationForest and AutoEncoder models"""
+        from sklearn.preprocessing import StandardScaler
+        from sklearn.model_selection import train_test_split
+        from pyod.models.iforest import IForest
+        from pyod.models.auto_encoder import AutoEncoder
+
         print("\n[4/6] Training anomaly detection models...")
 
         # Scale features
+        self.scaler = StandardScaler()
         X_scaled = self.scaler.fit_transform(X)
 
         # Split data (we'll use all data for training anomaly detectors, but keep test set for evaluation)
@@ -212,6 +245,27 @@ class FraudDetector:
 
         return predictions, fraud_probability, ensemble_scores
 
+    def score_transactions(self, df):
+        """
+        Score a batch of new transactions with the loaded models in one vectorized pass
+
+        Args:
+            df (DataFrame): Transactions with amount_usd, transaction_date, user_id, category, currency
+
+        Returns:
+            DataFrame: The batch with fraud_score, fraud_probability and fraud_prediction columns
+        """
+        df = df.copy()
+        df['transaction_date'] = pd.to_datetime(df['transaction_date'])
+        df = self.engineer_features(df, fit=False, verbose=False)
+        df[self.feature_columns] = df[self.feature_columns].fillna(0)
+
+        predictions, probabilities, ensemble_scores = self.predict(df)
+        df['fraud_score'] = ensemble_scores
+        df['fraud_probability'] = probabilities
+        df['fraud_prediction'] = predictions
+        return df
+
     def save_models(self):
         """Save trained models"""
         print("\n[6/6] Saving models...")
@@ -221,7 +275,9 @@ class FraudDetector:
             'autoencoder_model': self.autoencoder_model,
             'scaler': self.scaler,
             'label_encoders': self.label_encoders,
-            'feature_columns': self.feature_columns
+            'feature_columns': self.feature_columns,
+            'user_stats': self.user_stats,
+            'category_stats': self.category_stats
         }
 
         joblib.dump(model_data, MODEL_PATHS['fraud_detector'])
@@ -235,16 +291,19 @@ class FraudDetector:
         self.scaler = model_data['scaler']
         self.label_encoders = model_data['label_encoders']
         self.feature_columns = model_data['feature_columns']
+        # Not present in model files saved before batch scoring existed
+        self.user_stats = model_data.get('user_stats')
+        self.category_stats = model_data.get('category_stats')
         print(f"Models loaded from: {MODEL_PATHS['fraud_detector']}")
 
-    def train_and_save(self):
-        """Complete training pipeline"""
+    def train_and_save(self, df=None):
+        """Complete training pipeline (df: already-loaded transactions, optional)"""
         print("\n" + "="*60)
         print("  FRAUD DETECTION MODEL TRAINING")
         print("="*60)
 
         # Load and prepare data
-        df = self.load_data()
+        df = self.load_data() if df is None else df
         df = self.engineer_features(df)
         X, y = self.prepare_features(df)
 
@@ -0,0 +1,367 @@
+"""
+Batch Report Generation
+Pre-builds every user's "Last N days" summary reports into REPORTS_DIR, so the
+dashboard can hand out a finished file instead of rendering one on request
+"""
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta
+from pathlib import Path
+import threading
+import shutil
+import json
+import time
+import sys
+import os
+
+import pandas as pd
+
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, project_root)
+
+from config.config import RAW_DATA_DIR, REPORTS_DIR, REPORT_CONFIG
+from src.reporting.report_engine import build_monthly_summary, RENDERERS, REPORT_FORMATS
+
+BATCH_DIR = REPORTS_DIR / 'batch'
+MANIFEST_NAME = 'manifest.json'
+
+
+# ========================================
+# LOADING
+# ========================================
+
+def get_report_store():
+    """Get the database manager for the configured storage mode (None in CSV mode)"""
+    storage_mode = os.getenv('DATA_STORAGE_MODE', 'csv')
+    if storage_mode == 'postgresql':
+        from src.database.postgres_manager import get_db_manager
+    elif storage_mode == 'sqlite':
+        from src.database.sqlite_manager import get_db_manager
+    else:
+        return None
+    return get_db_manager()
+
+
+def load_users(store):
+    """
+    Load every user's name and preferred currency
+
+    Returns:
+        DataFrame: user_id, name, preferred_currency
+    """
+    columns = ['user_id', 'name', 'preferred_currency']
+    if store is None:
+        users_df = pd.read_csv(RAW_DATA_DIR / 'users.csv', usecols=columns)
+    else:
+        users_df = pd.DataFrame(store.get_all_users()).reindex(columns=columns)
+    users_df['user_id'] = users_df['user_id'].astype(str)
+    return users_df
+
+
+def load_daily_spending(store, start_date, end_date):
+    """
+    Load all users' spending per day, category and currency in a single read
+
+    Database modes read the daily_spending_rollup buckets; CSV mode groups the
+    raw transactions once.
+
+    Returns:
+        DataFrame: user_id, day, category, currency, transaction_count, total_amount
+    """
+    columns = ['user_id', 'day', 'category', 'currency', 'transaction_count', 'total_amount']
+
+    if store is None:
+        df = pd.read_csv(
+            RAW_DATA_DIR / 'transactions.csv',
+            usecols=['user_id', 'transaction_date', 'category', 'currency', 'amount']
+        )
+        df['day'] = pd.to_datetime(df['transaction_date']).dt.normalize()
+        df = df[(df['day'] >= pd.Timestamp(start_date)) & (df['day'] <= pd.Timestamp(end_date))]
+        daily_df = df.groupby(['user_id', 'day', 'category', 'currency'], as_index=False).agg(
+            transaction_count=('amount', 'size'),
+            total_amount=('amount', 'sum')
+        )
+    else:
+        rows = store.get_spending_rollup(str(start_date), str(end_date))
+        daily_df = pd.DataFrame(rows, columns=None if rows else columns).reindex(columns=columns)
+        daily_df['day'] = pd.to_datetime(daily_df['day'])
+        daily_df['transaction_count'] = daily_df['transaction_count'].astype(int)
+        daily_df['total_amount'] = daily_df['total_amount'].astype(float)
+
+    daily_df['user_id'] = daily_df['user_id'].astype(str)
+    return daily_df
+
+
+def monthly_spending(daily_df, start_date):
+    """Roll daily buckets from start_date on up to month/category/currency for every user at once"""
+    period_df = daily_df[daily_df['day'] >= pd.Timestamp(start_date)]
+    return period_df.assign(month=period_df['day'].dt.strftime('%Y-%m')).groupby(
+        ['user_id', 'month', 'category', 'currency'], as_index=False
+    ).agg(transaction_count=('transaction_count', 'sum'), total_amount=('total_amount', 'sum'))
+
+
+# ========================================
+# RENDERING (runs in worker processes)
+# ========================================
+
+def render_user_reports(users, factors_by_currency, formats, run_dir):
+    """
+    Render and write every period/format for a group of users
+
+    Args:
+        users (list): Dicts with user_id, name, currency and periods
+                      ({days: {'start', 'end', 'monthly': DataFrame}})
+        factors_by_currency (dict): {report currency: {source currency: factor}}
+        formats (list): Report formats to render
+        run_dir (str): Directory of this batch run
+
+    Returns:
+        tuple: (manifest entries {user_id: {'currency', 'periods'}},
+                failures {user_id: error message})
+    """
+    entries = {}
+    failures = {}
+    for user in users:
+        user_dir = Path(run_dir) / user['user_id']
+        try:
+            entries[user['user_id']] = _render_one_user(user, factors_by_currency, formats, user_dir)
+        except Exception as e:
+            # One user's bad data must not cost everyone else their reports
+            shutil.rmtree(user_dir, ignore_errors=True)
+            failures[user['user_id']] = f"{type(e).__name__}: {e}"
+    return entries, failures
+
+
+def _render_one_user(user, factors_by_currency, formats, user_dir):
+    """Render and write one user's reports and return their manifest entry"""
+    user_dir.mkdir(parents=True, exist_ok=True)
+    factors = factors_by_currency[user['currency']]
+
+    periods = {}
+    for days, period in user['periods'].items():
+        monthly_df = period['monthly']
+        summary = build_monthly_summary(monthly_df, factors, user['currency'])
+        meta = {
+            'user_name': user['name'],
+            'currency': user['currency'],
+            'period': f"{period['start']} to {period['end']}"
+        }
+
+        files = {}
+        for fmt in formats:
+            file_name = f"summary_{days}d.{REPORT_FORMATS[fmt][1]}"
+            (user_dir / file_name).write_bytes(RENDERERS[fmt](summary, meta))
+            files[fmt] = f"{user['user_id']}/{file_name}"
+
+        periods[str(days)] = {
+            'start': period['start'],
+            'end': period['end'],
+            # Fingerprint of the source data, checked before a report is served
+            'transactions': int(monthly_df['transaction_count'].sum()),
+            'total_amount': round(float(monthly_df['total_amount'].sum()), 2),
+            'files': files
+        }
+
+    return {'currency': user['currency'], 'periods': periods}
+
+
+# ========================================
+# BATCH RUN
+# ========================================
+
+def prune_runs(output_dir, keep):
+    """Delete all but the newest `keep` dated run directories"""
+    runs = sorted(p for p in Path(output_dir).iterdir() if p.is_dir() and not p.name.endswith('.partial'))
+    for old_run in runs[:-keep] if keep else []:
+        shutil.rmtree(old_run, ignore_errors=True)
+
+
+def run_batch_reports(as_of=None, store=None, converter=None, periods=None, formats=None,
+                      max_workers=None, output_dir=None):
+    """
+    Build every user's summary reports for the configured periods
+
+    Transactions are read once and rolled up for all users in one grouped pass
+    per period; rendering is spread over a process pool in groups of users.
+    Files land in <output_dir>/<as_of>/<user_id>/ with a manifest.json that
+    the dashboard uses to find them.
+
+    Args:
+        as_of (date): Last day covered by every report (default: today)
+        store: Database manager (default: get_report_store(); None reads the CSV files)
+        converter: CurrencyConverter for report currencies (default: one backed by the rate store)
+        periods (list): Report lengths in days (default: REPORT_CONFIG['batch_periods_days'])
+        formats (list): Formats to render (default: REPORT_CONFIG['batch_formats'])
+        max_workers (int): Render processes (default: REPORT_CONFIG['batch_workers'])
+        output_dir (Path): Where dated runs are written (default: REPORTS_DIR/batch)
+
+    Returns:
+        dict: Run summary (users, failed users, files, timings, users/second)
+    """
+    timings = {}
+    started = time.perf_counter()
+    as_of = as_of or date.today()
+    periods = sorted(periods or REPORT_CONFIG['batch_periods_days'])
+    formats = formats or REPORT_CONFIG['batch_formats']
+    output_dir = Path(output_dir or BATCH_DIR)
+    store = store or get_report_store()
+
+    # Load once: users plus daily buckets for the longest period
+    users_df = load_users(store)
+    daily_df = load_daily_spending(store, as_of - timedelta(days=periods[-1]), as_of)
+    timings['load'] = time.perf_counter() - started
+
+    step = time.perf_counter()
+    if converter is None:
+        from src.currency.currency_converter import CurrencyConverter
+        from src.currency.rate_pipeline import get_rate_store
+        # Rates live in SQLite even in CSV mode, where store is None
+        converter = CurrencyConverter(rate_store=store or get_rate_store())
+
+    users = {
+        row.user_id: {'user_id': row.user_id, 'name': row.name,
+                      'currency': row.preferred_currency or 'USD', 'periods': {}}
+        for row in users_df.itertuples(index=False)
+    }
+    for days in periods:
+        start = as_of - timedelta(days=days)
+        for user_id, monthly_df in monthly_spending(daily_df, start).groupby('user_id'):
+            if user_id in users:
+                users[user_id]['periods'][days] = {
+                    'start': str(start), 'end': str(as_of),
+                    'monthly': monthly_df.drop(columns='user_id').reset_index(drop=True)
+                }
+    # Users without spending in any period get no reports (the dashboard has nothing to export either)
+    users = [user for user in users.values() if user['periods']]
+
+    source_currencies = daily_df['currency'].unique()
+    factors_by_currency = {
+        currency: converter.get_conversion_factors(source_currencies, currency)
+        for currency in {user['currency'] for user in users}
+    }
+    timings['aggregate'] = time.perf_counter() - step
+
+    # Render into a scratch directory, then swap it in so readers never see a half-written run
+    step = time.perf_counter()
+    run_dir = output_dir / str(as_of)
+    partial_dir = output_dir / f"{as_of}.partial"
+    shutil.rmtree(partial_dir, ignore_errors=True)
+    partial_dir.mkdir(parents=True)
+
+    max_workers = max_workers or REPORT_CONFIG['batch_workers'] or os.cpu_count()
+    # Groups amortize pickling the inputs, but stay small enough to keep every worker busy
+    per_task = max(1, min(REPORT_CONFIG['batch_users_per_task'], -(-len(users) // max_workers)))
+    groups = [users[i:i + per_task] for i in range(0, len(users), per_task)]
+    entries = {}
+    failures = {}
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(render_user_reports, group, factors_by_currency, formats, str(partial_dir))
+            for group in groups
+        ]
+        for group, future in zip(groups, futures):
+            try:
+                group_entries, group_failures = future.result()
+            except Exception as e:
+                # The whole task was lost (e.g. a crashed worker): fail its users, keep the rest
+                group_entries = {}
+                group_failures = {user['user_id']: f"{type(e).__name__}: {e}" for user in group}
+            entries.update(group_entries)
+            failures.update(group_failures)
+    timings['render'] = time.perf_counter() - step
+
+    timings['total'] = time.perf_counter() - started
+    files = sum(len(period['files']) for entry in entries.values() for period in entry['periods'].values())
+    summary = {
+        'as_of': str(as_of),
+        'users': len(entries),
+        'failed_users': len(failures),
+        'files': files,
+        'users_per_second': round(len(entries) / timings['total'], 1) if timings['total'] else 0.0,
+        'timings': {name: round(seconds, 3) for name, seconds in timings.items()}
+    }
+    manifest = {
+        'generated_at': datetime.now().isoformat(timespec='seconds'),
+        'rates_as_of': str(converter.last_update) if converter.last_update else None,
+        'periods_days': periods,
+        'formats': formats,
+        'stats': summary,
+        'users': entries,
+        # Users without reports here fall back to on-demand rendering in the dashboard
+        'failures': failures
+    }
+    with open(partial_dir / MANIFEST_NAME, 'w') as f:
+        json.dump(manifest, f)
+
+    shutil.rmtree(run_dir, ignore_errors=True)
+    partial_dir.rename(run_dir)
+    prune_runs(output_dir, REPORT_CONFIG['batch_keep_runs'])
+
+    print(f"[OK] Batch reports for {as_of}: {summary['users']} users, {files} files "
+          f"in {summary['timings']['total']}s ({summary['users_per_second']} users/s): {summary['timings']}")
+    if failures:
+        print(f"[WARN] {len(failures)} users failed to render (see 'failures' in {run_dir / MANIFEST_NAME}):")
+        for user_id, error in list(failures.items())[:10]:
+            print(f"       {user_id}: {error}")
+    return summary
+
+
+# ========================================
+# LOOKUP (dashboard side)
+# ========================================
+
+_manifests = {}
+_manifests_lock = threading.Lock()
+
+
+def load_manifest(as_of, output_dir=None):
+    """Load the manifest of the batch run for as_of (re-read only when the file changes), or None"""
+    path = Path(output_dir or BATCH_DIR) / str(as_of) / MANIFEST_NAME
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+
+    with _manifests_lock:
+        cached = _manifests.get(path)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+
+    with open(path) as f:
+        manifest = json.load(f)
+    with _manifests_lock:
+        _manifests[path] = (mtime, manifest)
+    return manifest
+
+
+def find_prebuilt_report(user_id, start_date, end_date, currency, fmt, monthly_df, output_dir=None):
+    """
+    Find a pre-built summary matching a dashboard request
+
+    A file is only reused when it covers the same days in the same currency and
+    its transaction count and total still match monthly_df, so any change since
+    the batch run falls back to rendering on request.
+
+    Returns:
+        Path: Report file, or None
+    """
+    start_day = str(pd.Timestamp(start_date).date())
+    end_day = str(pd.Timestamp(end_date).date())
+    output_dir = Path(output_dir or BATCH_DIR)
+
+    manifest = load_manifest(end_day, output_dir)
+    user = manifest['users'].get(str(user_id)) if manifest else None
+    if not user or user['currency'] != currency:
+        return None
+
+    transactions = int(monthly_df['transaction_count'].sum())
+    total_amount = float(monthly_df['total_amount'].sum())
+    for period in user['periods'].values():
+        if (period['start'] == start_day and period['end'] == end_day and fmt in period['files']
+                and period['transactions'] == transactions
+                and abs(period['total_amount'] - total_amount) < 0.01):
+            return output_dir / end_day / period['files'][fmt]
+    return None
+
+
+if __name__ == "__main__":
+    run_batch_reports()
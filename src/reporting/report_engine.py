@@ -0,0 +1,238 @@
+"""
+Report Engine
+Monthly spending summaries rendered to PDF/XLSX/CSV on a background worker pool,
+cached so repeated downloads of the same report are instant
+"""
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import tempfile
+import threading
+import io
+import sys
+import os
+
+import pandas as pd
+
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, project_root)
+
+from config.config import REPORT_CONFIG
+
+REPORT_FORMATS = {
+    'pdf': ('application/pdf', 'pdf'),
+    'xlsx': ('application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', 'xlsx'),
+    'csv': ('text/csv', 'csv'),
+}
+
+
+# ========================================
+# SUMMARY
+# ========================================
+
+def build_monthly_summary(monthly_df, factors, currency):
+    """
+    Convert per-month/category/currency aggregates into one currency
+
+    Args:
+        monthly_df (DataFrame): month, category, currency, transaction_count, total_amount
+        factors (dict): Conversion factor per source currency
+        currency (str): Report currency
+
+    Returns:
+        dict: 'by_category' (month x category rows), 'monthly' (one row per month),
+              'categories' (totals per category), 'totals' (overall figures)
+    """
+    amount_column = f'total_{currency}'
+    converted = monthly_df.assign(**{amount_column: monthly_df['total_amount'] * monthly_df['currency'].map(factors)})
+
+    by_category = (converted.groupby(['month', 'category'], as_index=False)
+                   .agg(transaction_count=('transaction_count', 'sum'), **{amount_column: (amount_column, 'sum')})
+                   .round({amount_column: 2}))
+    monthly = (by_category.groupby('month', as_index=False)
+               .agg(transaction_count=('transaction_count', 'sum'), **{amount_column: (amount_column, 'sum')}))
+    categories = (by_category.groupby('category', as_index=False)
+                  .agg(transaction_count=('transaction_count', 'sum'), **{amount_column: (amount_column, 'sum')})
+                  .sort_values(amount_column, ascending=False))
+
+    total_count = int(monthly['transaction_count'].sum())
+    total_amount = float(monthly[amount_column].sum())
+    totals = {
+        'transactions': total_count,
+        'total': round(total_amount, 2),
+        'average_transaction': round(total_amount / total_count, 2) if total_count else 0.0,
+        'average_month': round(total_amount / len(monthly), 2) if len(monthly) else 0.0,
+        'top_category': categories['category'].iloc[0] if len(categories) else 'N/A',
+    }
+    return {'by_category': by_category, 'monthly': monthly, 'categories': categories, 'totals': totals}
+
+
+# ========================================
+# RENDERERS
+# ========================================
+
+def render_xlsx(summary, meta):
+    """Render a summary to XLSX bytes (one sheet per table)"""
+    buffer = io.BytesIO()
+    with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
+        overview = pd.DataFrame(
+            [('User', meta['user_name']), ('Period', meta['period']), ('Currency', meta['currency'])]
+            + [(name.replace('_', ' ').title(), value) for name, value in summary['totals'].items()],
+            columns=['Metric', 'Value']
+        )
+        overview.to_excel(writer, sheet_name='Summary', index=False)
+        summary['monthly'].to_excel(writer, sheet_name='Monthly', index=False)
+        summary['categories'].to_excel(writer, sheet_name='Categories', index=False)
+        summary['by_category'].to_excel(writer, sheet_name='Monthly by Category', index=False)
+    return buffer.getvalue()
+
+
+def _latin1(value):
+    """Text the core PDF fonts can encode (anything outside Latin-1 becomes '?')"""
+    return str(value).encode('latin-1', 'replace').decode('latin-1')
+
+
+def render_pdf(summary, meta):
+    """Render a summary to PDF bytes"""
+    from fpdf import FPDF
+
+    currency = meta['currency']
+    amount_column = f'total_{currency}'
+
+    pdf = FPDF()
+    pdf.add_page()
+    pdf.set_font('Arial', 'B', 16)
+    pdf.cell(0, 10, 'Smart Finance - Spending Summary', ln=1)
+    pdf.set_font('Arial', '', 11)
+    # User names and categories are free text; core Arial only covers Latin-1
+    pdf.cell(0, 7, _latin1(f"{meta['user_name']} | {meta['period']} | {currency}"), ln=1)
+    pdf.ln(4)
+
+    def table(title, header, rows, widths):
+        pdf.set_font('Arial', 'B', 12)
+        pdf.cell(0, 8, title, ln=1)
+        pdf.set_font('Arial', 'B', 10)
+        for text, width in zip(header, widths):
+            pdf.cell(width, 7, _latin1(text), border=1)
+        pdf.ln()
+        pdf.set_font('Arial', '', 10)
+        for row in rows:
+            for text, width in zip(row, widths):
+                pdf.cell(width, 6, _latin1(text), border=1)
+            pdf.ln()
+        pdf.ln(4)
+
+    totals = summary['totals']
+    table('Overview', ['Metric', 'Value'], [
+        ('Transactions', f"{totals['transactions']:,}"),
+        ('Total spending', f"{currency} {totals['total']:,.2f}"),
+        ('Average transaction', f"{currency} {totals['average_transaction']:,.2f}"),
+        ('Average per month', f"{currency} {totals['average_month']:,.2f}"),
+        ('Top category', totals['top_category']),
+    ], [70, 80])
+    table('Monthly Spending', ['Month', 'Transactions', f'Total ({currency})'], [
+        (row.month, f"{row.transaction_count:,}", f"{getattr(row, amount_column):,.2f}")
+        for row in summary['monthly'].itertuples(index=False)
+    ], [40, 40, 60])
+    table('Spending by Category', ['Category', 'Transactions', f'Total ({currency})'], [
+        (row.category, f"{row.transaction_count:,}", f"{getattr(row, amount_column):,.2f}")
+        for row in summary['categories'].itertuples(index=False)
+    ], [60, 40, 60])
+
+    return pdf.output(dest='S').encode('latin-1')
+
+
+def export_csv(transactions, chunk_rows=None):
+    """
+    Write transactions to CSV in chunks and return the bytes
+
+    `transactions` is either a DataFrame, written chunk_rows rows at a time,
+    or an iterable of DataFrame batches (e.g. streamed from a server-side
+    cursor). Chunks go to a spooled temporary file that moves to disk once it
+    grows large, so a big export does not build one giant string in memory.
+    """
+    if isinstance(transactions, pd.DataFrame):
+        chunk_rows = chunk_rows or REPORT_CONFIG['export_chunk_rows']
+        batches = (transactions.iloc[start:start + chunk_rows]
+                   for start in range(0, max(len(transactions), 1), chunk_rows))
+    else:
+        batches = transactions
+
+    with tempfile.SpooledTemporaryFile(max_size=16 * 1024 * 1024, mode='w+b') as spool:
+        text = io.TextIOWrapper(spool, encoding='utf-8', newline='')
+        for i, batch in enumerate(batches):
+            batch.to_csv(text, index=False, header=(i == 0))
+        text.flush()
+        spool.seek(0)
+        data = spool.read()
+        text.detach()
+    return data
+
+
+RENDERERS = {'pdf': render_pdf, 'xlsx': render_xlsx}
+
+
+# ========================================
+# ENGINE
+# ========================================
+
+class ReportEngine:
+    """
+    Renders reports on a bounded background pool and caches the results
+
+    The cache holds futures keyed by the caller (e.g. user, range, currency,
+    data version, format): a request for a report that is already rendering
+    joins the running job, and a finished one is returned immediately.
+    """
+
+    def __init__(self, max_workers=None, max_entries=None):
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers or REPORT_CONFIG['workers'],
+            thread_name_prefix='report'
+        )
+        self.max_entries = max_entries or REPORT_CONFIG['cache_entries']
+        self._reports = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, key, render, *args):
+        """
+        Get the report for key, starting render(*args) in the background if needed
+
+        Returns:
+            Future: Resolves to the report bytes
+        """
+        with self._lock:
+            future = self._reports.get(key)
+            # Failed renders are retried rather than cached
+            if future is not None and not (future.done() and future.exception() is not None):
+                self._reports.move_to_end(key)
+                return future
+
+            future = self.executor.submit(render, *args)
+            self._reports[key] = future
+            while len(self._reports) > self.max_entries:
+                self._reports.popitem(last=False)
+            return future
+
+    def submit_summary(self, key, fmt, monthly_df, factors, meta):
+        """Summarize monthly aggregates and render them as 'pdf' or 'xlsx' in the background"""
+        def build():
+            return RENDERERS[fmt](build_monthly_summary(monthly_df, factors, meta['currency']), meta)
+        return self.submit(key, build)
+
+    def submit_export(self, key, transactions, chunk_rows=None):
+        """Export transactions (a DataFrame or DataFrame batches) to CSV in the background"""
+        return self.submit(key, export_csv, transactions, chunk_rows)
+
+
+# Process-wide engine, shared by every dashboard session
+_report_engine = None
+_report_engine_lock = threading.Lock()
+
+
+def get_report_engine():
+    """Get the shared ReportEngine"""
+    global _report_engine
+    with _report_engine_lock:
+        if _report_engine is None:
+            _report_engine = ReportEngine()
+        return _report_engine
@@ -0,0 +1,180 @@
+"""
+Incremental Model Retraining
+Detects what changed since the last run and retrains only what needs it:
+forecaster categories whose data changed, and the fraud models only when
+the amount distribution has drifted
+"""
+import pandas as pd
+import numpy as np
+from datetime import datetime
+import json
+import time
+import sys
+import os
+
+project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, project_root)
+
+from config.config import RAW_DATA_DIR, MODEL_PATHS, RETRAIN_CONFIG
+
+
+def load_transactions():
+    """Load the transactions once for change detection and both trainers"""
+    df = pd.read_csv(RAW_DATA_DIR / 'transactions.csv')
+    df['transaction_date'] = pd.to_datetime(df['transaction_date'])
+    return df
+
+
+def load_state(path=None):
+    """Load the watermarks and drift baseline saved by the previous run"""
+    path = path or MODEL_PATHS['retraining_state']
+    if not os.path.exists(path):
+        return {'categories': {}, 'users': {}, 'fraud_baseline': None, 'runs': []}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_state(state, path=None):
+    path = path or MODEL_PATHS['retraining_state']
+    with open(path, 'w') as f:
+        json.dump(state, f, indent=2)
+
+
+def compute_watermarks(df, key):
+    """
+    Summarize each group by (row count, amount total, latest transaction date)
+
+    Any insert, delete or amount edit in a group changes its watermark.
+
+    Returns:
+        dict: {group: [rows, amount_usd_total, last_date]}
+    """
+    stats = df.groupby(key).agg(
+        rows=('amount_usd', 'size'),
+        amount=('amount_usd', 'sum'),
+        last=('transaction_date', 'max')
+    )
+    return {
+        str(group): [int(row.rows), round(float(row.amount), 2), str(row.last)]
+        for group, row in stats.iterrows()
+    }
+
+
+def changed_keys(previous, current):
+    """Groups that are new, removed, or whose watermark moved"""
+    return sorted(k for k in set(previous) | set(current) if previous.get(k) != current.get(k))
+
+
+def drift_baseline(amounts, bins):
+    """Quantile bin edges and proportions of log(amount) to compare later runs against (None if empty)"""
+    if len(amounts) == 0:
+        return None
+    values = np.log1p(np.clip(amounts, 0, None))
+    inner_edges = np.unique(np.quantile(values, np.linspace(0, 1, bins + 1)))[1:-1]
+    proportions = np.histogram(values, bins=np.r_[-np.inf, inner_edges, np.inf])[0] / len(values)
+    return {'edges': [float(e) for e in inner_edges], 'proportions': proportions.tolist()}
+
+
+def population_stability_index(baseline, amounts):
+    """PSI of the current log(amount) distribution against a saved baseline (None if either is empty)"""
+    if not baseline or not baseline.get('proportions') or len(amounts) == 0:
+        return None
+    values = np.log1p(np.clip(amounts, 0, None))
+    edges = np.r_[-np.inf, baseline['edges'], np.inf]
+    expected = np.clip(np.array(baseline['proportions']), 1e-6, None)
+    actual = np.clip(np.histogram(values, bins=edges)[0] / len(values), 1e-6, None)
+    return float(np.sum((actual - expected) * np.log(actual / expected)))
+
+
+def run_retraining(df=None, force=False, state_path=None):
+    """
+    Retrain what changed since the last run and record per-step timings
+
+    Args:
+        df (DataFrame): Transactions (default: load_transactions())
+        force (bool): Retrain every forecaster category and the fraud models
+        state_path (str): Where watermarks, drift baseline and run history live
+
+    Returns:
+        dict: Run record (changed categories/users, drift, what was retrained, timings)
+    """
+    timings = {}
+    started = time.perf_counter()
+    state = load_state(state_path)
+
+    df = load_transactions() if df is None else df
+    timings['load'] = time.perf_counter() - started
+
+    # Change detection
+    step = time.perf_counter()
+    category_marks = compute_watermarks(df, 'category')
+    user_marks = compute_watermarks(df, 'user_id')
+    have_forecaster = os.path.exists(MODEL_PATHS['forecaster'])
+    have_fraud = os.path.exists(MODEL_PATHS['fraud_detector'])
+
+    if force or not have_forecaster:
+        changed_categories = sorted(category_marks)
+    else:
+        changed_categories = changed_keys(state['categories'], category_marks)
+    changed_users = changed_keys(state['users'], user_marks)
+
+    baseline = state.get('fraud_baseline')
+    drift = population_stability_index(baseline, df['amount_usd'].to_numpy())
+    # No drift is computable without a baseline or rows; with no rows there is nothing to train on either
+    retrain_fraud = len(df) > 0 and (
+        force or not have_fraud or drift is None or drift >= RETRAIN_CONFIG['fraud_drift_threshold']
+    )
+    timings['detect_changes'] = time.perf_counter() - step
+
+    print(f"[Retrain] {len(changed_categories)}/{len(category_marks)} categories changed, "
+          f"{len(changed_users)} users changed, drift={'n/a' if drift is None else f'{drift:.4f}'}")
+
+    # Forecaster: only the changed categories (model modules are heavy, import on demand)
+    retrained_categories = []
+    if changed_categories:
+        step = time.perf_counter()
+        from src.forecasting.forecaster import SpendingForecaster
+        retrained_categories = SpendingForecaster().retrain_categories(df, changed_categories)
+        timings['forecaster'] = time.perf_counter() - step
+
+    # Failed categories keep their old watermark, so the next run retries them
+    for category in retrained_categories:
+        state['categories'][category] = category_marks[category]
+    for category in set(changed_categories) - set(category_marks):
+        state['categories'].pop(category, None)
+    save_state(state, state_path)
+
+    # Fraud models: skipped unless the amount distribution moved
+    if retrain_fraud:
+        step = time.perf_counter()
+        from src.fraud_detection.fraud_detector import FraudDetector
+        FraudDetector().train_and_save(df.copy())
+        state['fraud_baseline'] = drift_baseline(df['amount_usd'].to_numpy(), RETRAIN_CONFIG['drift_bins'])
+        timings['fraud'] = time.perf_counter() - step
+    elif len(df) == 0:
+        print("[Retrain] No transactions, keeping current fraud models")
+    else:
+        print(f"[Retrain] Fraud drift below {RETRAIN_CONFIG['fraud_drift_threshold']}, keeping current models")
+
+    state['users'] = user_marks
+    timings['total'] = time.perf_counter() - started
+
+    run = {
+        'run_at': datetime.now().isoformat(timespec='seconds'),
+        'rows': len(df),
+        'changed_categories': changed_categories,
+        'retrained_categories': retrained_categories,
+        'changed_users': len(changed_users),
+        'fraud_drift': drift,
+        'fraud_retrained': retrain_fraud,
+        'timings': {name: round(seconds, 3) for name, seconds in timings.items()}
+    }
+    state['runs'] = (state.get('runs', []) + [run])[-RETRAIN_CONFIG['history_runs']:]
+    save_state(state, state_path)
+
+    print(f"[OK] Retraining finished in {run['timings']['total']}s: {run['timings']}")
+    return run
+
+
+if __name__ == "__main__":
+    run_retraining(force='--force' in sys.argv)
@@ -0,0 +1,167 @@
+"""
+Password Hashing for Smart Finance
+Salted PBKDF2-SHA256 with tunable cost, run on a bounded worker pool
+"""
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import hmac
+import base64
+import logging
+import os
+import re
+import threading
+import time
+
+# Setup logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+ALGORITHM = 'pbkdf2_sha256'
+# PBKDF2 iterations for new hashes; existing hashes keep their own count
+# until the user's next login, when they are upgraded
+PASSWORD_HASH_ROUNDS = int(os.getenv('PASSWORD_HASH_ROUNDS', '260000'))
+# Hashes computed at once. Each one holds a core for ~100-300 ms, so a burst
+# of logins queues here instead of occupying every dashboard script thread.
+PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', '2'))
+SALT_BYTES = 16
+
+# Unsalted SHA-256 hex digests written by earlier versions
+_LEGACY_SHA256 = re.compile(r'^[0-9a-f]{64}$')
+
+
+class PasswordHasher:
+    """
+    Hash and verify passwords in the format
+    'pbkdf2_sha256$<iterations>$<salt>$<hash>' (salt/hash base64-encoded)
+
+    Legacy unsalted SHA-256 hashes still verify, and are reported as needing
+    a rehash so callers can replace them transparently on login.
+    """
+
+    def __init__(self, rounds=None, max_workers=None):
+        """
+        Initialize PasswordHasher
+
+        Args:
+            rounds (int): PBKDF2 iterations for new hashes
+            max_workers (int): Maximum hashes computed concurrently
+        """
+        self.rounds = rounds or PASSWORD_HASH_ROUNDS
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers or PASSWORD_HASH_WORKERS,
+            thread_name_prefix='password-hash'
+        )
+
+    @staticmethod
+    def _pbkdf2(password, salt, rounds):
+        return hashlib.pbkdf2_hmac('sha256', password.encode(), salt, rounds)
+
+    @staticmethod
+    def _b64(raw):
+        return base64.b64encode(raw).decode('ascii').rstrip('=')
+
+    @staticmethod
+    def _unb64(text):
+        return base64.b64decode(text + '=' * (-len(text) % 4))
+
+    def _hash(self, password):
+        salt = os.urandom(SALT_BYTES)
+        digest = self._pbkdf2(password, salt, self.rounds)
+        return f"{ALGORITHM}${self.rounds}${self._b64(salt)}${self._b64(digest)}"
+
+    def _verify(self, password, stored_hash):
+        if not isinstance(stored_hash, str):
+            return False
+
+        if _LEGACY_SHA256.match(stored_hash):
+            candidate = hashlib.sha256(password.encode()).hexdigest()
+            return hmac.compare_digest(candidate, stored_hash)
+
+        try:
+            algorithm, rounds, salt, digest = stored_hash.split('$')
+            if algorithm != ALGORITHM:
+                return False
+            candidate = self._pbkdf2(password, self._unb64(salt), int(rounds))
+            return hmac.compare_digest(candidate, self._unb64(digest))
+        except ValueError:
+            logger.warning("Unrecognised password hash format")
+            return False
+
+    def hash(self, password):
+        """Hash a password on the worker pool (blocks until done)"""
+        return self.executor.submit(self._hash, password).result()
+
+    def verify(self, password, stored_hash):
+        """Check a password against a stored hash on the worker pool (blocks until done)"""
+        return self.executor.submit(self._verify, password, stored_hash).result()
+
+    def needs_rehash(self, stored_hash):
+        """Check if a stored hash is legacy SHA-256 or uses fewer rounds than configured"""
+        if not isinstance(stored_hash, str) or _LEGACY_SHA256.match(stored_hash):
+            return True
+
+        parts = stored_hash.split('$')
+        return len(parts) != 4 or parts[0] != ALGORITHM or int(parts[1]) < self.rounds
+
+    def verify_and_update(self, password, stored_hash):
+        """
+        Verify a password and produce a replacement hash when the stored one is outdated
+
+        Returns:
+            tuple: (valid: bool, new_hash: str or None)
+        """
+        if not self.verify(password, stored_hash):
+            return False, None
+
+        if self.needs_rehash(stored_hash):
+            return True, self.hash(password)
+
+        return True, None
+
+
+# Process-wide hasher, so every session shares one bounded pool
+_password_hasher = None
+_password_hasher_lock = threading.Lock()
+
+
+def get_password_hasher():
+    """Get the shared PasswordHasher"""
+    global _password_hasher
+    with _password_hasher_lock:
+        if _password_hasher is None:
+            _password_hasher = PasswordHasher()
+        return _password_hasher
+
+
+def benchmark(round_settings=(100_000, 260_000, 600_000), logins=24, concurrency=8):
+    """
+    Measure login throughput (verifications/s) at each cost setting
+
+    `concurrency` client threads submit logins at once, as simultaneous
+    dashboard sessions would; the pool caps how many hash at the same time.
+    """
+    print("\n" + "="*60)
+    print("PASSWORD HASHING BENCHMARK")
+    print("="*60)
+    print(f"{PASSWORD_HASH_WORKERS} hashing worker(s), {concurrency} concurrent logins\n")
+
+    for rounds in round_settings:
+        hasher = PasswordHasher(rounds=rounds)
+        stored_hash = hasher.hash('benchmark-password')
+
+        start = time.perf_counter()
+        single = hasher.verify('benchmark-password', stored_hash)
+        latency = time.perf_counter() - start
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as clients:
+            results = list(clients.map(lambda _: hasher.verify('benchmark-password', stored_hash), range(logins)))
+        elapsed = time.perf_counter() - start
+
+        assert single and all(results)
+        print(f"{rounds:>9,} rounds: {latency * 1000:6.1f} ms/login, {logins / elapsed:6.1f} logins/s")
+        hasher.executor.shutdown()
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,57 @@
+"""
+CSV-mode registration and login against users.csv files as shipped
+"""
+import pandas as pd
+import sys
+import os
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.join(project_root, 'dashboards'))
+
+from auth_sqlite import AuthManager
+
+
+def make_auth(users_file):
+    auth = AuthManager(storage_mode='csv')
+    auth.users_file = users_file
+    return auth
+
+
+def test_register_then_login_without_password_hash_column(tmp_path):
+    """The shipped users.csv has no password_hash column; registering must add it"""
+    users_file = tmp_path / 'users.csv'
+    pd.DataFrame([{
+        'user_id': 'U00001', 'name': 'Existing User', 'email': 'existing@example.com',
+        'monthly_income': 5000, 'preferred_currency': 'USD'
+    }]).to_csv(users_file, index=False)
+    auth = make_auth(users_file)
+
+    ok, message = auth.register_user_csv('New User', 'New@Example.com', 'secret123', 4000, 'EUR')
+    assert ok, message
+
+    users_df = pd.read_csv(users_file)
+    assert 'password_hash' in users_df.columns
+    assert list(users_df['user_id']) == ['U00001', 'U00002']
+
+    ok, user_id, message = auth.login_csv('new@example.com', 'secret123')
+    assert ok, message
+    assert user_id == 'U00002'
+
+
+def test_login_without_stored_hash_is_rejected(tmp_path):
+    """Users without a hash (imported rows) get invalid credentials, not a crash"""
+    users_file = tmp_path / 'users.csv'
+    pd.DataFrame([{
+        'user_id': 'U00001', 'name': 'Existing User', 'email': 'existing@example.com',
+        'monthly_income': 5000, 'preferred_currency': 'USD'
+    }]).to_csv(users_file, index=False)
+    auth = make_auth(users_file)
+
+    ok, user_id, message = auth.login_csv('existing@example.com', 'anything')
+    assert not ok and user_id is None
+
+    # After the header gains password_hash the old row's hash is NaN
+    auth.register_user_csv('New User', 'new@example.com', 'secret123', 4000)
+    ok, user_id, message = auth.login_csv('existing@example.com', 'anything')
+    assert not ok and user_id is None